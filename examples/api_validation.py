@@ -3,12 +3,28 @@ api_validation.py
 
 Valida transacciones recibidas como payloads de una API.
 Usa la lógica de validation.py y devuelve respuestas listas para API.
+
+create_app() construye el servicio FastAPI con /validate, /validate/bulk y
+/metrics (formato de texto de Prometheus). FastAPI solo se importa al crear la app:
+
+    uvicorn examples.api_validation:create_app --factory
 """
 
-from typing import Dict, Any
+import time
+from typing import Dict, Any, List
 from returns.result import Success, Failure
 from src.validation import validate_transaction
-from src.transforms import transform_transaction
+from src.transforms import transform_batch, transform_transaction
+from src.records import materialize
+from src.metrics import PROMETHEUS_CONTENT_TYPE, REGISTRY, MetricsRegistry, failure_labels
+
+_REQUESTS = REGISTRY.counter("api_validations_total", "Payloads validados por resultado",
+                             ("status",))
+_FAILURES = REGISTRY.counter("api_records_failed_total", "Payloads rechazados por campo y regla",
+                             ("field", "rule"))
+_LATENCY = REGISTRY.histogram("api_validation_seconds", "Duración de validate_api_payload")
+_BATCH_LATENCY = REGISTRY.histogram("api_batch_validation_seconds",
+                                    "Duración de validate_api_batch")
 
 def validate_api_payload(payload: Dict[str, Any]) -> Dict[str, Any]:
     """
@@ -20,11 +36,66 @@ def validate_api_payload(payload: Dict[str, Any]) -> Dict[str, Any]:
     Returns:
         dict: Respuesta con estado y datos o error.
     """
-    # Aplica transformaciones antes de validar
-    transformed = transform_transaction(payload)
+    start = time.perf_counter()
+    # Aplica transformaciones antes de validar; payload no se modifica
+    response = _validate_transformed(transform_transaction(payload))
+    _LATENCY.observe(time.perf_counter() - start)
+    return response
 
+def _validate_transformed(transformed) -> Dict[str, Any]:
     result = validate_transaction(transformed)
     if isinstance(result, Success):
-        return {"status": "success", "data": result.unwrap()}
+        response = {"status": "success", "data": materialize(result.unwrap())}
     else:
-        return {"status": "failure", "error": result.failure()}
+        field, rule = failure_labels(str(result.failure()))
+        _FAILURES.inc(field=field, rule=rule)
+        response = {"status": "failure", "error": result.failure()}
+    _REQUESTS.inc(status=response["status"])
+    return response
+
+def validate_api_batch(payloads: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Valida una lista de payloads en una sola llamada.
+
+    Args:
+        payloads (list): Transacciones a validar.
+
+    Returns:
+        dict: Conteo de válidas y rechazadas, y la respuesta de cada payload en orden.
+    """
+    start = time.perf_counter()
+    # Transformación por lote: una marca de tiempo y una búsqueda por país/canal distinto
+    results = [_validate_transformed(t) for t in transform_batch(payloads)]
+    _BATCH_LATENCY.observe(time.perf_counter() - start)
+    valid = sum(1 for r in results if r["status"] == "success")
+    return {"valid": valid, "failed": len(results) - valid, "results": results}
+
+def create_app(registry: MetricsRegistry = REGISTRY):
+    """
+    Crea la aplicación FastAPI del servicio de validación.
+
+    Args:
+        registry (MetricsRegistry): Registro que se expone en /metrics.
+
+    Returns:
+        FastAPI: Aplicación con POST /validate, POST /validate/bulk y GET /metrics.
+    """
+    # pylint: disable=import-outside-toplevel
+    from fastapi import Body, FastAPI
+    from fastapi.responses import Response
+
+    app = FastAPI(title="Validación de transacciones")
+
+    @app.post("/validate")
+    def validate(payload: Dict[str, Any] = Body(...)) -> Dict[str, Any]:
+        return validate_api_payload(payload)
+
+    @app.post("/validate/bulk")
+    def validate_bulk(payloads: List[Dict[str, Any]] = Body(...)) -> Dict[str, Any]:
+        return validate_api_batch(payloads)
+
+    @app.get("/metrics")
+    def metrics() -> Response:
+        return Response(registry.to_prometheus(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+    return app
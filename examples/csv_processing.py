@@ -5,31 +5,35 @@ Carga y procesa transacciones desde un archivo CSV usando transforms y validatio
 """
 
 import csv
-from typing import List, Dict
+from typing import List, Dict, Optional
 from returns.result import Success
-from src.transforms import transform_transaction
+from src.transforms import transform_batch
 from src.validation import validate_transaction
+from src.error_sink import ErrorSink
+from src.compression import open_text
 
 def load_csv(path: str) -> List[Dict]:
     """
     Carga un archivo CSV y devuelve una lista de diccionarios.
 
     Args:
-        path (str): Ruta al archivo CSV.
+        path (str): Ruta al archivo CSV (puede estar comprimido).
 
     Returns:
         List[Dict]: Lista de transacciones como diccionarios.
     """
-    with open(path, "r", encoding="utf-8") as f:
+    with open_text(path, "r", encoding="utf-8", newline="") as f:
         reader = csv.DictReader(f)
         return list(reader)
 
-def process_csv_transactions(path: str) -> Dict[str, List]:
+def process_csv_transactions(path: str, sink: Optional[ErrorSink] = None) -> Dict[str, List]:
     """
     Procesa y valida todas las transacciones en un archivo CSV.
 
     Args:
         path (str): Ruta al archivo CSV.
+        sink (ErrorSink, optional): Si se proporciona, los errores se registran ahí
+        y la lista de errores devuelta contiene solo los ejemplos muestreados.
 
     Returns:
         Dict[str, List]: Diccionario con listas de transacciones válidas y errores.
@@ -38,12 +42,16 @@ def process_csv_transactions(path: str) -> Dict[str, List]:
     valid: List[Dict] = []
     errors: List[str] = []
 
-    for tx in transactions:
-        transformed = transform_transaction(tx)
+    # Una sola pasada de transformación con la misma marca de tiempo para el archivo
+    for i, (tx, transformed) in enumerate(zip(transactions, transform_batch(transactions))):
         result = validate_transaction(transformed)
         if isinstance(result, Success):
             valid.append(result.unwrap())
+        elif sink is not None:
+            sink.add(i, result.failure(), tx)
         else:
             errors.append(result.failure())
 
+    if sink is not None:
+        errors = sink.sample_messages()
     return {"valid": valid, "errors": errors}
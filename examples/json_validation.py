@@ -5,29 +5,33 @@ Carga y valida transacciones desde un archivo JSON usando el esquema definido en
 """
 
 import json
-from typing import List, Dict
+from typing import List, Dict, Optional
 from returns.result import Success, Failure
 from src.validation import validate_transaction
+from src.error_sink import ErrorSink
+from src.compression import open_text
 
 def load_json(path: str) -> List[Dict]:
     """
     Carga un archivo JSON que contiene una lista de transacciones.
 
     Args:
-        path (str): Ruta al archivo JSON.
+        path (str): Ruta al archivo JSON (puede estar comprimido).
 
     Returns:
         List[Dict]: Lista de transacciones.
     """
-    with open(path, "r", encoding="utf-8") as f:
+    with open_text(path, "r", encoding="utf-8") as f:
         return json.load(f)
 
-def validate_json_transactions(path: str) -> Dict[str, List]:
+def validate_json_transactions(path: str, sink: Optional[ErrorSink] = None) -> Dict[str, List]:
     """
     Valida todas las transacciones en un archivo JSON.
 
     Args:
         path (str): Ruta al archivo JSON.
+        sink (ErrorSink, optional): Si se proporciona, los errores se registran ahí
+        y la lista de errores devuelta contiene solo los ejemplos muestreados.
 
     Returns:
         Dict[str, List]: Diccionario con listas de transacciones válidas y errores.
@@ -36,11 +40,15 @@ def validate_json_transactions(path: str) -> Dict[str, List]:
     valid: List[Dict] = []
     errors: List[str] = []
 
-    for tx in transactions:
+    for i, tx in enumerate(transactions):
         result = validate_transaction(tx)
         if isinstance(result, Success):
             valid.append(result.unwrap())
+        elif sink is not None:
+            sink.add(i, result.failure(), tx)
         else:
             errors.append(result.failure())
 
+    if sink is not None:
+        errors = sink.sample_messages()
     return {"valid": valid, "errors": errors}
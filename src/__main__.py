@@ -0,0 +1,9 @@
+"""
+Permite ejecutar el CLI con `python -m src`.
+"""
+
+import sys
+
+from src.cli import main
+
+sys.exit(main())
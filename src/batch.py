@@ -0,0 +1,232 @@
+"""
+batch.py
+
+Ingesta por lotes de directorios o patrones glob con paralelismo por archivo.
+
+Cada archivo se procesa con run_pipeline en un pool de procesos (el intérprete
+y las importaciones se cargan una vez por worker, no por archivo). Un manifiesto
+JSON guarda tamaño y mtime de los archivos ya procesados para omitirlos si no
+cambiaron. Se escriben salidas por archivo y salidas consolidadas.
+"""
+
+import csv
+import glob
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Iterable, Optional
+
+from src.compression import strip_codec_suffix
+from src.metrics import MetricsRegistry
+from src.pipeline import CHUNK_SIZE, run_pipeline
+
+# Extensiones de entrada, con o sin extensión de compresión
+INPUT_EXTENSIONS = (".csv", ".ndjson", ".jsonl")
+
+def discover(inputs: Iterable[str]) -> list[str]:
+    """
+    Expande directorios, patrones glob y archivos a una lista ordenada de rutas.
+
+    Args:
+        inputs (Iterable[str]): Directorios, patrones ('data/*.csv') o archivos.
+
+    Returns:
+        list[str]: Rutas absolutas sin duplicados.
+    """
+    found: set[str] = set()
+    for item in inputs:
+        if os.path.isdir(item):
+            for root, _, names in os.walk(item):
+                found.update(os.path.join(root, n) for n in names
+                             if strip_codec_suffix(n).endswith(INPUT_EXTENSIONS))
+        elif glob.has_magic(item):
+            found.update(p for p in glob.glob(item, recursive=True) if os.path.isfile(p))
+        elif os.path.isfile(item):
+            found.add(item)
+        else:
+            raise FileNotFoundError(item)
+    return sorted(os.path.abspath(p) for p in found)
+
+def load_manifest(path: Optional[str]) -> dict[str, Any]:
+    """
+    Lee el manifiesto de archivos procesados (vacío si no existe).
+    """
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def save_manifest(path: str, manifest: dict[str, Any]) -> None:
+    """
+    Escribe el manifiesto de forma atómica (archivo temporal + rename).
+    """
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
+
+def _signature(path: str) -> dict[str, Any]:
+    st = os.stat(path)
+    return {"size": st.st_size, "mtime": st.st_mtime}
+
+def _output_stem(out_dir: str, path: str) -> str:
+    # El hash de la ruta evita colisiones entre archivos con el mismo nombre
+    name = os.path.basename(path).split(".")[0]
+    digest = hashlib.sha1(path.encode("utf-8")).hexdigest()[:8]
+    return os.path.join(out_dir, "files", f"{name}-{digest}")
+
+def _process_file(path: str, out_dir: str, options: dict[str, Any]) -> dict[str, Any]:
+    """
+    Procesa un archivo en un worker; devuelve su resumen, rutas de salida y
+    el snapshot de sus métricas.
+    """
+    stem = _output_stem(out_dir, path)
+    valid_path = f"{stem}.valid.csv"
+    errors_path = f"{stem}.errors.csv"
+    signature = _signature(path)
+    # Salidas de una ejecución anterior: run_pipeline no crea el archivo si no hay filas
+    for stale in (valid_path, errors_path):
+        if os.path.exists(stale):
+            os.remove(stale)
+    summary = run_pipeline(path, valid_path, errors_path, metrics=MetricsRegistry(), **options)
+    return {
+        "metrics": summary["metrics"],
+        **signature,
+        "total": summary["total"],
+        "valid": summary["valid"],
+        "errors": summary["errors"],
+        "valid_path": valid_path if summary["valid"] else None,
+        "errors_path": errors_path if summary["errors"] else None,
+    }
+
+def _drop_outputs(entry: dict[str, Any]) -> None:
+    """
+    Borra las salidas por archivo de una entrada del manifiesto.
+    """
+    for key in ("valid_path", "errors_path"):
+        if entry.get(key) and os.path.exists(entry[key]):
+            os.remove(entry[key])
+
+def _consolidate(manifest: dict[str, Any], paths: Iterable[str],
+                 out_dir: str) -> tuple[str, str]:
+    """
+    Une las salidas por archivo de paths (las entradas de esta ejecución que
+    están en el manifiesto) en valid.csv y errors.csv.
+    """
+    valid_out = os.path.join(out_dir, "valid.csv")
+    errors_out = os.path.join(out_dir, "errors.csv")
+    entries = [(p, manifest[p]) for p in sorted(paths) if p in manifest]
+
+    fieldnames: list[str] = []
+    for _, entry in entries:
+        if entry.get("valid_path") and os.path.exists(entry["valid_path"]):
+            with open(entry["valid_path"], "r", encoding="utf-8", newline="") as f:
+                for name in next(csv.reader(f), []):
+                    if name not in fieldnames:
+                        fieldnames.append(name)
+    with open(valid_out, "w", encoding="utf-8", newline="") as out:
+        writer = csv.DictWriter(out, fieldnames=["source_file", *fieldnames])
+        writer.writeheader()
+        for path, entry in entries:
+            if entry.get("valid_path") and os.path.exists(entry["valid_path"]):
+                with open(entry["valid_path"], "r", encoding="utf-8", newline="") as f:
+                    for row in csv.DictReader(f):
+                        writer.writerow({"source_file": path, **row})
+
+    with open(errors_out, "w", encoding="utf-8", newline="") as out:
+        writer = csv.DictWriter(out, fieldnames=["source_file", "row", "error"])
+        writer.writeheader()
+        for path, entry in entries:
+            if entry.get("errors_path") and os.path.exists(entry["errors_path"]):
+                with open(entry["errors_path"], "r", encoding="utf-8", newline="") as f:
+                    for row in csv.DictReader(f):
+                        writer.writerow({"source_file": path, **row})
+    return valid_out, errors_out
+
+def run_batch(inputs: Iterable[str], out_dir: str,
+              manifest_path: Optional[str] = None,
+              workers: Optional[int] = None,
+              chunk_size: int = CHUNK_SIZE,
+              coerce: bool = False,
+              consolidate: bool = True) -> dict[str, Any]:
+    """
+    Procesa varios archivos en paralelo, omitiendo los que no cambiaron.
+
+    Args:
+        inputs (Iterable[str]): Directorios, patrones glob o archivos.
+        out_dir (str): Directorio de salida (por archivo en out_dir/files).
+        manifest_path (str, optional): Manifiesto de archivos procesados; por defecto
+            out_dir/manifest.json.
+        workers (int, optional): Procesos en paralelo; por defecto os.cpu_count().
+        chunk_size (int): Tamaño de chunk de cada archivo.
+        coerce (bool): Escribe valores tipados en las salidas válidas.
+        consolidate (bool): Genera valid.csv y errors.csv con todos los archivos.
+
+    Returns:
+        dict: Archivos procesados, omitidos, fallidos y quitados del manifiesto
+        (porque ya no existen), totales de filas y en 'metrics' el snapshot
+        combinado de las métricas de todos los workers.
+    """
+    os.makedirs(os.path.join(out_dir, "files"), exist_ok=True)
+    manifest_path = manifest_path or os.path.join(out_dir, "manifest.json")
+    manifest = load_manifest(manifest_path)
+    options = {"chunk_size": chunk_size, "coerce": coerce}
+    paths = discover(inputs)
+
+    # Los archivos borrados salen del manifiesto junto con sus salidas
+    removed = sorted(p for p in manifest if not os.path.exists(p))
+    for path in removed:
+        _drop_outputs(manifest.pop(path))
+    if removed:
+        save_manifest(manifest_path, manifest)
+
+    pending = []
+    skipped = []
+    for path in paths:
+        entry = manifest.get(path)
+        if entry and {"size": entry["size"], "mtime": entry["mtime"]} == _signature(path):
+            skipped.append(path)
+        else:
+            pending.append(path)
+
+    processed = []
+    failed = {}
+    metrics = MetricsRegistry()
+    files = metrics.counter("batch_files_total", "Archivos del lote por resultado", ("result",))
+    files.inc(len(skipped), result="skipped")
+    if pending:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(_process_file, p, out_dir, options): p for p in pending}
+            for future in as_completed(futures):
+                path = futures[future]
+                try:
+                    entry = future.result()
+                except Exception as e:  # pylint: disable=broad-except
+                    failed[path] = f"{type(e).__name__}: {e}"
+                    if path in manifest:
+                        # Las salidas anteriores ya no corresponden al archivo actual
+                        _drop_outputs(manifest.pop(path))
+                        save_manifest(manifest_path, manifest)
+                    files.inc(result="failed")
+                    continue
+                metrics.merge(entry.pop("metrics"))
+                manifest[path] = entry
+                files.inc(result="processed")
+                processed.append(path)
+                # El manifiesto se guarda por archivo para poder reanudar tras un fallo
+                save_manifest(manifest_path, manifest)
+
+    summary: dict[str, Any] = {
+        "processed": sorted(processed),
+        "skipped": skipped,
+        "failed": failed,
+        "removed": removed,
+        "total": sum(manifest[p]["total"] for p in processed),
+        "valid": sum(manifest[p]["valid"] for p in processed),
+        "errors": sum(manifest[p]["errors"] for p in processed),
+        "metrics": metrics.snapshot(),
+    }
+    if consolidate:
+        summary["valid_path"], summary["errors_path"] = _consolidate(manifest, paths, out_dir)
+    return summary
@@ -0,0 +1,352 @@
+"""
+cli.py
+
+Punto de entrada de línea de comandos con subcomandos validate, batch, dry-run,
+report, bench, loadtest, daemon y client.
+
+Las bibliotecas pesadas (matplotlib) se importan solo dentro del subcomando que
+las necesita, para que validar un archivo pequeño no pague su tiempo de carga.
+
+Uso:
+    python -m src.cli validate data/entrada.csv --valid-out validas.csv
+    python -m src.cli batch "data/particiones/*.csv" --out-dir data/lote --workers 4
+    python -m src.cli dry-run data/entrada.csv --sample 2000
+    python -m src.cli report data/reporte/resumen.json --out-dir data/reporte
+    python -m src.cli bench data/entrada.csv --repeat 3
+    python -m src.cli bench --imports
+    python -m src.cli loadtest --scenario both --concurrency 16 --requests 2000
+    python -m src.cli daemon --workers 4
+    python -m src.cli client file data/entrada.csv --valid-out validas.csv
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Optional, Sequence
+
+from src.memory import parse_size
+from src.metrics import MetricsRegistry
+from src.pipeline import CHUNK_SIZE, print_summary, run_pipeline
+from src.stats import StreamingStats
+
+# Presupuesto de tiempo de importación de src.cli (milisegundos)
+IMPORT_BUDGET_MS = 150.0
+
+# Módulos que no deben cargarse al importar el CLI
+HEAVY_MODULES = ("pandas", "numpy", "matplotlib", "seaborn")
+
+def measure_import_time(module: str = "src.cli") -> tuple[float, list[str]]:
+    """
+    Mide en un intérprete nuevo cuánto tarda en importarse un módulo.
+
+    Args:
+        module (str): Módulo a importar.
+
+    Returns:
+        tuple: (milisegundos, módulos pesados que quedaron cargados).
+    """
+    code = (
+        "import sys, time, json\n"
+        "t = time.perf_counter()\n"
+        f"import {module}\n"
+        "ms = (time.perf_counter() - t) * 1000\n"
+        f"print(json.dumps([ms, [m for m in {HEAVY_MODULES!r} if m in sys.modules]]))\n"
+    )
+    out = subprocess.run([sys.executable, "-c", code], check=True,
+                         capture_output=True, text=True).stdout
+    ms, heavy = json.loads(out.strip().splitlines()[-1])
+    return ms, heavy
+
+def _write_metrics(path: str, snapshot: dict) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(snapshot, f, ensure_ascii=False, indent=2)
+
+def _cmd_validate(args: argparse.Namespace) -> int:
+    stats = StreamingStats()
+    db = None
+    if args.db:
+        from src.sqlite_sink import SQLiteSink  # pylint: disable=import-outside-toplevel
+        db = SQLiteSink(args.db, batch_size=args.db_batch_size, upsert=args.db_upsert,
+                        coerce=args.coerce)
+    summary = run_pipeline(args.input, args.valid_out, args.errors_out,
+                           chunk_size=args.chunk_size, stats=stats,
+                           adaptive=args.adaptive, workers=args.workers,
+                           queue_size=args.queue_size, memory_budget=args.memory_budget,
+                           memory_probe=args.memory_probe, coerce=args.coerce,
+                           metrics=MetricsRegistry() if args.metrics_out else None, db=db)
+    print_summary(summary)
+    if args.metrics_out:
+        _write_metrics(args.metrics_out, summary["metrics"])
+    if args.summary:
+        with open(args.summary, "w", encoding="utf-8") as f:
+            json.dump(stats.to_dict(), f, ensure_ascii=False, indent=2)
+    if args.report and summary["valid"]:
+        from src.report import render_report  # pylint: disable=import-outside-toplevel
+        files = render_report(stats, args.report, images=not args.no_images)
+        print("\n Reporte generado:")
+        for path in files:
+            print(f"- {path}")
+    return 0
+
+def _cmd_batch(args: argparse.Namespace) -> int:
+    from src.batch import run_batch  # pylint: disable=import-outside-toplevel
+    summary = run_batch(args.inputs, args.out_dir, manifest_path=args.manifest,
+                        workers=args.workers, chunk_size=args.chunk_size,
+                        coerce=args.coerce, consolidate=not args.no_consolidate)
+    print("\n Resumen del lote")
+    print(f"Archivos procesados: {len(summary['processed'])}")
+    print(f"Archivos sin cambios (omitidos): {len(summary['skipped'])}")
+    if summary["removed"]:
+        print(f"Archivos borrados (quitados del manifiesto): {len(summary['removed'])}")
+    print(f"Total de transacciones leídas: {summary['total']}")
+    print(f" Transacciones válidas: {summary['valid']}")
+    print(f" Transacciones con errores: {summary['errors']}")
+    for path, error in summary["failed"].items():
+        print(f"- Falló {path}: {error}")
+    if args.metrics_out:
+        _write_metrics(args.metrics_out, summary["metrics"])
+    return 1 if summary["failed"] else 0
+
+def _cmd_dry_run(args: argparse.Namespace) -> int:
+    from src.sampling import dry_run, print_dry_run  # pylint: disable=import-outside-toplevel
+    report = dry_run(args.input, sample_size=args.sample, seed=args.seed,
+                     confidence=args.confidence)
+    print_dry_run(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    # Falla solo si incluso el límite inferior del intervalo supera el umbral
+    if args.fail_above is not None and report["errors"]["low"] > args.fail_above:
+        return 1
+    return 0
+
+def _cmd_report(args: argparse.Namespace) -> int:
+    from src.report import render_report  # pylint: disable=import-outside-toplevel
+    with open(args.summary, "r", encoding="utf-8") as f:
+        stats = StreamingStats.from_dict(json.load(f))
+    for path in render_report(stats, args.out_dir, images=not args.no_images):
+        print(path)
+    return 0
+
+def _cmd_bench(args: argparse.Namespace) -> int:
+    if args.imports:
+        ms, heavy = measure_import_time()
+        print(f"import src.cli: {ms:.1f} ms (presupuesto {IMPORT_BUDGET_MS:.0f} ms)")
+        if heavy:
+            print(f"Módulos pesados cargados: {', '.join(heavy)}")
+        return 0 if ms <= IMPORT_BUDGET_MS and not heavy else 1
+    if not args.input:
+        print("bench requiere un archivo de entrada o --imports", file=sys.stderr)
+        return 2
+    for i in range(args.repeat):
+        start = time.perf_counter()
+        summary = run_pipeline(args.input, chunk_size=args.chunk_size,
+                               adaptive=args.adaptive, workers=args.workers,
+                               queue_size=args.queue_size, memory_budget=args.memory_budget,
+                               memory_probe=args.memory_probe)
+        elapsed = time.perf_counter() - start
+        rate = summary["total"] / elapsed if elapsed else 0.0
+        print(f"#{i + 1}: {summary['total']} filas en {elapsed:.3f} s ({rate:,.0f} filas/s)")
+    return 0
+
+def _cmd_loadtest(args: argparse.Namespace) -> int:
+    # pylint: disable=import-outside-toplevel
+    from contextlib import nullcontext
+    from src.loadtest import SCENARIOS, local_server, print_load, run_load
+    if args.no_server and args.port is None:
+        print("loadtest --no-server requiere --port", file=sys.stderr)
+        return 2
+    scenarios = SCENARIOS if args.scenario == "both" else (args.scenario,)
+    server = nullcontext(args.port) if args.no_server else local_server(
+        args.port, workers=args.server_workers)
+    results = []
+    with server as port:
+        for scenario in scenarios:
+            result = run_load(args.host, port, scenario, concurrency=args.concurrency,
+                              requests=args.requests, batch_size=args.batch_size,
+                              invalid_ratio=args.invalid_ratio, seed=args.seed)
+            print_load(result)
+            results.append(result)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    return 1 if any(r["http_errors"] for r in results) else 0
+
+def _cmd_daemon(args: argparse.Namespace) -> int:
+    # pylint: disable=import-outside-toplevel
+    import signal
+    import threading
+    from src.daemon import ValidationDaemon
+    daemon = ValidationDaemon(args.socket, workers=args.workers)
+    daemon.start()
+    # SIGTERM detiene el servidor como la operación shutdown
+    signal.signal(signal.SIGTERM,
+                  lambda *_: threading.Thread(target=daemon.shutdown, daemon=True).start())
+    print(f"Demonio escuchando en {daemon.socket_path} (workers {daemon.worker_pids})", flush=True)
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        daemon.close()
+    return 0
+
+def _cmd_client(args: argparse.Namespace) -> int:
+    from src.daemon import DaemonClient  # pylint: disable=import-outside-toplevel
+    if args.job in ("file", "ndjson", "payload") and args.target is None:
+        print(f"client {args.job} requiere un argumento", file=sys.stderr)
+        return 2
+    with DaemonClient(args.socket) as client:
+        if args.job == "file":
+            options = {"coerce": args.coerce}
+            if args.valid_out:
+                options["valid_path"] = os.path.abspath(args.valid_out)
+            if args.errors_out:
+                options["errors_path"] = os.path.abspath(args.errors_out)
+            response = client.validate_file(args.target, **options)
+        elif args.job == "ndjson":
+            if args.target == "-":
+                response = client.validate_records(sys.stdin, results=args.results,
+                                                   transform=args.transform)
+            else:
+                with open(args.target, "r", encoding="utf-8") as f:
+                    response = client.validate_records(f, results=args.results,
+                                                       transform=args.transform)
+        elif args.job == "payload":
+            response = client.validate(json.loads(args.target), transform=args.transform)
+        else:
+            response = client.request({"op": args.job})
+    print(json.dumps(response, ensure_ascii=False, indent=2))
+    return 0 if response.get("ok") else 1
+
+def _add_stage_arguments(p: argparse.ArgumentParser) -> None:
+    p.add_argument("--workers", type=int, default=0,
+                   help="Hilos por etapa; 0 ejecuta el pipeline en secuencia")
+    p.add_argument("--queue-size", type=int, default=4, help="Chunks en cola entre etapas")
+    p.add_argument("--memory-budget", type=parse_size, default=None,
+                   help="Presupuesto de memoria (p. ej. 512M); adapta el tamaño de chunk")
+    p.add_argument("--memory-probe", choices=["tracemalloc", "rss"], default="tracemalloc")
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Construye el parser de argumentos con todos los subcomandos.
+    """
+    parser = argparse.ArgumentParser(prog="python -m src.cli",
+                                     description="Validación de transacciones")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("validate", help="Sanitiza y valida un CSV")
+    p.add_argument("input")
+    p.add_argument("--valid-out", default=None, help="CSV de transacciones válidas")
+    p.add_argument("--errors-out", default=None, help="CSV de errores")
+    p.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    p.add_argument("--summary", default=None, help="JSON con las estadísticas acumuladas")
+    p.add_argument("--report", default=None, help="Directorio donde generar el reporte")
+    p.add_argument("--no-images", action="store_true", help="Reporte sin PNG (sin matplotlib)")
+    p.add_argument("--adaptive", action="store_true",
+                   help="Ordena los validadores según costo y tasa de rechazo observados")
+    p.add_argument("--coerce", action="store_true",
+                   help="Escribe las filas válidas con valores tipados")
+    p.add_argument("--metrics-out", default=None, help="JSON con el snapshot de métricas")
+    p.add_argument("--db", default=None, help="Base SQLite donde cargar válidas y errores")
+    p.add_argument("--db-upsert", action="store_true",
+                   help="Reemplaza las transacciones existentes por Transaction_ID")
+    p.add_argument("--db-batch-size", type=int, default=10_000, help="Filas por transacción")
+    _add_stage_arguments(p)
+    p.set_defaults(func=_cmd_validate)
+
+    p = sub.add_parser("batch", help="Procesa en paralelo varios archivos o un directorio")
+    p.add_argument("inputs", nargs="+", help="Directorios, patrones glob o archivos")
+    p.add_argument("--out-dir", required=True, help="Directorio de salidas por archivo y consolidadas")
+    p.add_argument("--manifest", default=None,
+                   help="Manifiesto de archivos procesados (por defecto OUT_DIR/manifest.json)")
+    p.add_argument("--workers", type=int, default=None, help="Procesos en paralelo")
+    p.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    p.add_argument("--coerce", action="store_true")
+    p.add_argument("--no-consolidate", action="store_true",
+                   help="No genera valid.csv y errors.csv consolidados")
+    p.add_argument("--metrics-out", default=None, help="JSON con el snapshot de métricas")
+    p.set_defaults(func=_cmd_batch)
+
+    p = sub.add_parser("dry-run", help="Estima las tasas de error con una muestra aleatoria")
+    p.add_argument("input")
+    p.add_argument("--sample", type=int, default=1000, help="Registros a muestrear")
+    p.add_argument("--seed", type=int, default=None)
+    p.add_argument("--confidence", type=float, default=0.95)
+    p.add_argument("--fail-above", type=float, default=None,
+                   help="Código de salida 1 si la tasa de error supera este valor (p. ej. 0.05)")
+    p.add_argument("--json", default=None, help="Guarda el resultado en JSON")
+    p.set_defaults(func=_cmd_dry_run)
+
+    p = sub.add_parser("report", help="Genera el reporte a partir de un resumen JSON")
+    p.add_argument("summary")
+    p.add_argument("--out-dir", default="data/reporte")
+    p.add_argument("--no-images", action="store_true")
+    p.set_defaults(func=_cmd_report)
+
+    p = sub.add_parser("bench", help="Mide el rendimiento del pipeline")
+    p.add_argument("input", nargs="?")
+    p.add_argument("--repeat", type=int, default=1)
+    p.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    p.add_argument("--adaptive", action="store_true")
+    p.add_argument("--imports", action="store_true",
+                   help="Mide el tiempo de importación contra el presupuesto")
+    _add_stage_arguments(p)
+    p.set_defaults(func=_cmd_bench)
+
+    p = sub.add_parser("loadtest", help="Mide throughput y latencia de la API bajo carga")
+    p.add_argument("--scenario", choices=["single", "bulk", "both"], default="both")
+    p.add_argument("--concurrency", type=int, default=8, help="Hilos cliente simultáneos")
+    p.add_argument("--requests", type=int, default=1000, help="Peticiones por escenario")
+    p.add_argument("--batch-size", type=int, default=100, help="Registros por petición en bulk")
+    p.add_argument("--invalid-ratio", type=float, default=0.2,
+                   help="Proporción de transacciones inválidas")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=None, help="Puerto (por defecto uno libre)")
+    p.add_argument("--server-workers", type=int, default=1, help="Procesos de uvicorn")
+    p.add_argument("--no-server", action="store_true",
+                   help="Usa un servidor ya en marcha en --host/--port")
+    p.add_argument("--json", default=None, help="Guarda los resultados en JSON")
+    p.set_defaults(func=_cmd_loadtest)
+
+    p = sub.add_parser("daemon", help="Servidor de validación con pila y pool calientes")
+    p.add_argument("--socket", default=None,
+                   help="Ruta del socket Unix (por defecto $VALIDATION_SOCKET, "
+                        "$XDG_RUNTIME_DIR o un directorio privado en /tmp)")
+    p.add_argument("--workers", type=int, default=2, help="Procesos para trabajos de archivo")
+    p.set_defaults(func=_cmd_daemon)
+
+    p = sub.add_parser("client", help="Envía un trabajo al demonio de validación")
+    p.add_argument("job", choices=["file", "ndjson", "payload", "ping", "stats", "shutdown"])
+    p.add_argument("target", nargs="?",
+                   help="Archivo (file), archivo NDJSON o '-' (ndjson), o JSON (payload)")
+    p.add_argument("--socket", default=None,
+                   help="Ruta del socket Unix (por defecto $VALIDATION_SOCKET, "
+                        "$XDG_RUNTIME_DIR o un directorio privado en /tmp)")
+    p.add_argument("--valid-out", default=None, help="CSV de válidas (file)")
+    p.add_argument("--errors-out", default=None, help="CSV de errores (file)")
+    p.add_argument("--coerce", action="store_true", help="Valores tipados (file)")
+    p.add_argument("--transform", action="store_true",
+                   help="Aplica las transformaciones antes de validar (ndjson, payload)")
+    p.add_argument("--results", action="store_true",
+                   help="Incluye el resultado de cada registro (ndjson)")
+    p.set_defaults(func=_cmd_client)
+
+    return parser
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Ejecuta el subcomando indicado en argv.
+
+    Returns:
+        int: Código de salida.
+    """
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
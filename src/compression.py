@@ -0,0 +1,171 @@
+"""
+compression.py
+
+Lectura y escritura transparente de archivos comprimidos.
+
+El códec se detecta por la extensión (.gz, .bz2, .xz, .zst) o, al leer, por los
+bytes mágicos del archivo. Los datos se descomprimen en streaming, sin archivos
+temporales, y la descompresión corre en un hilo aparte para solaparse con el
+parseo (zlib, bz2 y lzma liberan el GIL mientras descomprimen). zstd solo está
+disponible si el paquete opcional zstandard está instalado.
+"""
+
+import bz2
+import gzip
+import io
+import lzma
+import os
+import queue
+import threading
+from typing import IO, Optional
+
+EXTENSIONS = {'.gz': 'gzip', '.bz2': 'bz2', '.xz': 'xz', '.zst': 'zstd'}
+
+MAGIC = (
+    (b'\x1f\x8b', 'gzip'),
+    (b'BZh', 'bz2'),
+    (b'\xfd7zXZ\x00', 'xz'),
+    (b'\x28\xb5\x2f\xfd', 'zstd'),
+)
+
+# Tamaño de cada bloque descomprimido y bloques en cola entre hilos
+BLOCK_SIZE = 1 << 20
+QUEUE_BLOCKS = 4
+
+def strip_codec_suffix(path: str) -> str:
+    """
+    Quita la extensión de compresión: 'datos.ndjson.gz' -> 'datos.ndjson'.
+    """
+    root, ext = os.path.splitext(path)
+    return root if ext.lower() in EXTENSIONS else path
+
+def detect_codec(path: str, sniff: bool = True) -> Optional[str]:
+    """
+    Detecta el códec de un archivo por su extensión o sus bytes mágicos.
+
+    Args:
+        path (str): Ruta al archivo.
+        sniff (bool): Si la extensión no indica compresión, lee los primeros bytes.
+
+    Returns:
+        str | None: 'gzip', 'bz2', 'xz', 'zstd' o None si no está comprimido.
+    """
+    codec = EXTENSIONS.get(os.path.splitext(path)[1].lower())
+    if codec or not sniff or not os.path.isfile(path):
+        return codec
+    with open(path, 'rb') as f:
+        head = f.read(6)
+    for magic, name in MAGIC:
+        if head.startswith(magic):
+            return name
+    return None
+
+def _open_binary(path: str, codec: str, mode: str) -> IO[bytes]:
+    if codec == 'gzip':
+        # Nivel 6: buena compresión sin el costo del nivel 9 por defecto
+        return gzip.open(path, mode + 'b', compresslevel=6) if mode == 'w' else gzip.open(path, 'rb')
+    if codec == 'bz2':
+        return bz2.open(path, mode + 'b')
+    if codec == 'xz':
+        return lzma.open(path, mode + 'b')
+    if codec == 'zstd':
+        try:
+            import zstandard  # pylint: disable=import-outside-toplevel
+        except ImportError as e:
+            raise ImportError("zstd compression requires the 'zstandard' package") from e
+        fh = open(path, mode + 'b')  # pylint: disable=consider-using-with
+        if mode == 'r':
+            return zstandard.ZstdDecompressor().stream_reader(fh, closefd=True)
+        return zstandard.ZstdCompressor().stream_writer(fh, closefd=True)
+    raise ValueError(f"Unknown compression codec: {codec}")
+
+class ThreadedReader(io.RawIOBase):
+    """
+    Lee un stream binario en un hilo aparte y entrega sus bloques en orden.
+
+    El hilo productor llena una cola acotada, así que la memoria queda en
+    queue_blocks * block_size bytes aunque el consumidor sea más lento.
+    """
+    def __init__(self, raw: IO[bytes], block_size: int = BLOCK_SIZE,
+                 queue_blocks: int = QUEUE_BLOCKS):
+        super().__init__()
+        self._raw = raw
+        self._block_size = block_size
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_blocks)
+        self._stop = threading.Event()
+        self._pending = memoryview(b'')
+        self._eof = False
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._pump, name='decompress', daemon=True)
+        self._thread.start()
+
+    def _put(self, block: bytes) -> None:
+        while not self._stop.is_set():
+            try:
+                self._queue.put(block, timeout=0.05)
+                return
+            except queue.Full:
+                continue
+
+    def _pump(self) -> None:
+        try:
+            while not self._stop.is_set():
+                block = self._raw.read(self._block_size)
+                self._put(block)
+                if not block:
+                    return
+        except BaseException as e:  # pylint: disable=broad-except
+            # El error se relanza en el hilo consumidor
+            self._error = e
+            self._put(b'')
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        if not self._pending:
+            if self._eof:
+                return 0
+            block = self._queue.get()
+            if not block:
+                self._eof = True
+                if self._error is not None:
+                    raise self._error
+                return 0
+            self._pending = memoryview(block)
+        n = min(len(b), len(self._pending))
+        b[:n] = self._pending[:n]
+        self._pending = self._pending[n:]
+        return n
+
+    def close(self) -> None:
+        if not self.closed:
+            self._stop.set()
+            self._thread.join()
+            self._raw.close()
+        super().close()
+
+def open_text(path: str, mode: str = 'r', encoding: str = 'utf-8',
+              newline: Optional[str] = None, threaded: bool = True) -> IO[str]:
+    """
+    Abre un archivo de texto, comprimido o no, para leer o escribir.
+
+    Args:
+        path (str): Ruta al archivo; al escribir, la extensión elige el códec.
+        mode (str): 'r' o 'w'.
+        encoding (str): Codificación del texto.
+        newline (str, optional): Igual que en open().
+        threaded (bool): Al leer un archivo comprimido, descomprime en otro hilo.
+
+    Returns:
+        IO[str]: Archivo de texto; se cierra igual que el de open().
+    """
+    if mode not in ('r', 'w'):
+        raise ValueError(f"Unsupported mode: {mode!r}")
+    codec = detect_codec(path, sniff=mode == 'r')
+    if codec is None:
+        return open(path, mode, encoding=encoding, newline=newline)  # pylint: disable=consider-using-with
+    raw = _open_binary(path, codec, mode)
+    if mode == 'r' and threaded:
+        raw = io.BufferedReader(ThreadedReader(raw), buffer_size=1 << 16)
+    return io.TextIOWrapper(raw, encoding=encoding, newline=newline)
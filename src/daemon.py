@@ -0,0 +1,450 @@
+"""
+daemon.py
+
+Demonio de validación de larga duración sobre un socket Unix.
+
+El demonio mantiene cargados sanitizadores, transformaciones y validadores con
+sus cachés calientes, y un pool de procesos creado (y calentado) al arrancar.
+Los clientes envían trabajos como JSON por línea:
+
+    {"op": "validate", "payload": {...}}          una transacción
+    {"op": "records"} + NDJSON + línea vacía       un stream de transacciones
+    {"op": "file", "path": "entrada.csv.gz"}       un archivo, en el pool
+    {"op": "ping"} / {"op": "stats"} / {"op": "shutdown"}
+
+Cada petición recibe una línea JSON con "ok". Este módulo solo importa la
+biblioteca estándar al cargarse, para que el cliente arranque rápido.
+"""
+
+import json
+import os
+import socket
+import socketserver
+import stat
+import tempfile
+import threading
+import time
+from typing import Any, Iterable, Iterator, Optional
+
+def default_socket() -> str:
+    """
+    Ruta del socket por defecto, en un directorio que solo el usuario puede escribir.
+
+    $VALIDATION_SOCKET tiene prioridad; si no, se usa $XDG_RUNTIME_DIR o un
+    directorio privado (0700) en el directorio temporal. Una ruta fija en /tmp
+    podría ocuparla otro usuario y recibir los payloads del cliente.
+
+    Raises:
+        RuntimeError: Si el directorio privado existe y no es del usuario o no es 0700.
+    """
+    path = os.environ.get("VALIDATION_SOCKET")
+    if path:
+        return path
+    runtime = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime and os.path.isdir(runtime):
+        return os.path.join(runtime, "validacion.sock")
+    directory = os.path.join(tempfile.gettempdir(), f"validacion-{os.getuid()}")
+    try:
+        os.mkdir(directory, 0o700)
+    except FileExistsError:
+        pass
+    st = os.lstat(directory)
+    if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid() or st.st_mode & 0o077:
+        raise RuntimeError(f"{directory} is not a private directory owned by the current user")
+    return os.path.join(directory, "daemon.sock")
+
+# Transacción usada para calentar cachés y expresiones regulares
+_WARM_RECORD = {
+    'Transaction_ID': 'W0', 'Card_ID': 'C0', 'Timestamp': '11/20/2025 21:47',
+    'Amount': '1.0', 'Merchant_City': 'Colima', 'Merchant_Country': 'Mexico',
+    'Latitude': '19.24', 'Longitude': '-103.72', 'Device_ID': 'D0', 'Channel': 'POS',
+    'Entry_Mode': 'CHIP', 'Auth_Method': 'PIN', 'Merchant_Category': 'Food',
+    'Transaction_Status': 'Approved',
+}
+
+def _warm() -> int:
+    """
+    Importa y ejercita la pila de validación; devuelve el pid del proceso.
+    """
+    # pylint: disable=import-outside-toplevel
+    from src.pipeline import run_pipeline  # noqa: F401
+    from src.sanitizers import sanitize_input
+    from src.transforms import transform_batch
+    from src.validation import validate_transaction
+    validate_transaction(transform_batch([sanitize_input(_WARM_RECORD)])[0])
+    return os.getpid()
+
+def _run_file(path: str, options: dict[str, Any]) -> dict[str, Any]:
+    """
+    Procesa un archivo con run_pipeline dentro de un worker del pool.
+    """
+    from src.pipeline import run_pipeline  # pylint: disable=import-outside-toplevel
+    return run_pipeline(path, **options)
+
+def _pid(_: int) -> int:
+    # La pausa reparte las tareas de arranque entre todos los workers
+    time.sleep(0.01)
+    return os.getpid()
+
+# Valores distintos por columna que memoriza el interner del demonio: los
+# payloads de validate y records no son confiables y el proceso no termina
+INTERNER_MAX_VALUES = 1000
+
+# Opciones de run_pipeline que acepta el trabajo 'file'
+_FILE_OPTIONS = ("valid_path", "errors_path", "chunk_size", "coerce", "adaptive")
+
+class _Handler(socketserver.StreamRequestHandler):
+    """
+    Atiende una conexión: varias peticiones JSON, una por línea.
+    """
+    def handle(self) -> None:
+        daemon: ValidationDaemon = self.server.daemon  # type: ignore[attr-defined]
+        lines = (raw.decode("utf-8") for raw in self.rfile)
+        for line in lines:
+            if not line.strip():
+                continue
+            op = None
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise ValueError("Request must be a JSON object")
+            except ValueError as e:
+                response = {"ok": False, "error": f"Invalid request: {e}"}
+            else:
+                op = request.get("op")
+                response = daemon.handle(request, lines)
+            self.wfile.write(json.dumps(response, ensure_ascii=False, default=str).encode("utf-8")
+                             + b"\n")
+            self.wfile.flush()
+            if op == "shutdown":
+                return
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+class ValidationDaemon:
+    """
+    Servidor de validación con pila caliente y pool de procesos pre-creado.
+
+    Args:
+        socket_path (str, optional): Ruta del socket Unix; por defecto default_socket().
+        workers (int): Procesos del pool para trabajos de archivo.
+    """
+    def __init__(self, socket_path: Optional[str] = None, workers: int = 2):
+        self.socket_path = socket_path or default_socket()
+        self.workers = workers
+        self.started = time.time()
+        self.pool = None
+        self.worker_pids: list[int] = []
+        self._pool_lock = threading.Lock()
+        self._server: Optional[_Server] = None
+        self._interner = None
+        self._metrics = None
+
+    def start(self) -> None:
+        """
+        Crea y calienta el pool y la pila local, y abre el socket.
+        """
+        # pylint: disable=import-outside-toplevel
+        from src.interning import CategoricalInterner
+        from src.metrics import MetricsRegistry
+        self._prepare_socket()
+        _warm()
+        self._interner = CategoricalInterner(max_values=INTERNER_MAX_VALUES)
+        self._interner.sanitize_row(_WARM_RECORD)
+        self._metrics = MetricsRegistry()
+        # El pool se crea antes que los hilos del servidor y se calienta en cada worker
+        self.pool = self._new_pool()
+        # El socket nace con permisos 0600 (sin ventana entre bind y chmod)
+        umask = os.umask(0o177)
+        try:
+            self._server = _Server(self.socket_path, _Handler)
+        finally:
+            os.umask(umask)
+        self._server.daemon = self  # type: ignore[attr-defined]
+
+    def _new_pool(self):
+        """
+        Pool de procesos creado y calentado; actualiza worker_pids.
+        """
+        from concurrent.futures import ProcessPoolExecutor  # pylint: disable=import-outside-toplevel
+        pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_warm)
+        self.worker_pids = sorted(set(pool.map(_pid, range(self.workers * 2))))
+        return pool
+
+    def _replace_pool(self, broken):
+        """
+        Reemplaza el pool si sigue siendo el que se rompió (un worker murió).
+        """
+        with self._pool_lock:
+            if self.pool is broken:
+                broken.shutdown(wait=False, cancel_futures=True)
+                self.pool = self._new_pool()
+                self._metrics.counter("daemon_pool_restarts_total",
+                                      "Pools recreados tras la caída de un worker").inc()
+            return self.pool
+
+    def _prepare_socket(self) -> None:
+        try:
+            st = os.lstat(self.socket_path)
+        except FileNotFoundError:
+            return
+        # Solo se borra un socket huérfano, nunca un archivo que esté en esa ruta
+        if not stat.S_ISSOCK(st.st_mode):
+            raise RuntimeError(f"{self.socket_path} exists and is not a socket")
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self.socket_path)
+        except ConnectionRefusedError:
+            # Socket huérfano de una ejecución anterior
+            os.unlink(self.socket_path)
+        except OSError as e:
+            raise RuntimeError(f"Cannot reuse socket {self.socket_path}: {e}") from e
+        else:
+            raise RuntimeError(f"A daemon is already listening on {self.socket_path}")
+        finally:
+            probe.close()
+
+    def serve_forever(self) -> None:
+        """
+        Atiende conexiones hasta shutdown().
+        """
+        self._server.serve_forever(poll_interval=0.1)
+
+    def shutdown(self) -> None:
+        """
+        Detiene serve_forever (llamar desde otro hilo).
+        """
+        if self._server is not None:
+            self._server.shutdown()
+
+    def close(self) -> None:
+        """
+        Cierra el socket y el pool.
+        """
+        if self._server is not None:
+            self._server.server_close()
+            self._server = None
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+            self.pool = None
+
+    def __enter__(self) -> 'ValidationDaemon':
+        self.start()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def handle(self, request: dict[str, Any], lines: Iterator[str]) -> dict[str, Any]:
+        """
+        Ejecuta una petición y devuelve la respuesta.
+
+        Args:
+            request (dict): Petición con 'op'.
+            lines (Iterator[str]): Resto de la conexión (para 'records').
+
+        Returns:
+            dict: Respuesta con 'ok' y el resultado o el error.
+        """
+        op = request.get("op")
+        start = time.perf_counter()
+        try:
+            handler = getattr(self, f"_op_{op}", None) if isinstance(op, str) else None
+            if handler is None:
+                raise ValueError(f"Unknown op: {op}")
+            response = {"ok": True, **handler(request, lines)}
+        except Exception as e:  # pylint: disable=broad-except
+            response = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+        self._metrics.counter("daemon_jobs_total", "Trabajos por operación y resultado",
+                              ("op", "ok")).inc(op=str(op), ok=str(response["ok"]).lower())
+        self._metrics.histogram("daemon_job_seconds", "Duración de cada trabajo", ("op",)).observe(
+            time.perf_counter() - start, op=str(op))
+        return response
+
+    def _validate_one(self, record: dict[str, Any], transform: bool) -> dict[str, Any]:
+        # pylint: disable=import-outside-toplevel
+        from returns.result import Success
+        from src.records import materialize
+        from src.transforms import transform_batch
+        from src.validation import validate_transaction
+        clean = self._interner.sanitize_row(record)
+        if transform:
+            clean = transform_batch([clean])[0]
+        result = validate_transaction(clean)
+        if isinstance(result, Success):
+            return {"status": "success", "data": materialize(result.unwrap())}
+        return {"status": "failure", "error": str(result.failure())}
+
+    def _op_ping(self, request: dict[str, Any], lines: Iterator[str]) -> dict[str, Any]:
+        return {"pid": os.getpid(), "workers": self.worker_pids}
+
+    def _op_stats(self, request: dict[str, Any], lines: Iterator[str]) -> dict[str, Any]:
+        return {
+            "uptime_seconds": time.time() - self.started,
+            "workers": self.worker_pids,
+            "interner": {"hits": self._interner.hits, "misses": self._interner.misses},
+            "metrics": self._metrics.snapshot(),
+        }
+
+    def _op_shutdown(self, request: dict[str, Any], lines: Iterator[str]) -> dict[str, Any]:
+        # shutdown() espera a serve_forever, así que se llama desde otro hilo
+        threading.Thread(target=self.shutdown, daemon=True).start()
+        return {"stopping": True}
+
+    def _op_validate(self, request: dict[str, Any], lines: Iterator[str]) -> dict[str, Any]:
+        payload = request.get("payload")
+        if not isinstance(payload, dict):
+            raise ValueError("validate requires a 'payload' object")
+        return self._validate_one(payload, bool(request.get("transform")))
+
+    def _op_records(self, request: dict[str, Any], lines: Iterator[str]) -> dict[str, Any]:
+        from src.error_sink import ErrorSink  # pylint: disable=import-outside-toplevel
+        transform = bool(request.get("transform"))
+        want_results = bool(request.get("results"))
+        sink = ErrorSink()
+        results = []
+        total = valid = 0
+        # El stream termina con una línea vacía (o al cerrar la escritura)
+        for line in lines:
+            if not line.strip():
+                break
+            try:
+                record = json.loads(line)
+                if not isinstance(record, dict):
+                    raise ValueError("record is not a JSON object")
+            except ValueError as e:
+                result = {"status": "failure", "error": f"Invalid JSON: {e}"}
+            else:
+                # Un registro que rompe la pila es un fallo suyo: el resto del stream se sigue leyendo
+                try:
+                    result = self._validate_one(record, transform)
+                except Exception as e:  # pylint: disable=broad-except
+                    result = {"status": "failure", "error": f"{type(e).__name__}: {e}"}
+            if result["status"] == "success":
+                valid += 1
+            else:
+                sink.add(total, result["error"])
+            if want_results:
+                results.append(result)
+            total += 1
+        summary = sink.summary()
+        out = {"total": total, "valid": valid, "errors": summary["total"],
+               "error_counts": summary["by_message"]}
+        if want_results:
+            out["results"] = results
+        return out
+
+    def _op_file(self, request: dict[str, Any], lines: Iterator[str]) -> dict[str, Any]:
+        path = request.get("path")
+        if not isinstance(path, str) or not os.path.isfile(path):
+            raise FileNotFoundError(path)
+        # pylint: disable=import-outside-toplevel
+        from concurrent.futures.process import BrokenProcessPool
+        options = {k: request[k] for k in _FILE_OPTIONS if k in request}
+        pool = self.pool
+        try:
+            future = pool.submit(_run_file, path, options)
+        except BrokenProcessPool:
+            pool = self._replace_pool(pool)
+            future = pool.submit(_run_file, path, options)
+        try:
+            return future.result()
+        except BrokenProcessPool:
+            # Este trabajo falla, pero los siguientes usan un pool nuevo
+            self._replace_pool(pool)
+            raise
+
+class DaemonClient:
+    """
+    Cliente del demonio: una conexión persistente, una petición a la vez.
+
+    Args:
+        socket_path (str, optional): Ruta del socket Unix; por defecto default_socket().
+        timeout (float, optional): Segundos de espera por respuesta.
+    """
+    def __init__(self, socket_path: Optional[str] = None, timeout: Optional[float] = None):
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.settimeout(timeout)
+        self._sock.connect(socket_path or default_socket())
+        self._reader = self._sock.makefile("rb")
+
+    def _send(self, obj: dict[str, Any]) -> None:
+        self._sock.sendall(json.dumps(obj, ensure_ascii=False).encode("utf-8") + b"\n")
+
+    def _receive(self) -> dict[str, Any]:
+        line = self._reader.readline()
+        if not line:
+            raise ConnectionError("Daemon closed the connection")
+        return json.loads(line)
+
+    def request(self, obj: dict[str, Any]) -> dict[str, Any]:
+        """
+        Envía una petición y devuelve su respuesta.
+        """
+        self._send(obj)
+        return self._receive()
+
+    def ping(self) -> dict[str, Any]:
+        """
+        Comprueba que el demonio responde.
+        """
+        return self.request({"op": "ping"})
+
+    def validate(self, payload: dict[str, Any], transform: bool = False) -> dict[str, Any]:
+        """
+        Valida una transacción.
+        """
+        return self.request({"op": "validate", "payload": payload, "transform": transform})
+
+    def validate_records(self, records: Iterable[Any], results: bool = False,
+                         transform: bool = False) -> dict[str, Any]:
+        """
+        Envía un stream de transacciones (dicts o líneas NDJSON) y devuelve el resumen.
+        """
+        self._send({"op": "records", "results": results, "transform": transform})
+        chunk = []
+        for record in records:
+            line = record if isinstance(record, str) else json.dumps(record, ensure_ascii=False)
+            line = line.strip()
+            if line:
+                chunk.append(line.encode("utf-8") + b"\n")
+            if len(chunk) >= 1000:
+                self._sock.sendall(b"".join(chunk))
+                chunk = []
+        chunk.append(b"\n")
+        self._sock.sendall(b"".join(chunk))
+        return self._receive()
+
+    def validate_file(self, path: str, **options: Any) -> dict[str, Any]:
+        """
+        Procesa un archivo en el pool del demonio (la ruta se resuelve en el demonio).
+        """
+        return self.request({"op": "file", "path": os.path.abspath(path), **options})
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Tiempo activo, workers, caché y métricas del demonio.
+        """
+        return self.request({"op": "stats"})
+
+    def shutdown(self) -> dict[str, Any]:
+        """
+        Pide al demonio que termine.
+        """
+        return self.request({"op": "shutdown"})
+
+    def close(self) -> None:
+        """
+        Cierra la conexión.
+        """
+        self._reader.close()
+        self._sock.close()
+
+    def __enter__(self) -> 'DaemonClient':
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
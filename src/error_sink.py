@@ -0,0 +1,144 @@
+"""
+error_sink.py
+
+Destino acotado para los errores de validación.
+
+Mantiene en memoria conteos exactos por tipo de error y una muestra por
+reservoir sampling de filas de ejemplo; el detalle completo se escribe a disco
+de forma incremental. La memoria no crece aunque fallen todas las filas.
+"""
+
+import csv
+import random
+from collections import Counter
+from typing import Any, Optional
+
+from src.compression import open_text
+
+OTHER = "Other"
+
+def error_type(message: str) -> str:
+    """
+    Tipo de un mensaje de error: el texto antes del primer ':'.
+
+    'Amount failed: Amount must be positive' -> 'Amount failed'
+    """
+    return message.split(":", 1)[0]
+
+class ErrorSink:
+    """
+    Registra errores con memoria acotada.
+
+    Args:
+        spill_path (str, optional): CSV (row, error) donde se escribe el detalle;
+            se comprime si termina en .gz, .bz2, .xz o .zst.
+        samples_per_type (int): Filas de ejemplo conservadas por tipo de error.
+        max_spill_per_type (int, optional): Máximo de errores escritos a disco por tipo.
+        max_types (int): Tipos distintos con conteo propio; el resto se agrupa en 'Other'.
+        max_messages (int): Mensajes distintos con conteo propio.
+        flush_every (int): Errores en buffer antes de escribir a disco.
+        seed (int): Semilla del muestreo.
+    """
+    def __init__(self, spill_path: Optional[str] = None, samples_per_type: int = 5,
+                 max_spill_per_type: Optional[int] = None, max_types: int = 100,
+                 max_messages: int = 100, flush_every: int = 1000, seed: int = 0):
+        self.spill_path = spill_path
+        self.samples_per_type = samples_per_type
+        self.max_spill_per_type = max_spill_per_type
+        self.max_types = max_types
+        self.max_messages = max_messages
+        self.flush_every = flush_every
+        self.total = 0
+        self.counts: Counter = Counter()
+        self.messages: Counter = Counter()
+        self.other_messages = 0
+        self.samples: dict[str, list[dict[str, Any]]] = {}
+        self.spilled: Counter = Counter()
+        self._rng = random.Random(seed)
+        self._buffer: list[tuple[Any, str]] = []
+        self._file = None
+        self._writer = None
+
+    def add(self, row: Any, message: str, record: Optional[dict[str, Any]] = None) -> None:
+        """
+        Registra un error.
+
+        Args:
+            row (Any): Identificador de la fila (índice o número de línea).
+            message (str): Mensaje de error.
+            record (dict, optional): Fila que falló; solo se guarda si entra en la muestra.
+        """
+        self.total += 1
+        t = error_type(message)
+        if t not in self.counts and len(self.counts) >= self.max_types:
+            t = OTHER
+        self.counts[t] += 1
+        if message in self.messages or len(self.messages) < self.max_messages:
+            self.messages[message] += 1
+        else:
+            self.other_messages += 1
+
+        # Reservoir sampling (algoritmo R) por tipo de error
+        sample = self.samples.setdefault(t, [])
+        if len(sample) < self.samples_per_type:
+            sample.append({"row": row, "error": message, "record": record})
+        else:
+            j = self._rng.randrange(self.counts[t])
+            if j < self.samples_per_type:
+                sample[j] = {"row": row, "error": message, "record": record}
+
+        if self.spill_path and (self.max_spill_per_type is None
+                                or self.spilled[t] < self.max_spill_per_type):
+            self.spilled[t] += 1
+            self._buffer.append((row, message))
+            if len(self._buffer) >= self.flush_every:
+                self.flush()
+
+    def flush(self) -> None:
+        """
+        Escribe a disco los errores en buffer.
+        """
+        if not self._buffer:
+            return
+        if self._writer is None:
+            self._file = open_text(self.spill_path, "w", encoding="utf-8", newline="")
+            self._writer = csv.writer(self._file)
+            self._writer.writerow(["row", "error"])
+        self._writer.writerows(self._buffer)
+        self._buffer.clear()
+        self._file.flush()
+
+    def close(self) -> None:
+        """
+        Vacía el buffer y cierra el archivo de detalle.
+        """
+        self.flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._writer = None
+
+    def __enter__(self) -> 'ErrorSink':
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def sample_messages(self) -> list[str]:
+        """
+        Mensajes de las filas de ejemplo, agrupados por tipo.
+        """
+        return [s["error"] for sample in self.samples.values() for s in sample]
+
+    def summary(self) -> dict[str, Any]:
+        """
+        Resumen serializable: totales, conteos por tipo y por mensaje, y ejemplos.
+        """
+        return {
+            "total": self.total,
+            "by_type": dict(self.counts.most_common()),
+            "by_message": dict(self.messages.most_common()),
+            "other_messages": self.other_messages,
+            "samples": {t: [{"row": s["row"], "error": s["error"]} for s in sample]
+                        for t, sample in self.samples.items()},
+        }
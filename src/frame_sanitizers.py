@@ -0,0 +1,202 @@
+"""
+frame_sanitizers.py
+
+Variantes por columna y por DataFrame de los sanitizadores de sanitizers.py.
+
+Cada columna se factoriza: los valores de texto distintos se transforman una
+sola vez con operaciones .str vectorizadas (con la misma expresión regular y
+los mismos conjuntos de sanitizers.py) y el resultado se expande con los
+códigos. La salida es idéntica a aplicar las
+funciones por fila; los valores que no son str quedan sin cambios.
+
+Requiere pandas; ninguna otra parte del paquete lo importa.
+"""
+
+from typing import Any, Callable, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.sanitizers import (
+    FALSE_STRINGS, NUMERIC_RE, TRUE_STRINGS, _convert_numeric_fields, _normalize_country,
+)
+
+def _per_value(stage: Callable, key: str = 'v') -> Callable[[Any], Any]:
+    """
+    Convierte un sanitizador de dict en una función de un solo valor.
+    """
+    def fn(v: Any) -> Any:
+        d = {key: v}
+        stage(d)
+        return d[key]
+    return fn
+
+_to_number = _per_value(_convert_numeric_fields)
+_country = _per_value(_normalize_country, 'Merchant_Country')
+
+def _string_mask(s: pd.Series) -> np.ndarray:
+    """
+    Posiciones con valores str (los sanitizadores por fila solo tocan esos).
+    """
+    if s.dtype == object:
+        if pd.api.types.infer_dtype(s, skipna=True) == 'string':
+            return s.notna().to_numpy()
+        return np.fromiter((isinstance(v, str) for v in s), bool, len(s))
+    if pd.api.types.is_string_dtype(s.dtype):
+        return s.notna().to_numpy()
+    return np.zeros(len(s), dtype=bool)
+
+def _map_strings(s: pd.Series, transform: Callable[[pd.Series], Any],
+                 other: Optional[Callable[[Any], Any]] = None) -> pd.Series:
+    """
+    Aplica transform a los valores str distintos de la columna y expande el resultado.
+
+    Args:
+        s (Series): Columna.
+        transform (Callable): Recibe los strings únicos (Series de object) y
+            devuelve sus nuevos valores en el mismo orden.
+        other (Callable, optional): Función por valor para lo que no es str.
+
+    Returns:
+        Series: Columna nueva (dtype object si cambió algo).
+    """
+    mask = _string_mask(s)
+    if not mask.any() and other is None:
+        return s
+    values = s.to_numpy(dtype=object, copy=True)
+    if mask.any():
+        codes, uniques = pd.factorize(values[mask])
+        mapped = transform(pd.Series(uniques, dtype=object))
+        new = np.empty(len(uniques), dtype=object)
+        new[:] = list(mapped)
+        values[mask] = new[codes]
+    if other is not None:
+        rest = np.flatnonzero(~mask)
+        for i in rest:
+            values[i] = other(values[i])
+    return pd.Series(values, index=s.index, name=s.name, dtype=object)
+
+def _strip_text(u: pd.Series) -> pd.Series:
+    return u.str.strip().str.replace('\n', ' ', regex=False).str.replace('\r', '', regex=False)
+
+def _escape(u: pd.Series) -> pd.Series:
+    # Mismo orden de reemplazos que html.escape(quote=True)
+    return (u.str.replace('&', '&amp;', regex=False)
+            .str.replace('<', '&lt;', regex=False)
+            .str.replace('>', '&gt;', regex=False)
+            .str.replace('"', '&quot;', regex=False)
+            .str.replace("'", '&#x27;', regex=False))
+
+def _numbers(u: pd.Series, booleans: bool = False) -> np.ndarray:
+    """
+    Convierte los strings numéricos a float y, si booleans, las palabras a bool.
+    """
+    values = u.to_numpy(dtype=object, copy=True)
+    stripped = u.str.strip()
+    numeric = stripped.str.match(NUMERIC_RE).to_numpy(dtype=bool)
+    idx = np.flatnonzero(numeric)
+    if len(idx):
+        try:
+            # astype(float) llama a float() por elemento, igual que la versión por fila
+            values[idx] = values[idx].astype(float)
+        except ValueError:
+            for i in idx:
+                values[i] = _to_number(values[i])
+    if booleans:
+        lower = stripped.str.lower().to_numpy(dtype=object)
+        rest = ~numeric
+        values[rest & np.isin(lower, list(TRUE_STRINGS))] = True
+        values[rest & np.isin(lower, list(FALSE_STRINGS))] = False
+    return values
+
+def _booleans(u: pd.Series) -> np.ndarray:
+    values = u.to_numpy(dtype=object, copy=True)
+    lower = u.str.strip().str.lower().to_numpy(dtype=object)
+    values[np.isin(lower, list(TRUE_STRINGS))] = True
+    values[np.isin(lower, list(FALSE_STRINGS))] = False
+    return values
+
+def sanitize_text_column(s: pd.Series) -> pd.Series:
+    """
+    Columna con espacios y saltos de línea limpiados (como sanitize_text_fields).
+    """
+    return _map_strings(s, _strip_text)
+
+def escape_html_column(s: pd.Series) -> pd.Series:
+    """
+    Columna con caracteres HTML escapados (como escape_html).
+    """
+    return _map_strings(s, _escape)
+
+def convert_numeric_column(s: pd.Series) -> pd.Series:
+    """
+    Columna con los strings numéricos convertidos a float (como convert_numeric_fields).
+    """
+    return _map_strings(s, _numbers)
+
+def convert_booleans_column(s: pd.Series) -> pd.Series:
+    """
+    Columna con 'true'/'yes'/'1' y 'false'/'no'/'0' convertidos (como convert_booleans).
+    """
+    return _map_strings(s, _booleans)
+
+def normalize_country_column(s: pd.Series) -> pd.Series:
+    """
+    Columna de países normalizada a códigos (como normalize_country).
+    """
+    return _map_strings(s, lambda u: [_country(v) for v in u], other=_country)
+
+def _sanitize_value_column(s: pd.Series) -> pd.Series:
+    """
+    Las cuatro etapas por valor de sanitize_input en una sola factorización.
+    """
+    return _map_strings(s, lambda u: _numbers(_escape(_strip_text(u)), booleans=True))
+
+def _apply_columns(df: pd.DataFrame, column_fn: Callable[[pd.Series], pd.Series]) -> pd.DataFrame:
+    out = df.copy()
+    for name in out.columns:
+        out[name] = column_fn(out[name])
+    return out
+
+def sanitize_text_fields(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Variante por DataFrame de sanitizers.sanitize_text_fields.
+    """
+    return _apply_columns(df, sanitize_text_column)
+
+def escape_html(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Variante por DataFrame de sanitizers.escape_html.
+    """
+    return _apply_columns(df, escape_html_column)
+
+def convert_numeric_fields(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Variante por DataFrame de sanitizers.convert_numeric_fields.
+    """
+    return _apply_columns(df, convert_numeric_column)
+
+def convert_booleans(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Variante por DataFrame de sanitizers.convert_booleans.
+    """
+    return _apply_columns(df, convert_booleans_column)
+
+def normalize_country(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Variante por DataFrame de sanitizers.normalize_country.
+
+    Igual que la versión por fila, agrega 'Merchant_Country' vacío si no existe.
+    """
+    out = df.copy()
+    if 'Merchant_Country' in out.columns:
+        out['Merchant_Country'] = normalize_country_column(out['Merchant_Country'])
+    else:
+        out['Merchant_Country'] = ''
+    return out
+
+def sanitize_input(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Variante por DataFrame de sanitizers.sanitize_input; no modifica df.
+    """
+    return normalize_country(_apply_columns(df, _sanitize_value_column))
@@ -0,0 +1,152 @@
+"""
+interning.py
+
+Internado de columnas categóricas de baja cardinalidad.
+
+Campos como 'Channel' o 'Merchant_Country' solo toman unas decenas de valores
+distintos. En lugar de sanitizar y guardar un string nuevo por fila, cada valor
+crudo se sanitiza una sola vez y todas las filas comparten el mismo objeto
+canónico (y opcionalmente un código entero pequeño).
+"""
+
+import sys
+import threading
+from typing import Any, Iterable, Optional
+
+from src.sanitizers import sanitize_input, sanitize_owned
+
+CATEGORICAL_FIELDS: tuple[str, ...] = (
+    'Channel',
+    'Entry_Mode',
+    'Auth_Method',
+    'Merchant_Category',
+    'Transaction_Status',
+    'Merchant_Country',
+    'Channel_Type',
+)
+
+class CategoricalInterner:
+    """
+    Diccionario compartido por columna que devuelve valores canónicos.
+
+    Cada valor crudo distinto pasa por sanitize_input una única vez; el
+    resultado se guarda en caché y se reutiliza en las filas siguientes.
+
+    Args:
+        fields (Iterable[str]): Columnas categóricas.
+        max_values (int, optional): Valores crudos distintos que se guardan por
+            columna. Con la caché llena los valores nuevos se sanitizan sin
+            guardarse ni internarse, así que un proceso de larga vida con entrada
+            no confiable no crece sin límite. None no pone límite.
+    """
+    def __init__(self, fields: Iterable[str] = CATEGORICAL_FIELDS,
+                 max_values: Optional[int] = None):
+        if max_values is not None and max_values <= 0:
+            raise ValueError("max_values must be positive")
+        self.fields = frozenset(fields)
+        self.max_values = max_values
+        self._sanitized: dict[str, dict[str, Any]] = {f: {} for f in self.fields}
+        self._codes: dict[str, dict[Any, int]] = {f: {} for f in self.fields}
+        self._categories: dict[str, list[Any]] = {f: [] for f in self.fields}
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def sanitize(self, field: str, raw: str) -> Any:
+        """
+        Devuelve el valor sanitizado y canónico de un valor crudo.
+
+        Args:
+            field (str): Columna categórica.
+            raw (str): Valor tal como llega en la entrada.
+
+        Returns:
+            Any: El mismo objeto para todas las apariciones del valor.
+        """
+        cache = self._sanitized[field]
+        try:
+            value = cache[raw]
+            self.hits += 1
+            return value
+        except KeyError:
+            pass
+        self.misses += 1
+        # Se reutiliza el sanitizador por fila para que el resultado sea idéntico
+        value = sanitize_input({field: raw})[field]
+        if self.max_values is not None and len(cache) >= self.max_values:
+            return value
+        if isinstance(value, str):
+            value = sys.intern(value)
+        cache[raw] = value
+        self.code(field, value)
+        return value
+
+    def code(self, field: str, value: Any) -> int:
+        """
+        Devuelve el código entero asignado a un valor canónico de la columna.
+        """
+        codes = self._codes[field]
+        c = codes.get(value)
+        if c is None:
+            # Los workers de sanitize comparten el interner: un valor nuevo recibe un solo código
+            with self._lock:
+                c = codes.get(value)
+                if c is None:
+                    c = codes[value] = len(codes)
+                    self._categories[field].append(value)
+        return c
+
+    def categories(self, field: str) -> list[Any]:
+        """
+        Lista de valores canónicos de la columna, indexada por código.
+        """
+        return list(self._categories[field])
+
+    def sanitize_row(self, d: dict[str, Any], country: bool = True) -> dict[str, Any]:
+        """
+        Sanitiza una fila usando la caché para las columnas categóricas.
+
+        El resultado es equivalente a sanitize_input(d): las columnas internadas
+        toman su valor de la caché y el resto pasa por el sanitizador normal.
+
+        Args:
+            d (dict): Fila cruda.
+            country (bool): Normaliza 'Merchant_Country' (y lo agrega si falta).
+
+        Returns:
+            dict: Fila sanitizada.
+        """
+        cached: dict[str, Any] = {}
+        rest: dict[str, Any] = {}
+        for k, v in d.items():
+            # La caché de países guarda valores ya normalizados
+            if k in self.fields and isinstance(v, str) and (country or k != 'Merchant_Country'):
+                cached[k] = self.sanitize(k, v)
+            else:
+                rest[k] = v
+        # rest es una copia privada: se sanitiza en el lugar, sin capa de RecordView.
+        # normalize_country agrega 'Merchant_Country' al resto; el valor en caché tiene prioridad
+        sanitized = sanitize_owned(rest, country)
+        out = {k: cached[k] if k in cached else sanitized[k] for k in d}
+        for k, v in sanitized.items():
+            if k not in out:
+                out[k] = v
+        return out
+
+    def encode_row(self, d: dict[str, Any]) -> dict[str, Any]:
+        """
+        Reemplaza las columnas categóricas por su código entero.
+        """
+        return {
+            k: self.code(k, v) if k in self.fields else v
+            for k, v in d.items()
+        }
+
+    def decode_row(self, d: dict[str, Any]) -> dict[str, Any]:
+        """
+        Operación inversa de encode_row.
+        """
+        return {
+            k: self._categories[k][v] if k in self.fields else v
+            for k, v in d.items()
+        }
@@ -0,0 +1,227 @@
+"""
+loadtest.py
+
+Generador de carga local para el servicio de validación.
+
+Levanta la API con uvicorn en un subproceso, genera transacciones válidas e
+inválidas y las envía desde varios hilos con conexiones HTTP persistentes
+(http.client). Reporta throughput y latencias p50/p95/p99 por escenario:
+'single' envía un registro por petición a /validate y 'bulk' envía lotes a
+/validate/bulk.
+"""
+
+import http.client
+import json
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
+
+APP = "examples.api_validation:create_app"
+
+SCENARIOS = ("single", "bulk")
+
+# Tipos de transacción inválida que genera make_payload
+INVALID_KINDS = ("amount", "timestamp", "country", "missing")
+
+_CITIES = (("Colima", "Mexico", 19.24, -103.72), ("Toronto", "Canada", 43.65, -79.38),
+           ("Mumbai", "India", 19.07, 72.87), ("London", "UK", 51.50, -0.12),
+           ("Dubai", "UAE", 25.20, 55.27), ("Austin", "USA", 30.27, -97.74))
+
+def make_payload(rng: random.Random, i: int, invalid_ratio: float = 0.2) -> dict[str, Any]:
+    """
+    Genera una transacción; con probabilidad invalid_ratio tiene un error.
+
+    Args:
+        rng (random.Random): Generador aleatorio.
+        i (int): Número de la transacción (para los identificadores).
+        invalid_ratio (float): Proporción de transacciones inválidas.
+
+    Returns:
+        dict: Payload listo para enviar como JSON.
+    """
+    city, country, lat, lon = rng.choice(_CITIES)
+    payload: dict[str, Any] = {
+        'Transaction_ID': f'LT{i}', 'Card_ID': f'C{rng.randrange(10_000)}',
+        'Timestamp': f'{rng.randint(1, 12):02d}/{rng.randint(1, 28):02d}/2025 '
+                     f'{rng.randrange(24):02d}:{rng.randrange(60):02d}',
+        'Amount': round(rng.uniform(1, 5000), 2), 'Merchant_City': city,
+        'Merchant_Country': country, 'Latitude': lat, 'Longitude': lon,
+        'Device_ID': f'D{rng.randrange(100)}', 'Channel': rng.choice(('POS', 'ONLINE', 'ATM')),
+        'Entry_Mode': rng.choice(('CHIP', 'SWIPE', 'NFC')), 'Auth_Method': rng.choice(('PIN', 'OTP')),
+        'Merchant_Category': rng.choice(('Food', 'Travel', 'Retail')),
+        'Transaction_Status': rng.choice(('Approved', 'Declined')),
+    }
+    if rng.random() < invalid_ratio:
+        kind = rng.choice(INVALID_KINDS)
+        if kind == 'amount':
+            payload['Amount'] = -payload['Amount']
+        elif kind == 'timestamp':
+            payload['Timestamp'] = '2025-11-20T21:47:00'
+        elif kind == 'country':
+            payload['Merchant_Country'] = 'Brazil'
+        else:
+            del payload['Card_ID']
+    return payload
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    """
+    Percentil q (0-100) por rango más cercano de una lista ordenada.
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(1, round(q / 100 * len(sorted_values) + 0.5 - 1e-9))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+def free_port() -> int:
+    """
+    Puerto TCP libre en localhost.
+    """
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+@contextmanager
+def local_server(port: Optional[int] = None, app: str = APP, workers: int = 1,
+                 timeout: float = 20.0) -> Iterator[int]:
+    """
+    Levanta el servicio con uvicorn en un subproceso y espera a que responda.
+
+    Args:
+        port (int, optional): Puerto; por defecto uno libre.
+        app (str): Fábrica de la aplicación (se usa --factory).
+        workers (int): Procesos de uvicorn.
+        timeout (float): Segundos máximos de espera al arranque.
+
+    Returns:
+        Iterator[int]: El puerto del servidor, mientras dure el bloque with.
+    """
+    port = port or free_port()
+    cmd = [sys.executable, "-m", "uvicorn", app, "--factory", "--host", "127.0.0.1",
+           "--port", str(port), "--workers", str(workers), "--log-level", "warning"]
+    proc = subprocess.Popen(cmd)  # pylint: disable=consider-using-with
+    try:
+        deadline = time.monotonic() + timeout
+        while True:
+            if proc.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with code {proc.returncode}")
+            try:
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+                conn.request("GET", "/metrics")
+                conn.getresponse().read()
+                conn.close()
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.1)
+        yield port
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+
+def _client(host: str, port: int, path: str, bodies: list[bytes],
+            latencies: list[float], failures: list[int]) -> None:
+    """
+    Envía las peticiones de un hilo por una conexión persistente.
+    """
+    conn = http.client.HTTPConnection(host, port, timeout=30)
+    headers = {"Content-Type": "application/json"}
+    try:
+        for body in bodies:
+            start = time.perf_counter()
+            try:
+                conn.request("POST", path, body=body, headers=headers)
+                response = conn.getresponse()
+                response.read()
+                ok = response.status == 200
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                conn = http.client.HTTPConnection(host, port, timeout=30)
+                ok = False
+            latencies.append(time.perf_counter() - start)
+            if not ok:
+                failures.append(1)
+    finally:
+        conn.close()
+
+def run_load(host: str, port: int, scenario: str = "single", concurrency: int = 8,
+             requests: int = 1000, batch_size: int = 100, invalid_ratio: float = 0.2,
+             seed: int = 0) -> dict[str, Any]:
+    """
+    Ejecuta un escenario de carga contra un servidor en marcha.
+
+    Args:
+        host (str): Host del servicio.
+        port (int): Puerto del servicio.
+        scenario (str): 'single' (/validate) o 'bulk' (/validate/bulk).
+        concurrency (int): Hilos cliente simultáneos.
+        requests (int): Peticiones totales.
+        batch_size (int): Registros por petición en 'bulk'.
+        invalid_ratio (float): Proporción de transacciones inválidas.
+        seed (int): Semilla de los payloads.
+
+    Returns:
+        dict: Peticiones, registros, errores HTTP, duración, throughput y latencias en ms.
+    """
+    if scenario not in SCENARIOS:
+        raise ValueError(f"Unknown scenario: {scenario}")
+    rng = random.Random(seed)
+    per_request = batch_size if scenario == "bulk" else 1
+    path = "/validate/bulk" if scenario == "bulk" else "/validate"
+    # Los cuerpos se generan antes de medir para no cargar el costo al cliente
+    bodies = []
+    for r in range(requests):
+        records = [make_payload(rng, r * per_request + j, invalid_ratio) for j in range(per_request)]
+        bodies.append(json.dumps(records if scenario == "bulk" else records[0]).encode("utf-8"))
+
+    latencies: list[float] = []
+    failures: list[int] = []
+    threads = [threading.Thread(target=_client,
+                                args=(host, port, path, bodies[i::concurrency], latencies, failures))
+               for i in range(concurrency)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    ordered = sorted(latencies)
+    return {
+        "scenario": scenario,
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "records": len(latencies) * per_request,
+        "http_errors": len(failures),
+        "seconds": elapsed,
+        "requests_per_s": len(latencies) / elapsed if elapsed else 0.0,
+        "records_per_s": len(latencies) * per_request / elapsed if elapsed else 0.0,
+        "latency_ms": {
+            "p50": percentile(ordered, 50) * 1000,
+            "p95": percentile(ordered, 95) * 1000,
+            "p99": percentile(ordered, 99) * 1000,
+            "max": (ordered[-1] if ordered else 0.0) * 1000,
+        },
+    }
+
+def print_load(result: dict[str, Any]) -> None:
+    """
+    Muestra el resultado de un escenario en consola.
+    """
+    lat = result["latency_ms"]
+    print(f"\n Escenario {result['scenario']} (concurrencia {result['concurrency']})")
+    print(f"Peticiones: {result['requests']} ({result['http_errors']} con error HTTP)"
+          f" en {result['seconds']:.2f} s")
+    print(f" Throughput: {result['requests_per_s']:,.0f} peticiones/s,"
+          f" {result['records_per_s']:,.0f} registros/s")
+    print(f" Latencia: p50 {lat['p50']:.1f} ms, p95 {lat['p95']:.1f} ms,"
+          f" p99 {lat['p99']:.1f} ms, máx {lat['max']:.1f} ms")
@@ -0,0 +1,248 @@
+"""
+memory.py
+
+Modo de presupuesto de memoria con tamaño de chunk adaptativo.
+
+Se mide el costo real por fila de cada chunk (con tracemalloc o muestreando el
+RSS del proceso) y el tamaño del siguiente chunk se ajusta para quedar por
+debajo del presupuesto con el mayor throughput posible.
+"""
+
+import os
+import re
+import tracemalloc
+from typing import Any, Optional
+
+_UNITS = {'': 1, 'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+
+def parse_size(text: str) -> int:
+    """
+    Convierte tamaños como '512M', '2G' o '1048576' a bytes.
+    """
+    m = re.fullmatch(r'\s*(\d+(?:\.\d+)?)\s*([KMG]?)i?B?\s*', text, re.IGNORECASE)
+    if not m:
+        raise ValueError(f"Invalid size: {text!r}")
+    return int(float(m.group(1)) * _UNITS[m.group(2).upper()])
+
+class TracemallocProbe:
+    """
+    Mide las asignaciones de Python con tracemalloc (preciso, con overhead).
+
+    Solo cuenta memoria asignada desde start(), no la base del intérprete.
+    """
+    name = 'tracemalloc'
+
+    def __init__(self):
+        self._owner = False
+        self._base = 0
+
+    def start(self) -> None:
+        """
+        Inicia el rastreo si no estaba activo.
+        """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._owner = True
+
+    def begin(self) -> int:
+        """
+        Marca el inicio de un chunk y devuelve la memoria actual.
+        """
+        tracemalloc.reset_peak()
+        self._base = tracemalloc.get_traced_memory()[0]
+        return self._base
+
+    def end(self) -> tuple[int, int]:
+        """
+        Devuelve (memoria actual, pico desde begin()).
+        """
+        return tracemalloc.get_traced_memory()
+
+    def stop(self) -> None:
+        """
+        Detiene el rastreo si lo inició este probe.
+        """
+        if self._owner:
+            tracemalloc.stop()
+            self._owner = False
+
+def _rss_bytes() -> int:
+    """
+    RSS actual del proceso; en sistemas sin /proc se usa el máximo histórico.
+    """
+    try:
+        with open('/proc/self/statm', 'r', encoding='ascii') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except OSError:
+        import resource  # pylint: disable=import-outside-toplevel
+        # ru_maxrss está en KiB en Linux y en bytes en macOS
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss if os.uname().sysname == 'Darwin' else rss * 1024
+
+def _peak_rss_bytes() -> int:
+    """
+    Pico de RSS del proceso (VmHWM); sin /proc se usa ru_maxrss.
+    """
+    try:
+        with open('/proc/self/status', 'r', encoding='ascii') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    import resource  # pylint: disable=import-outside-toplevel
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if os.uname().sysname == 'Darwin' else rss * 1024
+
+def _reset_peak_rss() -> bool:
+    """
+    Reinicia VmHWM al RSS actual (Linux >= 4.0); devuelve False si no se pudo.
+    """
+    try:
+        with open('/proc/self/clear_refs', 'w', encoding='ascii') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+class RssProbe:
+    """
+    Mide el RSS del proceso y su pico durante cada chunk (barato, aproximado).
+
+    A diferencia de tracemalloc, incluye la memoria base del intérprete, por lo
+    que el presupuesto equivale al límite de memoria del contenedor. El pico se
+    lee de VmHWM tras reiniciarlo en begin(), así que cuenta también la memoria
+    que se asigna y se libera dentro del chunk. Si el reinicio no es posible se
+    usa el máximo histórico del proceso, que sobreestima el costo del chunk.
+    """
+    name = 'rss'
+
+    def __init__(self):
+        self._base = 0
+
+    def start(self) -> None:
+        """
+        No requiere inicialización.
+        """
+
+    def begin(self) -> int:
+        """
+        Marca el inicio de un chunk, reinicia el pico y devuelve el RSS actual.
+        """
+        _reset_peak_rss()
+        self._base = _rss_bytes()
+        return self._base
+
+    def end(self) -> tuple[int, int]:
+        """
+        Devuelve (RSS actual, pico de RSS desde begin()).
+        """
+        current = _rss_bytes()
+        return current, max(current, self._base, _peak_rss_bytes())
+
+    def stop(self) -> None:
+        """
+        No requiere limpieza.
+        """
+
+PROBES = {'tracemalloc': TracemallocProbe, 'rss': RssProbe}
+
+class AdaptiveChunker:
+    """
+    Elige el tamaño de cada chunk para respetar un presupuesto de memoria.
+
+    Args:
+        budget (int): Presupuesto en bytes.
+        initial (int): Tamaño del primer chunk.
+        min_size (int): Tamaño mínimo de chunk.
+        max_size (int): Tamaño máximo de chunk.
+        safety (float): Fracción del presupuesto disponible para un chunk.
+        growth (float): Factor máximo de crecimiento entre chunks consecutivos.
+        probe (str): 'tracemalloc' o 'rss'.
+    """
+    def __init__(self, budget: int, initial: int = 1000, min_size: int = 100,
+                 max_size: int = 100_000, safety: float = 0.8, growth: float = 2.0,
+                 probe: str = 'tracemalloc'):
+        if budget <= 0:
+            raise ValueError("Memory budget must be positive")
+        if probe not in PROBES:
+            raise ValueError(f"Unknown memory probe: {probe}")
+        self.budget = budget
+        self.min_size = min_size
+        self.max_size = max_size
+        self.safety = safety
+        self.growth = growth
+        self.probe = PROBES[probe]()
+        self.size = max(min_size, min(initial, max_size))
+        self.per_row: Optional[float] = None
+        self.peak = 0
+        self.chunks = 0
+        self.smallest = self.size
+        self.largest = self.size
+        self.history: list[int] = [self.size]
+        self._base = 0
+
+    def start(self) -> None:
+        """
+        Inicia la medición de memoria.
+        """
+        self.probe.start()
+
+    def stop(self) -> None:
+        """
+        Detiene la medición de memoria.
+        """
+        self.probe.stop()
+
+    def next_size(self) -> int:
+        """
+        Tamaño del siguiente chunk.
+        """
+        return self.size
+
+    def begin(self) -> None:
+        """
+        Llamar antes de leer y procesar cada chunk.
+        """
+        self._base = self.probe.begin()
+
+    def end(self, rows: int) -> None:
+        """
+        Llamar después de procesar un chunk de rows filas; ajusta el siguiente tamaño.
+        """
+        current, peak = self.probe.end()
+        self.peak = max(self.peak, peak)
+        self.chunks += 1
+        if rows <= 0:
+            return
+        cost = max(peak - self._base, 1) / rows
+        # Promedio móvil exponencial para suavizar el ruido de la medición
+        self.per_row = cost if self.per_row is None else 0.5 * self.per_row + 0.5 * cost
+        available = self.budget * self.safety - current
+        target = int(available / self.per_row) if available > 0 else self.min_size
+        target = min(target, int(self.size * self.growth))
+        target = max(self.min_size, min(target, self.max_size))
+        if target != self.size:
+            self.size = target
+            self.smallest = min(self.smallest, target)
+            self.largest = max(self.largest, target)
+            if len(self.history) < 100:
+                self.history.append(target)
+
+    def summary(self) -> dict[str, Any]:
+        """
+        Tamaños elegidos y uso de memoria observado.
+        """
+        return {
+            'budget_bytes': self.budget,
+            'probe': self.probe.name,
+            'peak_bytes': self.peak,
+            'per_row_bytes': self.per_row,
+            'chunks': self.chunks,
+            'chunk_size': {
+                'min': self.smallest,
+                'max': self.largest,
+                'last': self.size,
+                'history': list(self.history),
+            },
+        }
@@ -0,0 +1,372 @@
+"""
+metrics.py
+
+Registro de métricas en proceso: contadores, histogramas y gauges.
+
+Los contadores e histogramas acumulan en un shard por hilo (threading.local),
+así que el camino caliente no toma locks; los shards se suman al leer. Las
+métricas se exportan en formato de texto de Prometheus o como snapshot JSON,
+y los snapshots de otros procesos se pueden combinar con merge().
+"""
+
+import threading
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional, Sequence
+
+from src.error_sink import OTHER
+
+# Límites superiores (segundos) de los buckets de latencia por defecto
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Combinaciones de etiquetas distintas por métrica; el resto se agrupa en 'Other'
+MAX_SERIES = 1000
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Nombre fijo de la regla según el inicio del mensaje; los mensajes llevan
+# valores de la entrada, que no deben llegar a las etiquetas
+FAILURE_RULES = (
+    ("Amount must be positive", "positive"),
+    ("Invalid float", "float"),
+    ("Date must match", "date_format"),
+    ("Country ", "country_allowed"),
+    ("Missing fields", "missing_fields"),
+    ("Unknown record type", "record_type"),
+    ("Unknown schema version", "schema_version"),
+    ("Malformed record", "malformed"),
+)
+
+def failure_labels(message: str) -> tuple[str, str]:
+    """
+    Campo y regla (de un conjunto fijo) de un mensaje de error de validación.
+
+    'Amount failed: Amount must be positive' -> ('Amount', 'positive')
+    'Missing fields: [...]' -> ('', 'missing_fields')
+    'Amount failed: float() argument ...' -> ('Amount', 'invalid_value')
+    """
+    field, sep, detail = message.partition(" failed: ")
+    if not sep:
+        field, detail = "", message
+    for prefix, rule in FAILURE_RULES:
+        if detail.startswith(prefix):
+            return field, rule
+    # Excepciones de validadores como float() o str()
+    return field, "invalid_value" if sep else OTHER
+
+class _Metric(ABC):
+    """
+    Base de las métricas: nombre, ayuda, etiquetas y shards por hilo.
+    """
+    kind = ""
+
+    def __init__(self, name: str, help_text: str = "", labelnames: Sequence[str] = (),
+                 max_series: int = MAX_SERIES):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.max_series = max_series
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._series_lock = threading.Lock()
+        self._series: set[tuple] = set()
+        self._shards: list[tuple[threading.Thread, dict]] = []
+        self._retired: dict[tuple, Any] = {}
+
+    def _shard(self) -> dict:
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = {}
+            with self._lock:
+                self._shards.append((threading.current_thread(), shard))
+            return shard
+
+    def _key(self, labels: dict[str, Any], series: dict) -> tuple:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {list(self.labelnames)}")
+        key = tuple(str(labels[n]) for n in self.labelnames)
+        if key in series:
+            return key
+        # El límite es de la métrica completa, no de cada shard
+        with self._series_lock:
+            if key not in self._series:
+                if len(self._series) >= self.max_series:
+                    return (OTHER,) * len(key)
+                self._series.add(key)
+        return key
+
+    @abstractmethod
+    def _add(self, total: dict, key: tuple, value: Any) -> None:
+        """
+        Acumula value en total[key] según el tipo de métrica.
+        """
+
+    def _collect(self) -> dict[tuple, Any]:
+        """
+        Suma los shards; los de hilos terminados se pliegan en un acumulado.
+        """
+        with self._lock:
+            alive = []
+            for thread, shard in self._shards:
+                if thread.is_alive():
+                    alive.append((thread, shard))
+                else:
+                    for key, value in shard.copy().items():
+                        self._add(self._retired, key, value)
+            self._shards = alive
+            total: dict[tuple, Any] = {}
+            for key, value in self._retired.items():
+                self._add(total, key, value)
+            for _, shard in alive:
+                for key, value in shard.copy().items():
+                    self._add(total, key, value)
+        return total
+
+class Counter(_Metric):
+    """
+    Contador monótono, opcionalmente con etiquetas.
+    """
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        """
+        Suma amount a la serie de las etiquetas dadas.
+        """
+        shard = self._shard()
+        key = self._key(labels, shard)
+        shard[key] = shard.get(key, 0) + amount
+
+    def _add(self, total: dict, key: tuple, value: Any) -> None:
+        total[key] = total.get(key, 0) + value
+
+    def values(self) -> dict[tuple, float]:
+        """
+        Valor actual por combinación de etiquetas.
+        """
+        return self._collect()
+
+class Histogram(_Metric):
+    """
+    Histograma de buckets acumulativos (le), suma y conteo, como en Prometheus.
+    """
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str = "", labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS, max_series: int = MAX_SERIES):
+        super().__init__(name, help_text, labelnames, max_series)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels: Any) -> None:
+        """
+        Registra una observación.
+        """
+        shard = self._shard()
+        key = self._key(labels, shard)
+        entry = shard.get(key)
+        if entry is None:
+            entry = shard[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        entry[0][bisect_left(self.buckets, value)] += 1
+        entry[1] += value
+        entry[2] += 1
+
+    @contextmanager
+    def time(self, **labels: Any) -> Iterator[None]:
+        """
+        Observa la duración en segundos del bloque with.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _add(self, total: dict, key: tuple, value: Any) -> None:
+        entry = total.get(key)
+        if entry is None:
+            total[key] = [list(value[0]), value[1], value[2]]
+        else:
+            entry[0] = [a + b for a, b in zip(entry[0], value[0])]
+            entry[1] += value[1]
+            entry[2] += value[2]
+
+    def values(self) -> dict[tuple, list]:
+        """
+        [conteos por bucket (no acumulados, el último es +Inf), suma, conteo] por serie.
+        """
+        return self._collect()
+
+class Gauge(_Metric):
+    """
+    Valor instantáneo (profundidad de cola, tasa de aciertos de caché).
+
+    Se actualiza con poca frecuencia, así que usa un dict compartido.
+    """
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str = "", labelnames: Sequence[str] = (),
+                 max_series: int = MAX_SERIES):
+        super().__init__(name, help_text, labelnames, max_series)
+        self._values: dict[tuple, float] = {}
+
+    def set(self, value: float, **labels: Any) -> None:
+        """
+        Fija el valor de la serie.
+        """
+        with self._lock:
+            self._values[self._key(labels, self._values)] = value
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        """
+        Suma amount al valor de la serie (puede ser negativo).
+        """
+        with self._lock:
+            key = self._key(labels, self._values)
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _add(self, total: dict, key: tuple, value: Any) -> None:
+        # Un gauge toma el último valor, no la suma
+        total[key] = value
+
+    def _collect(self) -> dict[tuple, float]:
+        with self._lock:
+            return dict(self._values)
+
+    def values(self) -> dict[tuple, float]:
+        """
+        Valor actual por combinación de etiquetas.
+        """
+        return self._collect()
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels_text(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values)) + "}"
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+class MetricsRegistry:
+    """
+    Conjunto de métricas con nombre; counter/histogram/gauge crean o reutilizan.
+    """
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name: str, help_text: str, labelnames: Sequence[str], **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help_text, labelnames, **kwargs)
+            elif not isinstance(metric, cls) or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"Metric {name} already registered with another type or labels")
+            return metric
+
+    def counter(self, name: str, help_text: str = "",
+                labelnames: Sequence[str] = ()) -> Counter:
+        """
+        Contador con el nombre dado.
+        """
+        return self._get(Counter, name, help_text, labelnames)
+
+    def histogram(self, name: str, help_text: str = "", labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        """
+        Histograma con el nombre dado.
+        """
+        return self._get(Histogram, name, help_text, labelnames, buckets=buckets)
+
+    def gauge(self, name: str, help_text: str = "",
+              labelnames: Sequence[str] = ()) -> Gauge:
+        """
+        Gauge con el nombre dado.
+        """
+        return self._get(Gauge, name, help_text, labelnames)
+
+    def get(self, name: str) -> Optional[_Metric]:
+        """
+        Métrica registrada con ese nombre, o None.
+        """
+        return self._metrics.get(name)
+
+    def snapshot(self) -> dict[str, Any]:
+        """
+        Estado serializable a JSON de todas las métricas.
+        """
+        out: dict[str, Any] = {}
+        for name, metric in sorted(self._metrics.items()):
+            entry: dict[str, Any] = {"type": metric.kind, "help": metric.help,
+                                     "labels": list(metric.labelnames)}
+            samples = []
+            for key, value in sorted(metric.values().items()):
+                labels = dict(zip(metric.labelnames, key))
+                if isinstance(metric, Histogram):
+                    samples.append({"labels": labels, "buckets": value[0],
+                                    "sum": value[1], "count": value[2]})
+                else:
+                    samples.append({"labels": labels, "value": value})
+            if isinstance(metric, Histogram):
+                entry["buckets"] = list(metric.buckets)
+            entry["samples"] = samples
+            out[name] = entry
+        return out
+
+    def merge(self, snapshot: dict[str, Any]) -> None:
+        """
+        Suma un snapshot (por ejemplo de otro proceso); los gauges toman su valor.
+        """
+        for name, entry in snapshot.items():
+            labelnames = entry["labels"]
+            if entry["type"] == "counter":
+                metric = self.counter(name, entry["help"], labelnames)
+                for s in entry["samples"]:
+                    metric.inc(s["value"], **s["labels"])
+            elif entry["type"] == "gauge":
+                metric = self.gauge(name, entry["help"], labelnames)
+                for s in entry["samples"]:
+                    metric.set(s["value"], **s["labels"])
+            elif entry["type"] == "histogram":
+                metric = self.histogram(name, entry["help"], labelnames, entry["buckets"])
+                if list(metric.buckets) != list(entry["buckets"]):
+                    raise ValueError(f"Histogram {name} has different buckets")
+                shard = metric._shard()  # pylint: disable=protected-access
+                for s in entry["samples"]:
+                    key = metric._key(s["labels"], shard)  # pylint: disable=protected-access
+                    metric._add(shard, key, [s["buckets"], s["sum"], s["count"]])  # pylint: disable=protected-access
+            else:
+                raise ValueError(f"Unknown metric type: {entry['type']}")
+
+    def to_prometheus(self) -> str:
+        """
+        Exporta todas las métricas en el formato de texto de Prometheus.
+        """
+        lines = []
+        for name, metric in sorted(self._metrics.items()):
+            if metric.help:
+                lines.append(f"# HELP {name} {_escape(metric.help)}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            for key, value in sorted(metric.values().items()):
+                if isinstance(metric, Histogram):
+                    cumulative = 0
+                    for bound, count in zip((*metric.buckets, float("inf")), value[0]):
+                        cumulative += count
+                        labels = _labels_text((*metric.labelnames, "le"), (*key, _number(bound)))
+                        lines.append(f"{name}_bucket{labels} {cumulative}")
+                    labels = _labels_text(metric.labelnames, key)
+                    lines.append(f"{name}_sum{labels} {_number(value[1])}")
+                    lines.append(f"{name}_count{labels} {value[2]}")
+                else:
+                    lines.append(f"{name}{_labels_text(metric.labelnames, key)} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+# Registro por defecto del proceso (lo usa la API)
+REGISTRY = MetricsRegistry()
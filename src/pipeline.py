@@ -0,0 +1,361 @@
+"""
+pipeline.py
+
+Pipeline por chunks de sanitización y validación de transacciones.
+
+Lee la entrada con la biblioteca estándar, escribe las filas válidas de forma
+incremental y acumula estadísticas en memoria acotada.
+"""
+
+import csv
+import json
+import time
+from collections import Counter
+from typing import Any, Optional
+
+from returns.result import Success
+
+from src.compression import open_text, strip_codec_suffix
+from src.error_sink import ErrorSink
+from src.interning import CategoricalInterner
+from src.memory import AdaptiveChunker
+from src.metrics import MetricsRegistry, failure_labels
+from src.readers import MalformedRecord, iter_chunks, iter_records
+from src.records import materialize
+from src.registry import SchemaRegistry
+from src.sanitizers import normalize_country_owned
+from src.sqlite_sink import SQLiteSink
+from src.stages import Stage, StagedPipeline
+from src.stats import StreamingStats
+from src.validation import AdaptiveOrder, validate_transaction
+
+CHUNK_SIZE = 10_000
+
+# Un chunk viaja por el pipeline como (índice de la primera fila, filas)
+Chunk = tuple[int, list[dict[str, Any]]]
+
+def _numbered_chunks(path: str, chunk_size):
+    """
+    Chunks del CSV (o NDJSON) junto con el índice de su primera fila.
+    """
+    start = 0
+    for chunk in iter_chunks(iter_records(path), chunk_size):
+        yield start, chunk
+        start += len(chunk)
+
+def _sanitize_chunk(interner: CategoricalInterner, chunk: Chunk,
+                    registry: Optional[SchemaRegistry] = None) -> Chunk:
+    start, rows = chunk
+    # Con registro el país depende del esquema: se normaliza al validar, ya enrutado
+    country = registry is None
+    return start, [d if isinstance(d, MalformedRecord) else interner.sanitize_row(d, country)
+                   for d in rows]
+
+def _validate_chunk(order: Optional[AdaptiveOrder], chunk: Chunk, coerce: bool = False,
+                    registry: Optional[SchemaRegistry] = None):
+    """
+    Valida un chunk sanitizado, con el registro de esquemas si se proporciona.
+
+    Returns:
+        tuple: (filas leídas, filas válidas, [(índice, mensaje, fila)] de errores,
+        conteo por tipo de registro).
+    """
+    start, rows = chunk
+    valid = []
+    failed = []
+    types: Counter = Counter()
+    for idx, s in enumerate(rows, start=start):
+        if isinstance(s, MalformedRecord):
+            # Línea ilegible: error de la fila, como cualquier otro
+            failed.append((idx, s.error, s))
+            continue
+        if registry is not None:
+            # Una sola ruta por registro para el conteo, el país y la validación
+            route = registry.route(s)
+            types[route[0]] += 1
+            # El país se normaliza (y se agrega si falta) solo en esquemas que lo tienen
+            if registry.has_field(s, 'Merchant_Country', route):
+                normalize_country_owned(s)
+            v = registry.validate(s, coerce, route)
+        else:
+            v = validate_transaction(s, order=order, coerce=coerce)
+        if isinstance(v, Success):
+            valid.append(v.unwrap())
+        else:
+            failed.append((idx, str(v.failure()), s))
+    return len(rows), valid, failed, types
+
+def _timed(seconds, stage: str, fn):
+    """
+    Envuelve fn para observar su duración por llamada en el histograma de etapas.
+    """
+    def run(*args):
+        start = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            seconds.observe(time.perf_counter() - start, stage=stage)
+    return run
+
+def _timed_chunks(chunks, seconds):
+    """
+    Itera los chunks observando el tiempo de lectura de cada uno.
+    """
+    while True:
+        start = time.perf_counter()
+        chunk = next(chunks, None)
+        if chunk is None:
+            return
+        seconds.observe(time.perf_counter() - start, stage="read")
+        yield chunk
+
+class _ChunkWriter:
+    """
+    Destino de los chunks validados: CSV de válidas, errores y estadísticas.
+    """
+    def __init__(self, valid_path: Optional[str], sink: ErrorSink,
+                 stats: Optional[StreamingStats], metrics: Optional[MetricsRegistry] = None,
+                 db: Optional[SQLiteSink] = None):
+        self.valid_path = valid_path
+        self.sink = sink
+        self.stats = stats
+        self.db = db
+        self._records = self._failures = None
+        if metrics is not None:
+            self._records = metrics.counter("pipeline_records_total",
+                                            "Registros procesados por resultado", ("result",))
+            self._failures = metrics.counter("pipeline_records_failed_total",
+                                             "Registros rechazados por campo y regla",
+                                             ("field", "rule"))
+        self.total = 0
+        self.valid = 0
+        self.record_types: Counter = Counter()
+        self._file = None
+        self._writer = None
+
+    def __call__(self, result) -> None:
+        n, processed_rows, failed, types = result
+        self.total += n
+        self.valid += len(processed_rows)
+        self.record_types.update(types)
+        for idx, message, row in failed:
+            self.sink.add(idx, message, row)
+        if self._records is not None:
+            self._records.inc(len(processed_rows), result="valid")
+            self._records.inc(len(failed), result="failed")
+            # Se agrupa por chunk para incrementar una vez por campo y regla
+            for (field, rule), count in Counter(failure_labels(m) for _, m, _ in failed).items():
+                self._failures.inc(count, field=field, rule=rule)
+        if self.stats is not None:
+            self.stats.update_chunk(processed_rows)
+        if self.db is not None:
+            self.db.write(processed_rows)
+            self.db.write_errors(failed)
+        if self.valid_path and processed_rows:
+            if strip_codec_suffix(self.valid_path).endswith((".ndjson", ".jsonl")):
+                # NDJSON conserva todas las columnas de cada tipo de registro
+                if self._file is None:
+                    self._file = open_text(self.valid_path, "w", encoding="utf-8")
+                self._file.writelines(json.dumps(materialize(r), ensure_ascii=False) + "\n"
+                                      for r in processed_rows)
+                return
+            if self._writer is None:
+                self._file = open_text(self.valid_path, "w", encoding="utf-8", newline="")
+                self._writer = csv.DictWriter(self._file, fieldnames=list(processed_rows[0]),
+                                              extrasaction="ignore")
+                self._writer.writeheader()
+            self._writer.writerows(processed_rows)
+
+    def close(self) -> None:
+        """
+        Cierra los archivos de salida.
+        """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self.sink.close()
+        if self.db is not None:
+            self.db.close()
+
+def run_pipeline(path: str,
+                 valid_path: Optional[str] = None,
+                 errors_path: Optional[str] = None,
+                 chunk_size: int = CHUNK_SIZE,
+                 stats: Optional[StreamingStats] = None,
+                 adaptive: bool = False,
+                 sink: Optional[ErrorSink] = None,
+                 workers: int = 0,
+                 queue_size: int = 4,
+                 memory_budget: Optional[int] = None,
+                 memory_probe: str = "tracemalloc",
+                 coerce: bool = False,
+                 registry: Optional[SchemaRegistry] = None,
+                 metrics: Optional[MetricsRegistry] = None,
+                 db: Optional[SQLiteSink] = None) -> dict[str, Any]:
+    """
+    Sanitiza y valida un CSV (o NDJSON) de transacciones por chunks.
+
+    Args:
+        path (str): CSV de entrada; .ndjson/.jsonl se leen como NDJSON. Puede estar
+            comprimido (códec detectado por extensión o bytes mágicos).
+        valid_path (str, optional): CSV donde se escriben las transacciones válidas
+            (NDJSON si termina en .ndjson/.jsonl; comprimido si termina en .gz, .bz2,
+            .xz o .zst).
+        errors_path (str, optional): CSV donde se escriben los errores (si no se da sink);
+            también admite extensión de compresión.
+        chunk_size (int): Número de filas por chunk.
+        stats (StreamingStats, optional): Colector a actualizar con las filas válidas.
+        adaptive (bool): Reordena los validadores según costo y tasa de rechazo;
+            el mensaje de error puede referirse a otro campo si la fila falla en varios.
+        sink (ErrorSink, optional): Destino de errores; por defecto uno que escribe en errors_path.
+        workers (int): Si es mayor que 0, lectura, sanitización, validación y escritura
+            corren en etapas con hilos (workers por etapa de cómputo) y colas acotadas.
+        queue_size (int): Capacidad, en chunks, de cada cola entre etapas.
+        memory_budget (int, optional): Presupuesto de memoria en bytes; el tamaño de
+            chunk se adapta al costo por fila medido (chunk_size es el tamaño inicial).
+            Solo en modo secuencial.
+        memory_probe (str): Medición de memoria: 'tracemalloc' o 'rss'.
+        coerce (bool): Las filas válidas salen con valores tipados (Timestamp como
+            epoch y Amount como float).
+        registry (SchemaRegistry, optional): Enruta cada registro a su esquema según
+            el discriminador; permite entradas con varios tipos de registro.
+        metrics (MetricsRegistry, optional): Registra registros procesados, rechazos por
+            campo y regla, latencia por etapa, aciertos de caché y profundidad de colas;
+            el resumen incluye su snapshot en 'metrics'.
+        db (SQLiteSink, optional): Base SQLite donde se cargan válidas y errores; se
+            cierra (y se indexa) al terminar.
+
+    Returns:
+        dict: Resumen con totales y conteo por tipo de error.
+    """
+    if memory_budget is not None and workers > 0:
+        raise ValueError("memory_budget is only supported in sequential mode")
+    if registry is not None and adaptive:
+        raise ValueError("adaptive ordering is not supported with a schema registry")
+    interner = CategoricalInterner()
+    chunker = None
+    if memory_budget is not None:
+        chunker = AdaptiveChunker(memory_budget, initial=chunk_size, probe=memory_probe)
+        chunker.start()
+    order = AdaptiveOrder() if adaptive else None
+    if sink is None:
+        sink = ErrorSink(spill_path=errors_path)
+    writer = _ChunkWriter(valid_path, sink, stats, metrics, db)
+    stage_metrics = None
+
+    def sanitize(c):
+        return _sanitize_chunk(interner, c, registry)
+
+    def validate(c):
+        return _validate_chunk(order, c, coerce, registry)
+
+    write = writer
+    try:
+        chunks = _numbered_chunks(path, chunker.next_size if chunker else chunk_size)
+        if metrics is not None:
+            seconds = metrics.histogram("pipeline_stage_seconds",
+                                        "Duración por chunk de cada etapa", ("stage",))
+            chunks = _timed_chunks(chunks, seconds)
+            sanitize = _timed(seconds, "sanitize", sanitize)
+            validate = _timed(seconds, "validate", validate)
+            write = _timed(seconds, "write", writer)
+        if chunker is not None:
+            while True:
+                chunker.begin()
+                chunk = next(chunks, None)
+                if chunk is None:
+                    break
+                write(validate(sanitize(chunk)))
+                chunker.end(len(chunk[1]))
+        elif workers > 0:
+            staged = StagedPipeline(
+                chunks,
+                [Stage("sanitize", sanitize, workers), Stage("validate", validate, workers)],
+                write, maxsize=queue_size)
+            stage_metrics = staged.run()
+        else:
+            for chunk in chunks:
+                write(validate(sanitize(chunk)))
+    finally:
+        writer.close()
+        if chunker is not None:
+            chunker.stop()
+
+    errors = sink.summary()
+    summary = {
+        "total": writer.total,
+        "valid": writer.valid,
+        "errors": errors["total"],
+        "error_counts": errors["by_message"],
+        "other_errors": errors["other_messages"],
+        "error_types": errors["by_type"],
+        "error_samples": errors["samples"],
+    }
+    if registry is not None:
+        summary["record_types"] = dict(writer.record_types.most_common())
+    if order is not None:
+        summary["validator_order"] = list(order.fields)
+    if stage_metrics is not None:
+        summary["stages"] = stage_metrics
+    if chunker is not None:
+        summary["memory"] = chunker.summary()
+    if db is not None:
+        summary["db"] = db.summary()
+    if metrics is not None:
+        _record_run_metrics(metrics, interner, stage_metrics)
+        summary["metrics"] = metrics.snapshot()
+    return summary
+
+def _record_run_metrics(metrics: MetricsRegistry, interner: CategoricalInterner,
+                        stage_metrics: Optional[dict[str, Any]]) -> None:
+    """
+    Vuelca al registro los contadores de caché y las colas al terminar una corrida.
+    """
+    metrics.counter("interner_cache_hits_total", "Aciertos de la caché de categóricas").inc(
+        interner.hits)
+    metrics.counter("interner_cache_misses_total", "Fallos de la caché de categóricas").inc(
+        interner.misses)
+    lookups = interner.hits + interner.misses
+    metrics.gauge("interner_cache_hit_ratio", "Tasa de aciertos de la última corrida").set(
+        interner.hits / lookups if lookups else 0.0)
+    if stage_metrics:
+        depth_avg = metrics.gauge("pipeline_queue_depth_avg",
+                                  "Profundidad promedio de la cola de entrada", ("stage",))
+        depth_max = metrics.gauge("pipeline_queue_depth_max",
+                                  "Profundidad máxima de la cola de entrada", ("stage",))
+        for stage, m in stage_metrics.items():
+            depth_avg.set(m["depth_avg"], stage=stage)
+            depth_max.set(m["depth_max"], stage=stage)
+
+def print_summary(summary: dict[str, Any]) -> None:
+    """
+    Muestra el resumen del procesamiento en consola.
+    """
+    print("\n Resumen del procesamiento")
+    print(f"Total de transacciones leídas: {summary['total']}")
+    print(f" Transacciones válidas: {summary['valid']}")
+    print(f" Transacciones con errores: {summary['errors']}")
+
+    print("\n Tipos de error:")
+    for err, count in summary["error_counts"].items():
+        print(f"- {err}: {count}")
+    if summary.get("other_errors"):
+        print(f"- (otros mensajes): {summary['other_errors']}")
+
+    if summary.get("memory"):
+        m = summary["memory"]
+        sizes = m["chunk_size"]
+        print(f"\n Memoria ({m['probe']}): pico {m['peak_bytes'] / 2 ** 20:.1f} MiB"
+              f" de {m['budget_bytes'] / 2 ** 20:.1f} MiB;"
+              f" chunks de {sizes['min']} a {sizes['max']} filas (último {sizes['last']})")
+
+    if summary.get("db"):
+        db = summary["db"]
+        print(f"\n SQLite {db['path']}: {db['rows']} filas y {db['errors']} errores"
+              f" en {db['transactions']} transacciones")
+
+    if summary.get("stages"):
+        print("\n Colas por etapa (profundidad promedio / máxima):")
+        for name, m in summary["stages"].items():
+            print(f"- {name}: {m['depth_avg']:.1f} / {m['depth_max']} de {m['maxsize']}"
+                  f" ({m['items']} chunks, {m['busy_seconds']:.3f} s)")
@@ -0,0 +1,102 @@
+"""
+readers.py
+
+Lectores de entrada basados en la biblioteca estándar.
+
+Producen filas como diccionarios (de strings en CSV, igual que csv.DictReader),
+para que el pipeline no dependa de pandas. Los archivos comprimidos (gzip, bz2,
+xz, zstd) se descomprimen en streaming.
+"""
+
+import csv
+import json
+from typing import Any, Callable, Iterable, Iterator, Union
+
+from src.compression import open_text, strip_codec_suffix
+
+class MalformedRecord(dict):
+    """
+    Línea que no se pudo leer como registro.
+
+    Conserva el texto crudo en 'raw' y el motivo en error; quien la recibe la
+    cuenta como una fila con error en lugar de descartarla.
+    """
+    def __init__(self, raw: str, error: str):
+        super().__init__(raw=raw)
+        self.error = f"Malformed record: {error}"
+
+def iter_csv(path: str) -> Iterator[dict[str, Any]]:
+    """
+    Recorre un archivo CSV fila por fila.
+
+    Args:
+        path (str): Ruta al archivo CSV (puede estar comprimido).
+
+    Returns:
+        Iterator[dict]: Filas como diccionarios.
+    """
+    with open_text(path, "r", encoding="utf-8", newline="") as f:
+        yield from csv.DictReader(f)
+
+def iter_ndjson(path: str) -> Iterator[dict[str, Any]]:
+    """
+    Recorre un archivo NDJSON (un objeto JSON por línea); ignora líneas vacías.
+
+    Args:
+        path (str): Ruta al archivo NDJSON (puede estar comprimido).
+
+    Returns:
+        Iterator[dict]: Registros; una línea que no es un objeto JSON se
+        entrega como MalformedRecord en lugar de interrumpir la lectura.
+    """
+    with open_text(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield MalformedRecord(line.rstrip("\r\n"), str(e))
+                continue
+            if isinstance(record, dict):
+                yield record
+            else:
+                yield MalformedRecord(line.rstrip("\r\n"), "not a JSON object")
+
+def iter_records(path: str) -> Iterator[dict[str, Any]]:
+    """
+    Recorre un CSV o NDJSON según la extensión (.ndjson/.jsonl son NDJSON),
+    sin contar la de compresión: 'datos.jsonl.gz' se lee como NDJSON.
+    """
+    if strip_codec_suffix(path).endswith((".ndjson", ".jsonl")):
+        return iter_ndjson(path)
+    return iter_csv(path)
+
+def iter_chunks(rows: Iterable[dict[str, Any]],
+                size: Union[int, Callable[[], int]]) -> Iterator[list[dict[str, Any]]]:
+    """
+    Agrupa filas en listas de a lo más size elementos.
+
+    Args:
+        rows (Iterable[dict]): Filas de entrada.
+        size (int | Callable): Tamaño máximo de cada chunk, o función que
+        devuelve el tamaño del siguiente chunk (tamaño adaptativo).
+
+    Returns:
+        Iterator[list]: Chunks de filas.
+    """
+    next_size = size if callable(size) else lambda: size
+    limit = next_size()
+    if limit <= 0:
+        raise ValueError("Chunk size must be positive")
+    chunk: list[dict[str, Any]] = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= limit:
+            yield chunk
+            chunk = []
+            limit = next_size()
+            if limit <= 0:
+                raise ValueError("Chunk size must be positive")
+    if chunk:
+        yield chunk
@@ -0,0 +1,125 @@
+"""
+records.py
+
+Vistas copy-on-write de registros.
+
+Un RecordView comparte los campos del registro original y guarda solo las
+claves modificadas, agregadas o eliminadas por una etapa. Así las
+transformaciones no mutan su entrada (se conservan el registro crudo y el
+sanitizado para auditoría) sin pagar una copia completa del dict por etapa.
+"""
+
+from collections.abc import ItemsView, Mapping, MutableMapping
+from typing import Any, Iterator
+
+_MISSING = object()
+_DELETED = object()
+
+class _RecordItems(ItemsView):
+    """
+    items() de RecordView sin una búsqueda por clave en cada paso.
+    """
+    def __iter__(self):
+        view = self._mapping
+        base = view._base  # pylint: disable=protected-access
+        changes = view._changes  # pylint: disable=protected-access
+        for k, v in base.items():
+            c = changes.get(k, _MISSING)
+            if c is _MISSING:
+                yield k, v
+            elif c is not _DELETED:
+                yield k, c
+        for k, c in changes.items():
+            if c is not _DELETED and k not in base:
+                yield k, c
+
+class RecordView(MutableMapping):
+    """
+    Capa de cambios sobre un registro base que nunca se modifica.
+
+    Las lecturas buscan primero en los cambios de la capa y luego en la base;
+    las escrituras y eliminaciones solo afectan a la capa. El orden de las
+    claves es el de la base seguido de las claves nuevas.
+    """
+    __slots__ = ('_base', '_changes')
+
+    def __init__(self, base: Mapping):
+        self._base = base
+        self._changes: dict[str, Any] = {}
+
+    @property
+    def base(self) -> Mapping:
+        """
+        Registro sobre el que se apoya la capa.
+        """
+        return self._base
+
+    def changes(self) -> dict[str, Any]:
+        """
+        Claves modificadas o agregadas en esta capa (sin las eliminadas).
+        """
+        return {k: v for k, v in self._changes.items() if v is not _DELETED}
+
+    def __getitem__(self, key: str) -> Any:
+        v = self._changes.get(key, _MISSING)
+        if v is _MISSING:
+            return self._base[key]
+        if v is _DELETED:
+            raise KeyError(key)
+        return v
+
+    def get(self, key: str, default: Any = None) -> Any:
+        v = self._changes.get(key, _MISSING)
+        if v is _MISSING:
+            return self._base.get(key, default)
+        return default if v is _DELETED else v
+
+    def __contains__(self, key: object) -> bool:
+        v = self._changes.get(key, _MISSING)
+        if v is _MISSING:
+            return key in self._base
+        return v is not _DELETED
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self._changes[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        if key not in self:
+            raise KeyError(key)
+        self._changes[key] = _DELETED
+
+    def __iter__(self) -> Iterator[str]:
+        changes = self._changes
+        for k in self._base:
+            if changes.get(k) is not _DELETED:
+                yield k
+        for k, v in changes.items():
+            if v is not _DELETED and k not in self._base:
+                yield k
+
+    def items(self) -> ItemsView:
+        return _RecordItems(self)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"RecordView({self.materialize()!r})"
+
+    def materialize(self) -> dict[str, Any]:
+        """
+        Devuelve un dict nuevo con el contenido de la vista (una sola copia).
+        """
+        out = self._base.materialize() if isinstance(self._base, RecordView) else dict(self._base)
+        for k, v in self._changes.items():
+            if v is _DELETED:
+                out.pop(k, None)
+            else:
+                out[k] = v
+        return out
+
+def materialize(d: Mapping) -> dict[str, Any]:
+    """
+    Convierte un registro (dict o RecordView) en dict, sin copiar si ya es dict.
+    """
+    return d.materialize() if isinstance(d, RecordView) else d
@@ -0,0 +1,129 @@
+"""
+registry.py
+
+Registro de esquemas y enrutamiento de registros heterogéneos.
+
+Cada registro se envía al esquema indicado por un campo discriminador (por
+ejemplo 'Record_Type': 'refund'), de modo que un flujo mezclado de
+transacciones, reembolsos y contracargos se valida en una sola pasada. Los
+validadores compilados se guardan en caché por (esquema, versión).
+"""
+
+from typing import Any, Iterable, Iterator, Optional
+
+from returns.result import Failure
+
+from src.schemas import transaction_schema
+from src.validation import CompiledSchema
+
+class SchemaRegistry:
+    """
+    Registro de esquemas por nombre y versión.
+
+    Args:
+        discriminator (str): Campo que indica el tipo de registro.
+        version_field (str): Campo opcional con la versión del esquema.
+        default (str, optional): Tipo usado cuando falta el discriminador.
+    """
+    def __init__(self, discriminator: str = 'Record_Type',
+                 version_field: str = 'Schema_Version', default: Optional[str] = None):
+        self.discriminator = discriminator
+        self.version_field = version_field
+        self.default = default
+        self._schemas: dict[tuple[str, int], dict[str, Any]] = {}
+        self._latest: dict[str, int] = {}
+        self._compiled: dict[tuple[str, int], CompiledSchema] = {}
+
+    def register(self, name: str, schema: dict[str, Any], version: int = 1) -> None:
+        """
+        Registra (o reemplaza) un esquema; invalida su versión compilada.
+        """
+        key = (name, version)
+        self._schemas[key] = schema
+        self._compiled.pop(key, None)
+        self._latest[name] = max(version, self._latest.get(name, version))
+
+    def names(self) -> list[str]:
+        """
+        Tipos de registro conocidos.
+        """
+        return sorted(self._latest)
+
+    def compiled(self, name: str, version: Optional[int] = None) -> CompiledSchema:
+        """
+        Esquema compilado para un tipo y versión (la más reciente por defecto).
+
+        Raises:
+            KeyError: Si el tipo o la versión no están registrados.
+        """
+        key = (name, self._latest[name] if version is None else version)
+        compiled = self._compiled.get(key)
+        if compiled is None:
+            compiled = self._compiled[key] = CompiledSchema(self._schemas[key])
+        return compiled
+
+    def route(self, record: dict[str, Any]) -> tuple[Optional[str], Optional[int]]:
+        """
+        Tipo y versión de un registro según el discriminador.
+        """
+        name = record.get(self.discriminator) or self.default
+        version = record.get(self.version_field)
+        if version in (None, ''):
+            return name, None
+        try:
+            return name, int(float(version))
+        except (TypeError, ValueError, OverflowError):
+            # 'inf' o '1e400' no caben en un int: versión desconocida, no una excepción
+            return name, -1
+
+    def has_field(self, record: dict[str, Any], field: str,
+                  route: Optional[tuple[Optional[str], Optional[int]]] = None) -> bool:
+        """
+        Indica si el esquema que le corresponde al registro tiene el campo.
+
+        Args:
+            route (tuple, optional): Resultado de route(record), si ya se calculó.
+        """
+        name, version = self.route(record) if route is None else route
+        key = (name, self._latest.get(name) if version is None else version)
+        return field in self._schemas.get(key, ())
+
+    def validate(self, record: dict[str, Any], coerce: bool = False,
+                 route: Optional[tuple[Optional[str], Optional[int]]] = None):
+        """
+        Valida un registro con el esquema que le corresponde.
+
+        Args:
+            route (tuple, optional): Resultado de route(record), si ya se calculó.
+
+        Returns:
+            Success(dict) si es válido, Failure(str) si hay errores o el tipo no existe.
+        """
+        name, version = self.route(record) if route is None else route
+        try:
+            compiled = self.compiled(name, version)
+        except KeyError:
+            if name not in self._latest:
+                return Failure(f"Unknown record type: {name}")
+            return Failure(f"Unknown schema version for {name}: {record.get(self.version_field)}")
+        return compiled(record, coerce)
+
+    def validate_stream(self, records: Iterable[dict[str, Any]],
+                        coerce: bool = False) -> Iterator[tuple[Optional[str], Any]]:
+        """
+        Valida un flujo heterogéneo en una sola pasada.
+
+        Returns:
+            Iterator[tuple]: (tipo de registro, Success o Failure) por registro.
+        """
+        for record in records:
+            route = self.route(record)
+            yield route[0], self.validate(record, coerce, route)
+
+def default_registry(discriminator: str = 'Record_Type') -> SchemaRegistry:
+    """
+    Registro con transaction_schema como tipo 'transaction' (y tipo por defecto).
+    """
+    registry = SchemaRegistry(discriminator, default='transaction')
+    registry.register('transaction', transaction_schema)
+    return registry
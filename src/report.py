@@ -0,0 +1,112 @@
+"""
+report.py
+
+Generación de reportes sin interfaz gráfica a partir de StreamingStats.
+
+Las gráficas se dibujan con el backend 'Agg' de matplotlib y se guardan como PNG;
+el resumen se escribe además como JSON y HTML. matplotlib se importa solo al
+generar las imágenes.
+"""
+
+import html
+import json
+import os
+from typing import Any
+
+from src.stats import StreamingStats
+
+def _figures(stats: StreamingStats, out_dir: str) -> list[str]:
+    """
+    Dibuja las gráficas del reporte y devuelve los nombres de archivo.
+    """
+    import matplotlib  # pylint: disable=import-outside-toplevel
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt  # pylint: disable=import-outside-toplevel
+
+    names = []
+
+    # Distribución de montos
+    edges = stats.bin_edges()
+    fig, ax = plt.subplots(figsize=(8, 4))
+    ax.bar(edges[:-1], stats.amount_bins, width=stats.bin_width, align='edge')
+    ax.set_title("Distribución de montos")
+    ax.set_xlabel("Monto")
+    ax.set_ylabel("Frecuencia")
+    fig.tight_layout()
+    fig.savefig(os.path.join(out_dir, "montos.png"))
+    plt.close(fig)
+    names.append("montos.png")
+
+    # Dispersión geográfica (una marca por celda, tamaño según frecuencia)
+    cells = list(stats.geo_cells.items())
+    fig, ax = plt.subplots(figsize=(6, 6))
+    if cells:
+        top = max(n for _, n in cells)
+        ax.scatter(
+            [(lon + 0.5) * stats.cell_deg for (_, lon), _n in cells],
+            [(lat + 0.5) * stats.cell_deg for (lat, _), _n in cells],
+            s=[10 + 90 * n / top for _, n in cells],
+        )
+    ax.set_title("Ubicación geográfica de transacciones")
+    ax.set_xlabel("Longitude")
+    ax.set_ylabel("Latitude")
+    fig.tight_layout()
+    fig.savefig(os.path.join(out_dir, "geo.png"))
+    plt.close(fig)
+    names.append("geo.png")
+
+    # Frecuencia por país
+    countries = stats.countries.most_common()
+    fig, ax = plt.subplots(figsize=(8, 4))
+    ax.bar([c for c, _ in countries], [n for _, n in countries])
+    ax.set_title("Transacciones por país")
+    ax.tick_params(axis='x', labelrotation=45)
+    fig.tight_layout()
+    fig.savefig(os.path.join(out_dir, "paises.png"))
+    plt.close(fig)
+    names.append("paises.png")
+
+    return names
+
+def _html(summary: dict[str, Any], images: list[str]) -> str:
+    """
+    Construye la página HTML del reporte.
+    """
+    amount = summary['amount']
+    rows = "".join(
+        f"<tr><td>{html.escape(str(c))}</td><td>{n}</td></tr>"
+        for c, n in summary['countries'].items()
+    )
+    imgs = "".join(f'<img src="{html.escape(name)}" alt="{html.escape(name)}">' for name in images)
+    return (
+        "<!DOCTYPE html><html><head><meta charset=\"utf-8\">"
+        "<title>Resumen de transacciones</title></head><body>"
+        "<h1>Resumen de transacciones</h1>"
+        f"<p>Transacciones válidas: {summary['count']}</p>"
+        f"<p>Monto mínimo: {amount['min']} - máximo: {amount['max']} - promedio: {amount['mean']}</p>"
+        f"<table><tr><th>País</th><th>Transacciones</th></tr>{rows}</table>"
+        f"{imgs}</body></html>"
+    )
+
+def render_report(stats: StreamingStats, out_dir: str, images: bool = True) -> list[str]:
+    """
+    Escribe el reporte (JSON, HTML y PNG) en out_dir.
+
+    Args:
+        stats (StreamingStats): Estadísticas acumuladas.
+        out_dir (str): Directorio de salida; se crea si no existe.
+        images (bool): Si es False no se importa matplotlib ni se generan PNG.
+
+    Returns:
+        list[str]: Rutas de los archivos generados.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    summary = stats.to_dict()
+    names = _figures(stats, out_dir) if images else []
+
+    with open(os.path.join(out_dir, "resumen.json"), "w", encoding="utf-8") as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+    with open(os.path.join(out_dir, "reporte.html"), "w", encoding="utf-8") as f:
+        f.write(_html(summary, names))
+
+    return [os.path.join(out_dir, n) for n in ["resumen.json", "reporte.html", *names]]
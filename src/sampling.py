@@ -0,0 +1,291 @@
+"""
+sampling.py
+
+Modo de prueba (dry-run) que estima las tasas de error de un archivo grande
+validando solo una muestra aleatoria de registros.
+
+En archivos sin comprimir se salta a posiciones aleatorias y se resincroniza
+en el siguiente fin de línea, sin leer el archivo completo. Los archivos
+comprimidos no permiten seek, así que se usa reservoir sampling sobre el
+stream (se descomprime todo, pero solo se sanitiza y valida la muestra).
+"""
+
+import csv
+import json
+import math
+import os
+import random
+from collections import Counter
+from statistics import NormalDist
+from typing import Any, Callable, Optional
+
+from returns.result import Success
+
+from src.compression import detect_codec, strip_codec_suffix
+from src.error_sink import error_type
+from src.readers import MalformedRecord, iter_records
+from src.sanitizers import sanitize_input
+from src.validation import validate_transaction
+
+SAMPLE_SIZE = 1000
+
+# Ejemplos de mensaje conservados por tipo de error
+SAMPLES_PER_TYPE = 3
+
+def wilson_interval(k: int, n: int, confidence: float = 0.95) -> tuple[float, float]:
+    """
+    Intervalo de confianza de Wilson para una proporción k/n.
+
+    A diferencia de la aproximación normal, es útil con tasas cercanas a 0 o 1
+    y con muestras pequeñas.
+
+    Args:
+        k (int): Éxitos (filas con el error).
+        n (int): Tamaño de la muestra.
+        confidence (float): Nivel de confianza.
+
+    Returns:
+        tuple: (límite inferior, límite superior).
+    """
+    if n == 0:
+        return 0.0, 1.0
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+    p = k / n
+    denom = 1 + z * z / n
+    center = (p + z * z / (2 * n)) / denom
+    margin = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denom
+    return max(0.0, center - margin), min(1.0, center + margin)
+
+def _line_parser(header: Optional[list[str]]) -> Callable[[bytes], dict]:
+    """
+    Parser de un registro: CSV con el encabezado dado o NDJSON si header es None.
+
+    Una línea que no es un registro válido devuelve un MalformedRecord, que
+    cuenta como fila con error.
+    """
+    if header is None:
+        def parse_json(line: bytes) -> dict:
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                return MalformedRecord(line.decode("utf-8", "replace").rstrip("\r\n"), str(e))
+            if not isinstance(record, dict):
+                return MalformedRecord(line.decode("utf-8", "replace").rstrip("\r\n"),
+                                       "not a JSON object")
+            return record
+        return parse_json
+
+    def parse_csv(line: bytes) -> dict:
+        text = line.decode("utf-8", "replace").rstrip("\r\n")
+        try:
+            fields = next(csv.reader([line.decode("utf-8")]), [])
+        except (UnicodeDecodeError, csv.Error) as e:
+            return MalformedRecord(text, str(e))
+        if len(fields) != len(header):
+            return MalformedRecord(text, f"expected {len(header)} fields, got {len(fields)}")
+        return dict(zip(header, fields))
+    return parse_csv
+
+# Líneas que se leen como máximo para completar un campo entre comillas, y
+# bytes hacia atrás donde se busca el inicio del registro que contiene un salto
+_MAX_CONTINUATION = 100
+_LOOKBACK_BYTES = 64 * 1024
+
+def _complete_quoted(f, line: bytes) -> bytes:
+    """
+    Agrega líneas hasta cerrar las comillas abiertas (registro de varias líneas).
+    """
+    for _ in range(_MAX_CONTINUATION):
+        if line.count(b'"') % 2 == 0:
+            break
+        more = f.readline()
+        if not more:
+            break
+        line += more
+    return line
+
+def _inside_record(f, start: int, pos: int, parse: Callable[[bytes], dict]) -> bool:
+    """
+    Indica si pos cae dentro de un registro CSV de varias líneas que empieza antes.
+
+    Prueba como inicio cada línea anterior (de la más cercana hacia atrás): si
+    el registro que empieza ahí es válido y se extiende más allá de pos, la
+    línea en pos es un fragmento de ese registro.
+    """
+    lo = max(start, pos - _LOOKBACK_BYTES)
+    f.seek(lo)
+    data = f.read(pos - lo)
+    # data termina con el salto de línea que precede a pos
+    i = len(data) - 1
+    for _ in range(_MAX_CONTINUATION):
+        i = data.rfind(b"\n", 0, i)
+        if i < 0 and lo != start:
+            return False
+        candidate = lo + i + 1 if i >= 0 else start
+        f.seek(candidate)
+        text = _complete_quoted(f, f.readline())
+        if candidate + len(text) > pos and not isinstance(parse(text), MalformedRecord):
+            return True
+        if i < 0:
+            return False
+    return False
+
+def seek_sample(path: str, size: int, rng: random.Random,
+                max_attempts: Optional[int] = None) -> tuple[list[tuple[int, dict]], Optional[int]]:
+    """
+    Muestrea registros saltando a posiciones aleatorias de un archivo sin comprimir.
+
+    Cada posición se resincroniza al inicio de la línea siguiente; una línea
+    no se toma dos veces. La probabilidad de elegir una línea es proporcional
+    a la longitud de la anterior, lo que es despreciable con longitudes parecidas.
+
+    Solo se descarta una posición cuando cae dentro de un campo CSV entre
+    comillas que abarca varias líneas; las líneas completas mal formadas se
+    devuelven como MalformedRecord.
+
+    Args:
+        path (str): CSV o NDJSON sin comprimir.
+        size (int): Registros a muestrear.
+        rng (random.Random): Generador aleatorio.
+        max_attempts (int, optional): Saltos máximos (por defecto 10 * size).
+
+    Returns:
+        tuple: ([(offset, registro)], registros estimados en el archivo).
+    """
+    is_ndjson = strip_codec_suffix(path).endswith((".ndjson", ".jsonl"))
+    file_size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        header = None
+        if not is_ndjson:
+            header = next(csv.reader([f.readline().decode("utf-8-sig").rstrip("\r\n")]), [])
+        start = f.tell()
+        if start >= file_size:
+            return [], 0
+        parse = _line_parser(header)
+        seen: set[int] = set()
+        records: list[tuple[int, dict]] = []
+        nbytes = 0
+        attempts = max_attempts if max_attempts is not None else 10 * size
+        for _ in range(attempts):
+            if len(records) >= size:
+                break
+            offset = rng.randrange(start, file_size)
+            # Leer desde offset - 1 hasta el fin de línea deja f al inicio de una línea
+            f.seek(offset - 1)
+            f.readline()
+            pos = f.tell()
+            line = f.readline()
+            if not line:
+                pos = start
+                f.seek(start)
+                line = f.readline()
+            if pos in seen or not line.strip():
+                continue
+            seen.add(pos)
+            if header is not None:
+                # Con comillas abiertas es el inicio de un registro de varias líneas
+                line = _complete_quoted(f, line)
+            record = parse(line)
+            if (header is not None and isinstance(record, MalformedRecord)
+                    and _inside_record(f, start, pos, parse)):
+                # El salto cayó dentro de un campo entre comillas: no es un registro
+                continue
+            records.append((pos, record))
+            nbytes += len(line)
+    estimated = round((file_size - start) * len(records) / nbytes) if nbytes else None
+    return records, estimated
+
+def reservoir_sample(path: str, size: int,
+                     rng: random.Random) -> tuple[list[tuple[int, dict]], int]:
+    """
+    Reservoir sampling (algoritmo R) sobre todos los registros del archivo.
+
+    Returns:
+        tuple: ([(índice, registro)], total de registros).
+    """
+    sample: list[tuple[int, dict]] = []
+    n = 0
+    for n, record in enumerate(iter_records(path), start=1):
+        if len(sample) < size:
+            sample.append((n - 1, record))
+        else:
+            j = rng.randrange(n)
+            if j < size:
+                sample[j] = (n - 1, record)
+    return sample, n
+
+def dry_run(path: str, sample_size: int = SAMPLE_SIZE, seed: Optional[int] = None,
+            confidence: float = 0.95) -> dict[str, Any]:
+    """
+    Estima las tasas de error de un archivo validando una muestra aleatoria.
+
+    Args:
+        path (str): CSV o NDJSON, comprimido o no.
+        sample_size (int): Registros a muestrear.
+        seed (int, optional): Semilla para reproducir la muestra.
+        confidence (float): Nivel de confianza de los intervalos.
+
+    Returns:
+        dict: Método, tamaño de muestra, tasa de error global y por tipo con su
+        intervalo de Wilson, y mensajes de ejemplo con su posición.
+    """
+    if sample_size <= 0:
+        raise ValueError("Sample size must be positive")
+    rng = random.Random(seed)
+    if detect_codec(path) is None:
+        method = "seek"
+        sample, estimated = seek_sample(path, sample_size, rng)
+    else:
+        method = "reservoir"
+        sample, estimated = reservoir_sample(path, sample_size, rng)
+
+    by_type: Counter = Counter()
+    examples: dict[str, list[dict[str, Any]]] = {}
+    for position, record in sample:
+        if isinstance(record, MalformedRecord):
+            message = record.error
+        else:
+            result = validate_transaction(sanitize_input(record))
+            if isinstance(result, Success):
+                continue
+            message = str(result.failure())
+        t = error_type(message)
+        by_type[t] += 1
+        if len(examples.setdefault(t, [])) < SAMPLES_PER_TYPE:
+            examples[t].append({"position": position, "error": message})
+
+    n = len(sample)
+    failed = sum(by_type.values())
+
+    def rate(k: int) -> dict[str, Any]:
+        low, high = wilson_interval(k, n, confidence)
+        return {"count": k, "rate": k / n if n else 0.0, "low": low, "high": high}
+
+    return {
+        "path": path,
+        "method": method,
+        "sample_size": n,
+        "estimated_records": estimated,
+        "confidence": confidence,
+        "errors": rate(failed),
+        "by_type": {t: rate(k) for t, k in by_type.most_common()},
+        "examples": examples,
+    }
+
+def print_dry_run(report: dict[str, Any]) -> None:
+    """
+    Muestra el resultado del dry-run en consola.
+    """
+    pct = round(report["confidence"] * 100)
+    print("\n Estimación por muestreo")
+    print(f"Registros muestreados: {report['sample_size']} ({report['method']})")
+    if report["estimated_records"] is not None:
+        print(f"Registros estimados en el archivo: {report['estimated_records']}")
+    e = report["errors"]
+    print(f" Tasa de error: {e['rate']:.2%} (IC {pct}%: {e['low']:.2%} - {e['high']:.2%})")
+    if report["by_type"]:
+        print("\n Tipos de error:")
+        for t, r in report["by_type"].items():
+            print(f"- {t}: {r['rate']:.2%} ({r['low']:.2%} - {r['high']:.2%}), {r['count']} en la muestra")
+            for example in report["examples"].get(t, []):
+                print(f"    posición {example['position']}: {example['error']}")
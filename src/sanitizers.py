@@ -2,91 +2,147 @@
 sanitizers.py
 
 Contiene funciones para limpiar, convertir y normalizar campos de entrada en transacciones.
+
+Los sanitizadores no mutan su entrada. Las etapas escriben sobre un RecordView
+que comparte los campos originales y guarda solo los valores que cambian;
+cada función pública aplica sus etapas sobre una sola capa y devuelve un dict
+plano (una sola copia, serializable).
 """
 
 import re
+from collections.abc import Mapping, MutableMapping
 from html import escape
-from typing import Any
+from typing import Any, Callable
+
+from src.records import RecordView
+
+# Nombres de países a códigos esperados por el esquema
+COUNTRY_MAP = {
+    'India': 'IN',
+    'México': 'MX',
+    'Mexico': 'MX',
+    'USA': 'US',
+    'United States': 'US',
+    'UK': 'GB',
+    'United Kingdom': 'GB',
+    'Canada': 'CA',
+    'Deutschland': 'DE',
+    'Germany': 'DE',
+    'France': 'FR',
+    'UAE': 'AE',
+    'United Arab Emirates': 'AE',
+    'Singapore': 'SG'
+}
+
+# Strings que convert_numeric_fields y convert_booleans convierten
+NUMERIC_RE = re.compile(r'^-?\d+(\.\d+)?$')
+TRUE_STRINGS = frozenset({'true', 'yes', '1'})
+FALSE_STRINGS = frozenset({'false', 'no', '0'})
+
+_Stage = Callable[[MutableMapping[str, Any]], None]
 
-def sanitize_text_fields(d: dict[str, Any]) -> dict[str, Any]:
+def _apply(d: Mapping[str, Any], *stages: _Stage) -> dict[str, Any]:
     """
-    Elimina espacios innecesarios y saltos de línea en campos de texto.
+    Aplica las etapas sobre una capa de d y la materializa.
     """
+    out = RecordView(d)
+    for stage in stages:
+        stage(out)
+    return out.materialize()
+
+def _sanitize_text_fields(d: MutableMapping[str, Any]) -> None:
     for k, v in d.items():
         if isinstance(v, str):
-            d[k] = v.strip().replace('\n', ' ').replace('\r', '')
-    return d
+            new = v.strip().replace('\n', ' ').replace('\r', '')
+            if new != v:
+                d[k] = new
 
-def escape_html(d: dict[str, Any]) -> dict[str, Any]:
+def sanitize_text_fields(d: Mapping[str, Any]) -> dict[str, Any]:
     """
-    Escapa caracteres HTML peligrosos en campos de texto.
+    Elimina espacios innecesarios y saltos de línea en campos de texto.
     """
+    return _apply(d, _sanitize_text_fields)
+
+def _escape_html(d: MutableMapping[str, Any]) -> None:
     for k, v in d.items():
         if isinstance(v, str):
-            d[k] = escape(v, quote=True)
-    return d
+            new = escape(v, quote=True)
+            if new != v:
+                d[k] = new
 
-def convert_numeric_fields(d: dict[str, Any]) -> dict[str, Any]:
+def escape_html(d: Mapping[str, Any]) -> dict[str, Any]:
     """
-    Convierte strings que parecen números en floats.
+    Escapa caracteres HTML peligrosos en campos de texto.
     """
+    return _apply(d, _escape_html)
+
+def _convert_numeric_fields(d: MutableMapping[str, Any]) -> None:
     for k, v in d.items():
-        if isinstance(v, str) and re.match(r'^-?\d+(\.\d+)?$', v.strip()):
+        if isinstance(v, str) and NUMERIC_RE.match(v.strip()):
             try:
                 d[k] = float(v)
             except ValueError:
                 continue
-    return d
 
-def convert_booleans(d: dict[str, Any]) -> dict[str, Any]:
+def convert_numeric_fields(d: Mapping[str, Any]) -> dict[str, Any]:
     """
-    Convierte strings como 'true', 'yes', '1' en True, y 'false', 'no', '0' en False.
+    Convierte strings que parecen números en floats.
     """
-    true_set = {'true', 'yes', '1'}
-    false_set = {'false', 'no', '0'}
+    return _apply(d, _convert_numeric_fields)
+
+def _convert_booleans(d: MutableMapping[str, Any]) -> None:
     for k, v in d.items():
         if isinstance(v, str):
             s = v.strip().lower()
-            if s in true_set:
+            if s in TRUE_STRINGS:
                 d[k] = True
-            elif s in false_set:
+            elif s in FALSE_STRINGS:
                 d[k] = False
-    return d
 
-def normalize_country(d: dict[str, Any]) -> dict[str, Any]:
+def convert_booleans(d: Mapping[str, Any]) -> dict[str, Any]:
+    """
+    Convierte strings como 'true', 'yes', '1' en True, y 'false', 'no', '0' en False.
+    """
+    return _apply(d, _convert_booleans)
+
+def _normalize_country(d: MutableMapping[str, Any]) -> None:
+    current = d.get('Merchant_Country')
+    country = str(current or '')
+    code = COUNTRY_MAP.get(country, country)
+    if code != current:
+        d['Merchant_Country'] = code
+
+def normalize_country(d: Mapping[str, Any]) -> dict[str, Any]:
     """
     Normaliza nombres de países a códigos esperados por el esquema.
     """
-    country_map = {
-        'India': 'IN',
-        'México': 'MX',
-        'Mexico': 'MX',
-        'USA': 'US',
-        'United States': 'US',
-        'UK': 'GB',
-        'United Kingdom': 'GB',
-        'Canada': 'CA',
-        'Deutschland': 'DE',
-        'Germany': 'DE',
-        'France': 'FR',
-        'UAE': 'AE',
-        'United Arab Emirates': 'AE',
-        'Singapore': 'SG'
-    }
-    country = str(d.get('Merchant_Country') or '')
-    d['Merchant_Country'] = country_map.get(country, country)
+    return _apply(d, _normalize_country)
+
+_STAGES = (_sanitize_text_fields, _escape_html, _convert_numeric_fields,
+           _convert_booleans, _normalize_country)
+
+def sanitize_owned(d: MutableMapping[str, Any], country: bool = True) -> MutableMapping[str, Any]:
+    """
+    Aplica todos los sanitizadores modificando d directamente.
+
+    Solo para registros que pertenecen al llamador (por ejemplo una copia
+    privada): evita crear la capa de RecordView. El resultado es el mismo que
+    el de sanitize_input. Con country=False se omite normalize_country, para
+    esquemas que no tienen 'Merchant_Country'.
+    """
+    for stage in _STAGES if country else _STAGES[:-1]:
+        stage(d)
+    return d
+
+def normalize_country_owned(d: MutableMapping[str, Any]) -> MutableMapping[str, Any]:
+    """
+    Aplica normalize_country modificando d directamente (ver sanitize_owned).
+    """
+    _normalize_country(d)
     return d
 
-def sanitize_input(d: dict[str, Any]) -> dict[str, Any]:
+def sanitize_input(d: Mapping[str, Any]) -> dict[str, Any]:
     """
-    Aplica todos los sanitizadores en orden funcional.
+    Aplica todos los sanitizadores en orden funcional; d no se modifica.
     """
-    return normalize_country(
-        convert_booleans(
-            convert_numeric_fields(
-                escape_html(
-                    sanitize_text_fields(d)
-                )
-            )
-        )
-    )
+    return _apply(d, *_STAGES)
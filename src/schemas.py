@@ -1,8 +1,8 @@
 # src/schemas.py
 
 from returns.result import Success, Failure
-from datetime import datetime
-from typing import Any
+from datetime import datetime, UTC
+from typing import Any, Optional
 
 class PositiveFloat:
     """
@@ -15,6 +15,12 @@ class PositiveFloat:
         except ValueError:
             return Failure("Invalid float")
 
+    def coerce(self, v: Any):
+        """
+        Valida y devuelve el monto como float.
+        """
+        return self(v)
+
 class DateValidator:
     """
     Valida que la fecha tenga uno de los formatos aceptados.
@@ -22,14 +28,30 @@ class DateValidator:
     def __init__(self, fmt: str = '%m/%d/%Y %H:%M'):
         self.fmts = [fmt, '%d/%m/%Y %H:%M', '%m/%d/%Y %H:%M:%S', '%d/%m/%Y %H:%M:%S']
 
-    def __call__(self, v: Any):
+    def parse(self, v: Any) -> Optional[datetime]:
+        """
+        Devuelve el datetime del primer formato que coincida, o None.
+        """
         for f in self.fmts:
             try:
-                datetime.strptime(str(v), f)
-                return Success(v)
+                return datetime.strptime(str(v), f)
             except ValueError:
                 continue
-        return Failure(f"Date must match one of: {self.fmts}")
+        return None
+
+    def __call__(self, v: Any):
+        if self.parse(v) is None:
+            return Failure(f"Date must match one of: {self.fmts}")
+        return Success(v)
+
+    def coerce(self, v: Any):
+        """
+        Valida y devuelve la fecha como epoch en segundos (interpretada en UTC).
+        """
+        dt = self.parse(v)
+        if dt is None:
+            return Failure(f"Date must match one of: {self.fmts}")
+        return Success(int(dt.replace(tzinfo=UTC).timestamp()))
 
 class CountryWhitelist:
     """
@@ -41,6 +63,12 @@ class CountryWhitelist:
     def __call__(self, v: Any):
         return Success(v) if v in self.allowed else Failure(f"Country {v} not allowed")
 
+    def coerce(self, v: Any):
+        """
+        Valida con la misma regla que __call__; el código ya es el valor tipado.
+        """
+        return self(v)
+
 transaction_schema: dict[str, Any] = {
     'Transaction_ID': str,
     'Card_ID': str,
@@ -0,0 +1,221 @@
+"""
+sqlite_sink.py
+
+Destino SQLite para las filas válidas y los errores del pipeline.
+
+Las filas se acumulan y se insertan con executemany en transacciones grandes
+(sqlite3 reutiliza la sentencia preparada entre lotes), con journal WAL y
+synchronous=NORMAL. Los índices se crean al cerrar, después de la carga
+masiva, salvo el índice único que requiere el modo upsert.
+"""
+
+import json
+import sqlite3
+from typing import Any, Iterable, Optional, Sequence
+
+from src.records import materialize
+from src.schemas import CountryWhitelist, DateValidator, PositiveFloat, transaction_schema
+
+BATCH_SIZE = 10_000
+
+# Tipos SQL por validador del esquema
+_SQL_TYPES = {str: 'TEXT', float: 'REAL', int: 'INTEGER', bool: 'INTEGER'}
+_SQL_TYPES_BY_CLASS = {PositiveFloat: 'REAL', CountryWhitelist: 'TEXT', DateValidator: 'TEXT'}
+
+DEFAULT_INDEXES = ('Card_ID', 'Merchant_Country', 'Timestamp')
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+def column_types(schema: dict[str, Any], coerce: bool = False) -> dict[str, str]:
+    """
+    Tipo SQL de cada campo según su validador.
+
+    Args:
+        schema (dict): Esquema de validación.
+        coerce (bool): Con valores tipados el Timestamp es epoch (INTEGER).
+
+    Returns:
+        dict: Campo -> 'TEXT', 'REAL', 'INTEGER' o '' (sin afinidad).
+    """
+    types = {}
+    for field, validator in schema.items():
+        if coerce and isinstance(validator, DateValidator):
+            types[field] = 'INTEGER'
+        elif validator in _SQL_TYPES:
+            types[field] = _SQL_TYPES[validator]
+        else:
+            types[field] = _SQL_TYPES_BY_CLASS.get(type(validator), '')
+    return types
+
+class SQLiteSink:
+    """
+    Carga masiva de transacciones válidas y errores en una base SQLite.
+
+    Args:
+        path (str): Archivo de la base (se crea si no existe).
+        schema (dict): Esquema del que salen las columnas y sus tipos.
+        table (str): Tabla de transacciones válidas.
+        errors_table (str): Tabla de errores (row, error, record en JSON).
+        batch_size (int): Filas por transacción.
+        upsert (bool): Reemplaza por clave las filas ya existentes.
+        key (str): Columna clave del upsert.
+        coerce (bool): Las filas llegan con valores tipados.
+        indexes (Sequence[str]): Columnas indexadas al terminar la carga.
+    """
+    def __init__(self, path: str, schema: Optional[dict[str, Any]] = None,
+                 table: str = 'transactions', errors_table: str = 'errors',
+                 batch_size: int = BATCH_SIZE, upsert: bool = False,
+                 key: str = 'Transaction_ID', coerce: bool = False,
+                 indexes: Sequence[str] = DEFAULT_INDEXES):
+        if batch_size <= 0:
+            raise ValueError("Batch size must be positive")
+        schema = transaction_schema if schema is None else schema
+        if upsert and key not in schema:
+            raise ValueError(f"Upsert key {key} is not in the schema")
+        self.path = path
+        self.table = table
+        self.errors_table = errors_table
+        self.batch_size = batch_size
+        self.upsert = upsert
+        self.key = key
+        self.types = column_types(schema, coerce)
+        self.columns = list(self.types)
+        self.indexes = [key, *indexes] if key in self.types and key not in indexes else list(indexes)
+        self.rows_written = 0
+        self.errors_written = 0
+        self.transactions = 0
+        self._rows: list[tuple] = []
+        self._errors: list[tuple] = []
+        # El pipeline por etapas escribe desde su hilo escritor
+        self._conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        try:
+            self._create_tables()
+        except ValueError:
+            self._conn.close()
+            raise
+        self._insert_sql = self._build_insert()
+        self._error_sql = (f'INSERT INTO {_quote(errors_table)} (row, error, record) '
+                           f'VALUES (?, ?, ?)')
+
+    def _create_tables(self) -> None:
+        cols = ', '.join(f'{_quote(c)} {t}'.rstrip() for c, t in self.types.items())
+        self._conn.execute(f'CREATE TABLE IF NOT EXISTS {_quote(self.table)} ({cols})')
+        self._check_columns()
+        self._conn.execute(f'CREATE TABLE IF NOT EXISTS {_quote(self.errors_table)} '
+                           f'(row INTEGER, error TEXT, record TEXT)')
+        if self.upsert:
+            # ON CONFLICT necesita el índice único antes de insertar
+            self._conn.execute(
+                f'CREATE UNIQUE INDEX IF NOT EXISTS {_quote(f"ux_{self.table}_{self.key}")} '
+                f'ON {_quote(self.table)} ({_quote(self.key)})')
+
+    def _check_columns(self) -> None:
+        """
+        Verifica que una tabla existente tenga las columnas y tipos del esquema.
+
+        Raises:
+            ValueError: Si falta una columna o su tipo declarado es otro (por
+                ejemplo Timestamp TEXT de una carga sin coerce y epochs con coerce).
+        """
+        existing = {name: decl.upper() for _, name, decl, *_ in
+                    self._conn.execute(f'PRAGMA table_info({_quote(self.table)})')}
+        mismatched = [f'{c} {existing.get(c, "missing")} (expected {t or "no type"})'
+                      for c, t in self.types.items() if existing.get(c) != t]
+        if mismatched:
+            raise ValueError(f"Table {self.table} does not match the schema: "
+                             f"{', '.join(mismatched)}")
+
+    def _build_insert(self) -> str:
+        names = ', '.join(_quote(c) for c in self.columns)
+        marks = ', '.join('?' * len(self.columns))
+        sql = f'INSERT INTO {_quote(self.table)} ({names}) VALUES ({marks})'
+        if self.upsert:
+            updates = ', '.join(f'{_quote(c)} = excluded.{_quote(c)}'
+                                for c in self.columns if c != self.key)
+            sql += f' ON CONFLICT ({_quote(self.key)}) DO UPDATE SET {updates}'
+        return sql
+
+    def write(self, rows: Iterable[dict[str, Any]]) -> None:
+        """
+        Agrega filas válidas; se insertan al completar un lote.
+        """
+        columns = self.columns
+        self._rows.extend(tuple(map(r.get, columns)) for r in rows)
+        if len(self._rows) >= self.batch_size:
+            self.flush()
+
+    def write_errors(self, failed: Iterable[tuple[Any, str, dict[str, Any]]]) -> None:
+        """
+        Agrega errores como (fila, mensaje, registro).
+        """
+        self._errors.extend(
+            (idx, message, json.dumps(materialize(record), ensure_ascii=False, default=str))
+            for idx, message, record in failed)
+        if len(self._errors) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Inserta lo acumulado en una sola transacción.
+        """
+        if not self._rows and not self._errors:
+            return
+        conn = self._conn
+        conn.execute('BEGIN')
+        try:
+            if self._rows:
+                conn.executemany(self._insert_sql, self._rows)
+            if self._errors:
+                conn.executemany(self._error_sql, self._errors)
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
+        self.transactions += 1
+        self.rows_written += len(self._rows)
+        self.errors_written += len(self._errors)
+        self._rows.clear()
+        self._errors.clear()
+
+    def create_indexes(self) -> None:
+        """
+        Crea los índices de consulta (después de la carga, es más barato que mantenerlos).
+        """
+        for column in self.indexes:
+            if column not in self.types or (self.upsert and column == self.key):
+                continue
+            name = _quote(f'ix_{self.table}_{column}')
+            self._conn.execute(f'CREATE INDEX IF NOT EXISTS {name} '
+                               f'ON {_quote(self.table)} ({_quote(column)})')
+
+    def close(self) -> None:
+        """
+        Inserta lo pendiente, crea los índices y cierra la conexión.
+        """
+        if self._conn is None:
+            return
+        self.flush()
+        self.create_indexes()
+        self._conn.close()
+        self._conn = None
+
+    def __enter__(self) -> 'SQLiteSink':
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def summary(self) -> dict[str, Any]:
+        """
+        Filas y errores insertados, y transacciones usadas.
+        """
+        return {
+            'path': self.path,
+            'rows': self.rows_written,
+            'errors': self.errors_written,
+            'transactions': self.transactions,
+            'upsert': self.upsert,
+        }
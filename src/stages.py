@@ -0,0 +1,264 @@
+"""
+stages.py
+
+Pipeline por etapas con hilos y colas acotadas.
+
+Cada etapa tiene su propio número de workers y se conecta con la siguiente por
+una queue.Queue de tamaño máximo fijo: si una etapa se atrasa, las anteriores se
+bloquean (backpressure) y la memoria queda acotada. Así la lectura de disco, la
+validación y la escritura se solapan en lugar de ejecutarse en secuencia.
+"""
+
+import heapq
+import queue
+import threading
+import time
+from typing import Any, Callable, Iterable, Optional
+
+_DONE = object()
+_POLL = 0.05
+
+class Stage:
+    """
+    Etapa del pipeline: aplica fn a cada elemento con workers hilos.
+    """
+    def __init__(self, name: str, fn: Callable[[Any], Any], workers: int = 1):
+        if workers <= 0:
+            raise ValueError("A stage needs at least one worker")
+        self.name = name
+        self.fn = fn
+        self.workers = workers
+
+class QueueMetrics:
+    """
+    Profundidad observada de una cola y tiempo de trabajo de la etapa que la consume.
+    """
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.samples = 0
+        self.depth_total = 0
+        self.depth_max = 0
+        self.items = 0
+        self.busy = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, depth: int) -> None:
+        """
+        Registra la profundidad de la cola después de un put.
+        """
+        with self._lock:
+            self.samples += 1
+            self.depth_total += depth
+            self.depth_max = max(self.depth_max, depth)
+
+    def work(self, seconds: float) -> None:
+        """
+        Registra el tiempo que tardó la etapa en procesar un elemento.
+        """
+        with self._lock:
+            self.items += 1
+            self.busy += seconds
+
+    def to_dict(self) -> dict[str, Any]:
+        """
+        Métricas serializables de la cola.
+        """
+        return {
+            'maxsize': self.maxsize,
+            'depth_avg': self.depth_total / self.samples if self.samples else 0.0,
+            'depth_max': self.depth_max,
+            'items': self.items,
+            'busy_seconds': self.busy,
+        }
+
+class StagedPipeline:
+    """
+    Conecta una fuente, una lista de etapas y un destino con colas acotadas.
+
+    La fuente se consume en un hilo lector y el destino se ejecuta en un único
+    hilo escritor. Un error en cualquier hilo cancela el resto y se relanza en
+    run(). Con ordered=True el destino recibe los elementos en el orden de la
+    fuente aunque las etapas tengan varios workers; los que llegan adelantados
+    esperan en un heap, y la lectura se pausa mientras el heap tiene maxsize o
+    más elementos, para que un chunk lento no acumule memoria sin límite.
+
+    Args:
+        source (Iterable): Elementos de entrada.
+        stages (list[Stage]): Etapas intermedias.
+        sink (Callable): Función que consume cada resultado.
+        maxsize (int): Capacidad de cada cola.
+        ordered (bool): Reordena los resultados antes del destino.
+    """
+    def __init__(self, source: Iterable[Any], stages: list[Stage],
+                 sink: Callable[[Any], None], maxsize: int = 4, ordered: bool = True):
+        if maxsize <= 0:
+            raise ValueError("Queues must be bounded")
+        self.source = source
+        self.stages = stages
+        self.sink = sink
+        self.maxsize = maxsize
+        self.ordered = ordered
+        self.queues = [queue.Queue(maxsize) for _ in range(len(stages) + 1)]
+        self.metrics = [QueueMetrics(maxsize) for _ in self.queues]
+        self._cancel = threading.Event()
+        self._error: Optional[BaseException] = None
+        self._error_lock = threading.Lock()
+        # Workers vivos por etapa; el último en salir avisa a la siguiente
+        self._alive = [s.workers for s in stages]
+        self._alive_lock = threading.Lock()
+        # Elementos esperando turno en el escritor (reordenamiento)
+        self._pending = 0
+        self.pending_max = 0
+        self._window = threading.Condition()
+
+    def cancel(self) -> None:
+        """
+        Solicita detener todos los hilos lo antes posible.
+        """
+        self._cancel.set()
+
+    @property
+    def cancelled(self) -> bool:
+        """
+        Indica si el pipeline fue cancelado o falló.
+        """
+        return self._cancel.is_set()
+
+    def _fail(self, exc: BaseException) -> None:
+        with self._error_lock:
+            if self._error is None:
+                self._error = exc
+        self._cancel.set()
+
+    def _put(self, i: int, item: Any) -> bool:
+        q = self.queues[i]
+        while not self._cancel.is_set():
+            try:
+                q.put(item, timeout=_POLL)
+            except queue.Full:
+                continue
+            self.metrics[i].observe(q.qsize())
+            return True
+        return False
+
+    def _get(self, i: int) -> Any:
+        q = self.queues[i]
+        while not self._cancel.is_set():
+            try:
+                return q.get(timeout=_POLL)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _wait_window(self) -> bool:
+        """
+        Bloquea la lectura mientras el escritor tiene maxsize elementos por reordenar.
+        """
+        with self._window:
+            while self._pending >= self.maxsize:
+                if self._cancel.is_set():
+                    return False
+                self._window.wait(_POLL)
+        return not self._cancel.is_set()
+
+    def _set_pending(self, n: int) -> None:
+        with self._window:
+            self._pending = n
+            self.pending_max = max(self.pending_max, n)
+            self._window.notify_all()
+
+    def _read(self) -> None:
+        try:
+            for seq, item in enumerate(self.source):
+                if self.ordered and not self._wait_window():
+                    return
+                if not self._put(0, (seq, item)):
+                    return
+            for _ in range(self.stages[0].workers if self.stages else 1):
+                self._put(0, _DONE)
+        except BaseException as e:  # pylint: disable=broad-except
+            self._fail(e)
+
+    def _work(self, i: int) -> None:
+        stage = self.stages[i]
+        try:
+            while True:
+                got = self._get(i)
+                if got is _DONE:
+                    break
+                seq, item = got
+                start = time.perf_counter()
+                result = stage.fn(item)
+                self.metrics[i].work(time.perf_counter() - start)
+                if not self._put(i + 1, (seq, result)):
+                    return
+        except BaseException as e:  # pylint: disable=broad-except
+            self._fail(e)
+            return
+        with self._alive_lock:
+            self._alive[i] -= 1
+            last = self._alive[i] == 0
+        if last:
+            following = self.stages[i + 1].workers if i + 1 < len(self.stages) else 1
+            for _ in range(following):
+                self._put(i + 1, _DONE)
+
+    def _write(self) -> None:
+        i = len(self.stages)
+        pending: list[tuple[int, Any]] = []
+        expected = 0
+        try:
+            while True:
+                got = self._get(i)
+                if got is _DONE:
+                    break
+                start = time.perf_counter()
+                if not self.ordered:
+                    self.sink(got[1])
+                else:
+                    heapq.heappush(pending, got)
+                    while pending and pending[0][0] == expected:
+                        self.sink(heapq.heappop(pending)[1])
+                        expected += 1
+                    if len(pending) != self._pending:
+                        self._set_pending(len(pending))
+                self.metrics[i].work(time.perf_counter() - start)
+        except BaseException as e:  # pylint: disable=broad-except
+            self._fail(e)
+
+    def run(self) -> dict[str, Any]:
+        """
+        Ejecuta el pipeline hasta agotar la fuente.
+
+        Returns:
+            dict: Métricas por cola ('<etapa>' -> profundidad, elementos, tiempo).
+
+        Raises:
+            La primera excepción ocurrida en cualquier hilo.
+        """
+        threads = [threading.Thread(target=self._read, name="reader", daemon=True)]
+        for i, stage in enumerate(self.stages):
+            for w in range(stage.workers):
+                threads.append(threading.Thread(target=self._work, args=(i,),
+                                                name=f"{stage.name}-{w}", daemon=True))
+        threads.append(threading.Thread(target=self._write, name="writer", daemon=True))
+        for t in threads:
+            t.start()
+        try:
+            for t in threads:
+                while t.is_alive():
+                    t.join(_POLL)
+        except BaseException:
+            # KeyboardInterrupt u otra interrupción en el hilo principal
+            self.cancel()
+            raise
+        if self._error is not None:
+            raise self._error
+        return self.metrics_dict()
+
+    def metrics_dict(self) -> dict[str, Any]:
+        """
+        Métricas por cola, nombradas según la etapa que la consume.
+        """
+        names = [s.name for s in self.stages] + ["writer"]
+        return {name: m.to_dict() for name, m in zip(names, self.metrics)}
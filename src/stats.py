@@ -0,0 +1,154 @@
+"""
+stats.py
+
+Estadísticas de resumen incrementales para el pipeline de transacciones.
+
+Se actualizan por chunk durante la validación y ocupan memoria proporcional al
+número de bins, no al número de filas.
+"""
+
+import math
+from collections import Counter
+from typing import Any, Iterable, Optional
+
+def _as_float(v: Any) -> Optional[float]:
+    """
+    Convierte un valor a float finito, o None si no es posible.
+    """
+    try:
+        f = float(v)
+    except (TypeError, ValueError):
+        return None
+    return f if math.isfinite(f) else None
+
+class StreamingStats:
+    """
+    Colector incremental de estadísticas de transacciones válidas.
+
+    - Histograma de 'Amount' con bins fijos en [amount_min, amount_max).
+    - Conteo de transacciones por 'Merchant_Country'.
+    - Rejilla geográfica submuestreada de celdas de cell_deg grados.
+    """
+    def __init__(self, amount_min: float = 0.0, amount_max: float = 10000.0,
+                 bins: int = 50, cell_deg: float = 1.0):
+        if bins <= 0 or amount_max <= amount_min:
+            raise ValueError("Invalid histogram range")
+        self.amount_min = amount_min
+        self.amount_max = amount_max
+        self.bin_width = (amount_max - amount_min) / bins
+        self.amount_bins = [0] * bins
+        self.underflow = 0
+        self.overflow = 0
+        self.count = 0
+        self.amount_total = 0.0
+        self.amount_low: Optional[float] = None
+        self.amount_high: Optional[float] = None
+        self.cell_deg = cell_deg
+        self.countries: Counter = Counter()
+        self.geo_cells: Counter = Counter()
+
+    def update(self, d: dict[str, Any]) -> None:
+        """
+        Incorpora una transacción válida a las estadísticas.
+        """
+        self.count += 1
+        amount = _as_float(d.get('Amount'))
+        if amount is not None:
+            self.amount_total += amount
+            self.amount_low = amount if self.amount_low is None else min(self.amount_low, amount)
+            self.amount_high = amount if self.amount_high is None else max(self.amount_high, amount)
+            if amount < self.amount_min:
+                self.underflow += 1
+            elif amount >= self.amount_max:
+                self.overflow += 1
+            else:
+                i = int((amount - self.amount_min) / self.bin_width)
+                self.amount_bins[min(i, len(self.amount_bins) - 1)] += 1
+        country = d.get('Merchant_Country')
+        if country is not None:
+            self.countries[str(country)] += 1
+        lat = _as_float(d.get('Latitude'))
+        lon = _as_float(d.get('Longitude'))
+        if lat is not None and lon is not None:
+            cell = (math.floor(lat / self.cell_deg), math.floor(lon / self.cell_deg))
+            self.geo_cells[cell] += 1
+
+    def update_chunk(self, rows: Iterable[dict[str, Any]]) -> None:
+        """
+        Incorpora un chunk de transacciones válidas.
+        """
+        for d in rows:
+            self.update(d)
+
+    def merge(self, other: 'StreamingStats') -> 'StreamingStats':
+        """
+        Combina otro colector con la misma configuración de bins.
+        """
+        if (other.amount_min, other.amount_max, len(other.amount_bins), other.cell_deg) != \
+                (self.amount_min, self.amount_max, len(self.amount_bins), self.cell_deg):
+            raise ValueError("Cannot merge stats with different bins")
+        self.amount_bins = [a + b for a, b in zip(self.amount_bins, other.amount_bins)]
+        self.underflow += other.underflow
+        self.overflow += other.overflow
+        self.count += other.count
+        self.amount_total += other.amount_total
+        for v in (other.amount_low, other.amount_high):
+            if v is not None:
+                self.amount_low = v if self.amount_low is None else min(self.amount_low, v)
+                self.amount_high = v if self.amount_high is None else max(self.amount_high, v)
+        self.countries.update(other.countries)
+        self.geo_cells.update(other.geo_cells)
+        return self
+
+    def bin_edges(self) -> list[float]:
+        """
+        Bordes de los bins del histograma de montos.
+        """
+        return [self.amount_min + i * self.bin_width for i in range(len(self.amount_bins) + 1)]
+
+    def amount_mean(self) -> Optional[float]:
+        """
+        Promedio de los montos observados.
+        """
+        n = sum(self.amount_bins) + self.underflow + self.overflow
+        return self.amount_total / n if n else None
+
+    def to_dict(self) -> dict[str, Any]:
+        """
+        Resumen serializable a JSON.
+        """
+        return {
+            'count': self.count,
+            'amount': {
+                'min': self.amount_low,
+                'max': self.amount_high,
+                'mean': self.amount_mean(),
+                'bin_edges': self.bin_edges(),
+                'bins': list(self.amount_bins),
+                'underflow': self.underflow,
+                'overflow': self.overflow,
+            },
+            'countries': dict(self.countries.most_common()),
+            'geo_cell_deg': self.cell_deg,
+            'geo_cells': [[lat, lon, n] for (lat, lon), n in sorted(self.geo_cells.items())],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> 'StreamingStats':
+        """
+        Reconstruye un colector a partir del resumen generado por to_dict.
+        """
+        amount = data['amount']
+        edges = amount['bin_edges']
+        stats = cls(edges[0], edges[-1], len(amount['bins']), data['geo_cell_deg'])
+        stats.amount_bins = list(amount['bins'])
+        stats.underflow = amount['underflow']
+        stats.overflow = amount['overflow']
+        stats.count = data['count']
+        stats.amount_low = amount['min']
+        stats.amount_high = amount['max']
+        n = sum(stats.amount_bins) + stats.underflow + stats.overflow
+        stats.amount_total = (amount['mean'] or 0.0) * n
+        stats.countries = Counter(data['countries'])
+        stats.geo_cells = Counter({(lat, lon): n for lat, lon, n in data['geo_cells']})
+        return stats
@@ -1,13 +1,113 @@
 """
 Este módulo contiene funciones para transformar datos de transacciones,
 incluyendo normalización de país, enriquecimiento de canal, y marca de tiempo.
+
+Las transformaciones no mutan su entrada: escriben los campos cambiados o
+agregados en un RecordView sobre el registro original y devuelven un dict
+plano (una sola copia por llamada, serializable). transform_batch
+aplica las tres a un chunk completo con tablas de búsqueda memorizadas y una
+sola marca de tiempo por lote.
 """
 
 # src/transforms.py
 
+from collections.abc import Iterable, Mapping
 from datetime import datetime, UTC
+from functools import lru_cache
+from typing import Any, Callable, Optional
+
+from src.records import RecordView
+
+COUNTRY_MAP = {
+    'México': 'MX',
+    'Mexico': 'MX',
+    'United States': 'US',
+    'USA': 'US',
+    'India': 'IN',
+    'Germany': 'DE',
+    'France': 'FR',
+    'Canada': 'CA',
+    'UK': 'GB',
+    'United Kingdom': 'GB',
+    'UAE': 'AE',
+    'Singapore': 'SG'
+}
+
+# Tipo de canal por valor de 'Channel' (en mayúsculas)
+CHANNEL_TYPES = {
+    'POS': 'Presencial',
+    'ONLINE': 'Digital',
+    'ATM': 'Cajero'
+}
+
+# Canales distintos memorizados por ChannelRules (el resto se resuelve sin memoria)
+CHANNEL_CACHE_SIZE = 1024
+
+class ChannelRules:
+    """
+    Reglas de enriquecimiento de canal: tabla exacta, reglas por predicado y default.
+
+    El resultado de cada canal en mayúsculas se memoriza en un LRU acotado, así
+    que un canal repetido no vuelve a evaluar las reglas y los valores
+    arbitrarios de una entrada no confiable no hacen crecer la memoria sin
+    límite. Agregar reglas invalida la memoria.
 
-def normalize_country(d: dict) -> dict:
+    Args:
+        types (dict): Canal en mayúsculas -> tipo de canal.
+        default (str): Tipo de los canales sin regla.
+        cache_size (int): Canales distintos que se memorizan.
+    """
+    def __init__(self, types: Optional[Mapping[str, str]] = None, default: str = 'Otro',
+                 cache_size: int = CHANNEL_CACHE_SIZE):
+        self.types = dict(CHANNEL_TYPES if types is None else types)
+        self.default = default
+        self.rules: list[tuple[Callable[[str], bool], str]] = []
+        self._resolve = lru_cache(maxsize=cache_size)(self._resolve_uncached)
+
+    def add(self, channel: str, channel_type: str) -> None:
+        """
+        Asigna el tipo de un canal exacto (sin distinguir mayúsculas).
+        """
+        self.types[channel.upper()] = channel_type
+        self._resolve.cache_clear()
+
+    def add_rule(self, predicate: Callable[[str], bool], channel_type: str) -> None:
+        """
+        Agrega una regla evaluada, en orden, sobre el canal en mayúsculas si no
+        está en la tabla exacta.
+        """
+        self.rules.append((predicate, channel_type))
+        self._resolve.cache_clear()
+
+    def lookup(self, channel: str) -> str:
+        """
+        Tipo de canal de un valor crudo de 'Channel'.
+        """
+        return self._resolve(channel.upper())
+
+    def _resolve_uncached(self, key: str) -> str:
+        channel_type = self.types.get(key)
+        if channel_type is None:
+            channel_type = next((t for p, t in self.rules if p(key)), self.default)
+        return channel_type
+
+# Reglas por defecto, compartidas por enrich_channel y transform_batch
+CHANNEL_RULES = ChannelRules()
+
+def _normalize_country(d: RecordView) -> None:
+    current = d.get('Merchant_Country')
+    country = str(current or '')
+    code = COUNTRY_MAP.get(country, country)
+    if code != current:
+        d['Merchant_Country'] = code
+
+def _enrich_channel(d: RecordView) -> None:
+    d['Channel_Type'] = CHANNEL_RULES.lookup(d.get('Channel', ''))
+
+def _add_timestamp(d: RecordView) -> None:
+    d['Processed_At'] = datetime.now(UTC).isoformat()
+
+def normalize_country(d: Mapping) -> dict[str, Any]:
     """
     Normaliza el campo 'Merchant_Country' a códigos estándar.
 
@@ -15,27 +115,13 @@ def normalize_country(d: dict) -> dict:
         d (dict): Diccionario con los datos de la transacción.
 
     Returns:
-        dict: Diccionario actualizado con el país normalizado.
-    """
-    country_map = {
-        'México': 'MX',
-        'Mexico': 'MX',
-        'United States': 'US',
-        'USA': 'US',
-        'India': 'IN',
-        'Germany': 'DE',
-        'France': 'FR',
-        'Canada': 'CA',
-        'UK': 'GB',
-        'United Kingdom': 'GB',
-        'UAE': 'AE',
-        'Singapore': 'SG'
-    }
-    country = str(d.get('Merchant_Country') or '')
-    d['Merchant_Country'] = country_map.get(country, country)
-    return d
-
-def enrich_channel(d: dict) -> dict:
+        dict: Registro con el país normalizado.
+    """
+    out = RecordView(d)
+    _normalize_country(out)
+    return out.materialize()
+
+def enrich_channel(d: Mapping) -> dict[str, Any]:
     """
     Agrega el campo 'Channel_Type' según el valor de 'Channel'.
 
@@ -43,18 +129,13 @@ def enrich_channel(d: dict) -> dict:
         d (dict): Diccionario con los datos de la transacción.
 
     Returns:
-        dict: Diccionario enriquecido con el tipo de canal.
+        dict: Registro enriquecido con el tipo de canal.
     """
-    channel = d.get('Channel', '').upper()
-    d['Channel_Type'] = (
-        'Presencial' if channel == 'POS' else
-        'Digital' if channel == 'ONLINE' else
-        'Cajero' if channel == 'ATM' else
-        'Otro'
-    )
-    return d
+    out = RecordView(d)
+    _enrich_channel(out)
+    return out.materialize()
 
-def add_timestamp(d: dict) -> dict:
+def add_timestamp(d: Mapping) -> dict[str, Any]:
     """
     Agrega el campo 'Processed_At' con la fecha y hora actual en formato ISO (UTC).
 
@@ -62,23 +143,93 @@ def add_timestamp(d: dict) -> dict:
         d (dict): Diccionario con los datos de la transacción.
 
     Returns:
-        dict: Diccionario con la marca de tiempo agregada.
+        dict: Registro con la marca de tiempo agregada.
     """
-    d['Processed_At'] = datetime.now(UTC).isoformat()
-    return d
+    out = RecordView(d)
+    _add_timestamp(out)
+    return out.materialize()
 
-def transform_transaction(d: dict) -> dict:
+def transform_transaction(d: Mapping) -> dict[str, Any]:
     """
-    Aplica todas las transformaciones a una transacción.
+    Aplica todas las transformaciones a una transacción en una sola capa.
+
+    Args:
+        d (dict): Diccionario original; no se modifica.
+
+    Returns:
+        dict: Registro transformado.
+    """
+    out = RecordView(d)
+    _normalize_country(out)
+    _enrich_channel(out)
+    _add_timestamp(out)
+    return out.materialize()
+
+def country_codes(values: Iterable[Any]) -> list[str]:
+    """
+    Normaliza una columna de países; cada valor distinto se resuelve una vez.
+
+    Args:
+        values (Iterable): Valores de 'Merchant_Country'.
+
+    Returns:
+        list[str]: Códigos, en el mismo orden.
+    """
+    cache: dict[str, str] = {}
+    out = []
+    for v in values:
+        if isinstance(v, str):
+            code = cache.get(v)
+            if code is None:
+                code = cache[v] = COUNTRY_MAP.get(v or '', v or '')
+        else:
+            country = str(v or '')
+            code = COUNTRY_MAP.get(country, country)
+        out.append(code)
+    return out
+
+def channel_types(values: Iterable[str], rules: Optional[ChannelRules] = None) -> list[str]:
+    """
+    Tipo de canal de una columna de valores de 'Channel'.
+
+    Args:
+        values (Iterable[str]): Valores de 'Channel'.
+        rules (ChannelRules, optional): Reglas; por defecto CHANNEL_RULES.
+
+    Returns:
+        list[str]: Tipos de canal, en el mismo orden.
+    """
+    lookup = (rules or CHANNEL_RULES).lookup
+    return [lookup(v) for v in values]
+
+def transform_batch(records: Iterable[Mapping], processed_at: Optional[datetime] = None,
+                    per_row: bool = False,
+                    rules: Optional[ChannelRules] = None) -> list[dict[str, Any]]:
+    """
+    Aplica transform_transaction a un chunk de registros.
+
+    País y canal se resuelven con las columnas completas (un cálculo por valor
+    distinto) y 'Processed_At' se formatea una sola vez para todo el lote.
 
     Args:
-        d (dict): Diccionario original.
+        records (Iterable): Registros originales; no se modifican.
+        processed_at (datetime, optional): Marca del lote; por defecto la hora actual (UTC).
+        per_row (bool): Marca cada registro con su propia hora, como transform_transaction.
+        rules (ChannelRules, optional): Reglas de canal; por defecto CHANNEL_RULES.
 
     Returns:
-        dict: Diccionario transformado.
+        list[dict]: Registros transformados, en el mismo orden.
     """
-    return add_timestamp(
-        enrich_channel(
-            normalize_country(d)
-        )
-    )
+    records = list(records)
+    countries = country_codes(d.get('Merchant_Country') for d in records)
+    channels = channel_types((d.get('Channel', '') for d in records), rules)
+    stamp = (processed_at or datetime.now(UTC)).isoformat()
+    out = []
+    for d, country, channel_type in zip(records, countries, channels):
+        view = RecordView(d)
+        if country != d.get('Merchant_Country'):
+            view['Merchant_Country'] = country
+        view['Channel_Type'] = channel_type
+        view['Processed_At'] = datetime.now(UTC).isoformat() if per_row else stamp
+        out.append(view.materialize())
+    return out
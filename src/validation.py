@@ -5,11 +5,155 @@ Este módulo valida transacciones contra un esquema definido.
 Utiliza validadores que devuelven Success o Failure usando returns.result.
 """
 
-from typing import Optional, Dict, Any
+from time import perf_counter
+from typing import Optional, Dict, Any, List
 from returns.result import Success, Failure
 from src.schemas import transaction_schema
 
-def validate_transaction(d: Dict[str, Any], schema: Optional[Dict[str, Any]] = None):
+def _apply(k: str, fn: Any, value: Any, typed: bool):
+    """
+    Ejecuta un validador ya resuelto sobre el valor de un campo.
+
+    Returns:
+        tuple: (Failure con el mensaje del campo o None, valor tipado si typed).
+    """
+    try:
+        result = fn(value)
+    except (TypeError, ValueError) as e:
+        # Validadores como float('') lanzan excepción en lugar de devolver Failure
+        return Failure(f"{k} failed: {e}"), None
+    if isinstance(result, Failure):
+        return Failure(f"{k} failed: {result.failure()}"), None
+    if not typed:
+        return None, None
+    # Los tipos como str o float devuelven directamente el valor convertido
+    return None, result.unwrap() if isinstance(result, Success) else result
+
+def _check_field(k: str, validator: Any, value: Any, coerce: bool = False):
+    """
+    Aplica un validador a un campo; con coerce usa su método coerce si existe.
+
+    Returns:
+        tuple: (Failure con el mensaje del campo o None, valor tipado si coerce).
+    """
+    if coerce:
+        validator = getattr(validator, 'coerce', validator)
+    return _apply(k, validator, value, coerce)
+
+class CompiledSchema:
+    """
+    Esquema precompilado para validar muchos registros.
+
+    Resuelve una sola vez los campos requeridos y los validadores (incluidos los
+    métodos coerce), de modo que cada registro solo ejecuta el ciclo de validación.
+    Produce los mismos resultados y mensajes que validate_transaction.
+    """
+    def __init__(self, schema: Dict[str, Any]):
+        self.schema = schema
+        self.fields = tuple(schema)
+        self.required = frozenset(schema)
+        self.validators = tuple(schema.items())
+        self.coercers = tuple((k, getattr(v, 'coerce', v)) for k, v in schema.items())
+
+    def __call__(self, d: Dict[str, Any], coerce: bool = False):
+        """
+        Valida un registro.
+
+        Returns:
+            Success(dict) si es válido, Failure(str) si hay errores.
+        """
+        if not self.required.issubset(d.keys()):
+            return Failure(f"Missing fields: {[k for k in self.fields if k not in d]}")
+        typed = {}
+        for k, fn in self.coercers if coerce else self.validators:
+            failure, value = _apply(k, fn, d[k], coerce)
+            if failure is not None:
+                return failure
+            if coerce:
+                typed[k] = value
+        return Success({**d, **typed}) if coerce else Success(d)
+
+class AdaptiveOrder:
+    """
+    Orden de validación adaptativo según costo y tasa de rechazo observados.
+
+    Como validate_transaction se detiene en el primer fallo, el costo esperado
+    por fila se minimiza evaluando primero los campos con menor costo/rechazo.
+    Cada reorder_every filas se reordena con las estadísticas acumuladas.
+
+    Con deterministic=True se conserva el orden del esquema (y por lo tanto los
+    mismos mensajes de error que sin modo adaptativo); las estadísticas se
+    siguen registrando.
+    """
+    def __init__(self, schema: Optional[Dict[str, Any]] = None,
+                 reorder_every: int = 1000, deterministic: bool = False):
+        if reorder_every <= 0:
+            raise ValueError("reorder_every must be positive")
+        self.schema = transaction_schema if schema is None else schema
+        self.reorder_every = reorder_every
+        self.deterministic = deterministic
+        self.fields: List[str] = list(self.schema)
+        self.calls: Dict[str, int] = dict.fromkeys(self.fields, 0)
+        self.failures: Dict[str, int] = dict.fromkeys(self.fields, 0)
+        self.cost: Dict[str, float] = dict.fromkeys(self.fields, 0.0)
+        self.rows = 0
+
+    def rank(self, k: str) -> float:
+        """
+        Costo promedio dividido por probabilidad de rechazo (suavizada) del campo.
+        """
+        calls = self.calls[k]
+        avg_cost = self.cost[k] / calls if calls else 0.0
+        p_fail = (self.failures[k] + 1) / (calls + 2)
+        return avg_cost / p_fail
+
+    def reorder(self) -> List[str]:
+        """
+        Recalcula el orden de evaluación; sort estable para empates.
+        """
+        if not self.deterministic:
+            self.fields = sorted(self.fields, key=self.rank)
+        return self.fields
+
+    def validate(self, d: Dict[str, Any], coerce: bool = False):
+        """
+        Valida los campos de d en el orden actual registrando costo y resultado.
+
+        Returns:
+            Success(dict) si es válida, Failure(str) con el primer campo que falle.
+        """
+        self.rows += 1
+        if self.rows % self.reorder_every == 0:
+            self.reorder()
+        schema = self.schema
+        typed = {}
+        for k in self.fields:
+            start = perf_counter()
+            failure, value = _check_field(k, schema[k], d[k], coerce)
+            self.cost[k] += perf_counter() - start
+            self.calls[k] += 1
+            if failure is not None:
+                self.failures[k] += 1
+                return failure
+            if coerce:
+                typed[k] = value
+        return Success({**d, **typed}) if coerce else Success(d)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Estadísticas por campo: llamadas, tasa de rechazo y costo promedio (segundos).
+        """
+        return {
+            k: {
+                'calls': self.calls[k],
+                'reject_rate': self.failures[k] / self.calls[k] if self.calls[k] else 0.0,
+                'avg_cost': self.cost[k] / self.calls[k] if self.calls[k] else 0.0,
+            }
+            for k in self.fields
+        }
+
+def validate_transaction(d: Dict[str, Any], schema: Optional[Dict[str, Any]] = None,
+                         order: Optional[AdaptiveOrder] = None, coerce: bool = False):
     """
     Valida una transacción contra el esquema dado.
 
@@ -17,19 +161,32 @@ def validate_transaction(d: Dict[str, Any], schema: Optional[Dict[str, Any]] = N
         d (dict): Transacción a validar.
         schema (dict, optional):
         Esquema de validación. Si no se proporciona, se usa transaction_schema.
+        order (AdaptiveOrder, optional):
+        Orden adaptativo de evaluación; si se proporciona, se valida con su esquema.
+        coerce (bool):
+        Si es True, cada validador devuelve el valor tipado (usando su método coerce
+        si existe) y el resultado es un registro nuevo con esos valores.
 
     Returns:
         Success(dict) si es válida, Failure(str) si hay errores.
     """
-    if schema is None:
+    if order is not None:
+        schema = order.schema
+    elif schema is None:
         schema = transaction_schema
 
     missing = [k for k in schema if k not in d]
     if missing:
         return Failure(f"Missing fields: {missing}")
 
+    if order is not None:
+        return order.validate(d, coerce)
+
+    typed = {}
     for k, validator in schema.items():
-        result = validator(d[k])
-        if isinstance(result, Failure):
-            return Failure(f"{k} failed: {result.failure()}")
-    return Success(d)
+        failure, value = _check_field(k, validator, d[k], coerce)
+        if failure is not None:
+            return failure
+        if coerce:
+            typed[k] = value
+    return Success({**d, **typed}) if coerce else Success(d)
@@ -0,0 +1,41 @@
+"""
+Fixtures compartidas por los tests.
+"""
+
+import csv
+
+import pytest
+
+FIELDS = [
+    'Transaction_ID', 'Card_ID', 'Timestamp', 'Amount', 'Merchant_City',
+    'Merchant_Country', 'Latitude', 'Longitude', 'Device_ID', 'Channel',
+    'Entry_Mode', 'Auth_Method', 'Merchant_Category', 'Transaction_Status'
+]
+
+
+def make_row(i: int, **overrides) -> dict:
+    """Construye una transacción válida en formato CSV (strings)."""
+    row = {
+        'Transaction_ID': f'T{i}', 'Card_ID': f'C{i}', 'Timestamp': '11/20/2025 21:47',
+        'Amount': '120.5', 'Merchant_City': 'Colima', 'Merchant_Country': 'Mexico',
+        'Latitude': '19.24', 'Longitude': '-103.72', 'Device_ID': 'D1', 'Channel': 'POS',
+        'Entry_Mode': 'CHIP', 'Auth_Method': 'PIN', 'Merchant_Category': 'Food',
+        'Transaction_Status': 'Approved'
+    }
+    row.update(overrides)
+    return row
+
+
+@pytest.fixture
+def transactions_csv(tmp_path):
+    """CSV con 10 transacciones: 7 válidas y 3 con errores."""
+    rows = [make_row(i) for i in range(7)]
+    rows.append(make_row(7, Merchant_Country='Brazil'))
+    rows.append(make_row(8, Amount='-5'))
+    rows.append(make_row(9, Timestamp='2025-11-20'))
+    path = tmp_path / "transacciones.csv"
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+    return path
@@ -0,0 +1,127 @@
+"""
+Tests para la ingesta por lotes (batch.py).
+"""
+
+import csv
+import gzip
+import os
+import shutil
+
+from src.batch import discover, load_manifest, run_batch
+from src.cli import main
+
+
+def _partitions(transactions_csv, tmp_path, n=3):
+    """Copia el CSV de prueba en n particiones dentro de un directorio."""
+    src_dir = tmp_path / "particiones"
+    src_dir.mkdir()
+    for i in range(n):
+        shutil.copy(transactions_csv, src_dir / f"parte_{i}.csv")
+    (src_dir / "notas.txt").write_text("no es una entrada", encoding="utf-8")
+    return src_dir
+
+
+def test_discover_directory_and_glob(transactions_csv, tmp_path):
+    """discover expande directorios y patrones, sin archivos ajenos."""
+    src_dir = _partitions(transactions_csv, tmp_path)
+    from_dir = discover([str(src_dir)])
+    assert [os.path.basename(p) for p in from_dir] == ["parte_0.csv", "parte_1.csv", "parte_2.csv"]
+    assert discover([str(src_dir / "parte_1*.csv")]) == [from_dir[1]]
+
+
+def test_run_batch_writes_per_file_and_consolidated(transactions_csv, tmp_path):
+    """Cada archivo tiene sus salidas y las consolidadas suman todas."""
+    src_dir = _partitions(transactions_csv, tmp_path)
+    out = tmp_path / "salida"
+    summary = run_batch([str(src_dir)], str(out), workers=2)
+    assert len(summary["processed"]) == 3
+    assert summary["failed"] == {}
+    assert (summary["total"], summary["valid"], summary["errors"]) == (30, 21, 9)
+
+    manifest = load_manifest(str(out / "manifest.json"))
+    assert all(os.path.exists(e["valid_path"]) for e in manifest.values())
+    with open(summary["valid_path"], encoding="utf-8", newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == 21
+    assert {r["source_file"] for r in rows} == set(manifest)
+    with open(summary["errors_path"], encoding="utf-8", newline="") as f:
+        assert len(list(csv.DictReader(f))) == 9
+
+
+def test_run_batch_skips_unchanged_files(transactions_csv, tmp_path):
+    """Una segunda corrida solo procesa los archivos modificados."""
+    src_dir = _partitions(transactions_csv, tmp_path)
+    out = tmp_path / "salida"
+    run_batch([str(src_dir)], str(out), workers=1)
+
+    changed = src_dir / "parte_2.csv"
+    with open(changed, "a", encoding="utf-8", newline="") as f:
+        f.write(open(transactions_csv, encoding="utf-8").read().splitlines()[1] + "\n")
+    summary = run_batch([str(src_dir)], str(out), workers=1)
+    assert summary["processed"] == [str(changed)]
+    assert len(summary["skipped"]) == 2
+    with open(summary["valid_path"], encoding="utf-8", newline="") as f:
+        assert len(list(csv.DictReader(f))) == 22
+
+
+def test_rerun_drops_stale_outputs(transactions_csv, tmp_path):
+    """Si un archivo ya no tiene errores, sus errores anteriores no se consolidan."""
+    src_dir = _partitions(transactions_csv, tmp_path, n=1)
+    out = tmp_path / "salida"
+    run_batch([str(src_dir)], str(out), workers=1)
+
+    part = src_dir / "parte_0.csv"
+    lines = part.read_text(encoding="utf-8").splitlines()
+    part.write_text("\n".join(lines[:8]) + "\n", encoding="utf-8")
+    summary = run_batch([str(src_dir)], str(out), workers=1)
+    entry = load_manifest(str(out / "manifest.json"))[str(part)]
+    assert summary["errors"] == 0 and entry["errors_path"] is None
+    assert not list((out / "files").glob("*.errors.csv"))
+    with open(summary["errors_path"], encoding="utf-8", newline="") as f:
+        assert list(csv.DictReader(f)) == []
+
+
+def test_consolidates_only_current_inputs(transactions_csv, tmp_path):
+    """Los archivos borrados o fuera de las entradas no se consolidan."""
+    src_dir = _partitions(transactions_csv, tmp_path, n=3)
+    out = tmp_path / "salida"
+    run_batch([str(src_dir)], str(out), workers=1)
+    deleted = src_dir / "parte_1.csv"
+    deleted_outputs = load_manifest(str(out / "manifest.json"))[str(deleted)]
+    deleted.unlink()
+
+    summary = run_batch([str(src_dir / "parte_0.csv")], str(out), workers=1)
+    assert summary["removed"] == [str(deleted)]
+    assert summary["skipped"] == [str(src_dir / "parte_0.csv")]
+    manifest = load_manifest(str(out / "manifest.json"))
+    assert set(manifest) == {str(src_dir / "parte_0.csv"), str(src_dir / "parte_2.csv")}
+    assert not os.path.exists(deleted_outputs["valid_path"])
+    with open(summary["valid_path"], encoding="utf-8", newline="") as f:
+        assert {r["source_file"] for r in csv.DictReader(f)} == {str(src_dir / "parte_0.csv")}
+
+
+def test_failed_file_leaves_manifest(transactions_csv, tmp_path):
+    """Un archivo que falla sale del manifiesto aunque ningún otro termine después."""
+    src_dir = tmp_path / "entrada"
+    src_dir.mkdir()
+    part = src_dir / "parte.csv.gz"
+    with gzip.open(part, "wb") as f:
+        f.write(transactions_csv.read_bytes())
+    out = tmp_path / "salida"
+    run_batch([str(src_dir)], str(out), workers=1)
+    part.write_bytes(b"no es gzip")
+
+    summary = run_batch([str(src_dir)], str(out), workers=1)
+    assert list(summary["failed"]) == [str(part)]
+    assert load_manifest(str(out / "manifest.json")) == {}
+    assert not list((out / "files").glob("*.csv"))
+
+
+def test_cli_batch(transactions_csv, tmp_path, capsys):
+    """El subcomando batch muestra el resumen del lote."""
+    src_dir = _partitions(transactions_csv, tmp_path, n=2)
+    code = main(["batch", str(src_dir), "--out-dir", str(tmp_path / "salida"), "--workers", "2"])
+    assert code == 0
+    out = capsys.readouterr().out
+    assert "Archivos procesados: 2" in out
+    assert "Transacciones válidas: 14" in out
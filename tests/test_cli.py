@@ -0,0 +1,45 @@
+"""
+Tests para el punto de entrada de línea de comandos (cli.py).
+"""
+
+import json
+
+from src.cli import HEAVY_MODULES, IMPORT_BUDGET_MS, main, measure_import_time
+
+
+def test_cli_import_does_not_load_heavy_modules():
+    """Importar el CLI no carga pandas, numpy, matplotlib ni seaborn."""
+    ms, heavy = measure_import_time("src.cli")
+    assert 0 < ms <= IMPORT_BUDGET_MS
+    assert heavy == []
+    assert "pandas" in HEAVY_MODULES
+
+
+def test_bench_imports_within_budget(capsys):
+    """bench --imports devuelve 0 mientras el import esté dentro del presupuesto."""
+    assert main(["bench", "--imports"]) == 0
+    assert f"presupuesto {IMPORT_BUDGET_MS:.0f} ms" in capsys.readouterr().out
+
+
+def test_validate_writes_summary(transactions_csv, tmp_path, capsys):
+    """validate procesa el archivo y guarda el resumen JSON."""
+    summary = tmp_path / "resumen.json"
+    code = main(["validate", str(transactions_csv), "--summary", str(summary)])
+    assert code == 0
+    assert "Transacciones válidas: 7" in capsys.readouterr().out
+    assert json.loads(summary.read_text(encoding="utf-8"))["count"] == 7
+
+
+def test_report_from_summary(transactions_csv, tmp_path):
+    """report regenera el reporte a partir del resumen guardado."""
+    summary = tmp_path / "resumen.json"
+    main(["validate", str(transactions_csv), "--summary", str(summary)])
+    out_dir = tmp_path / "reporte"
+    assert main(["report", str(summary), "--out-dir", str(out_dir), "--no-images"]) == 0
+    assert (out_dir / "reporte.html").exists()
+
+
+def test_bench_requires_input(capsys):
+    """bench sin archivo ni --imports devuelve error de uso."""
+    assert main(["bench"]) == 2
+    assert "bench requiere" in capsys.readouterr().err
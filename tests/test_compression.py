@@ -0,0 +1,115 @@
+"""
+Tests para la lectura y escritura comprimida (compression.py).
+"""
+
+import csv
+import gzip
+import io
+import json
+import shutil
+
+import pytest
+
+from examples.csv_processing import process_csv_transactions
+from src.compression import ThreadedReader, detect_codec, open_text, strip_codec_suffix
+from src.pipeline import run_pipeline
+from src.readers import iter_records
+
+
+def _compress(src, dest, codec_open):
+    with open(src, "rb") as f_in, codec_open(dest, "wb") as f_out:
+        shutil.copyfileobj(f_in, f_out)
+    return dest
+
+
+def test_detect_codec_by_extension_and_magic(tmp_path):
+    """La extensión manda; sin ella se reconocen los bytes mágicos."""
+    assert detect_codec("datos.csv.gz", sniff=False) == "gzip"
+    assert detect_codec("datos.csv.XZ", sniff=False) == "xz"
+    assert detect_codec("datos.csv", sniff=False) is None
+
+    disguised = tmp_path / "datos.dat"
+    with gzip.open(disguised, "wb") as f:
+        f.write(b"a,b\n1,2\n")
+    plain = tmp_path / "plano.csv"
+    plain.write_text("a,b\n1,2\n", encoding="utf-8")
+    assert detect_codec(str(disguised)) == "gzip"
+    assert detect_codec(str(plain)) is None
+    with open_text(str(disguised)) as f:
+        assert f.read() == "a,b\n1,2\n"
+
+
+def test_strip_codec_suffix():
+    """Solo se quita la extensión de compresión."""
+    assert strip_codec_suffix("a/datos.ndjson.gz") == "a/datos.ndjson"
+    assert strip_codec_suffix("a/datos.ndjson") == "a/datos.ndjson"
+
+
+@pytest.mark.parametrize("suffix", [".gz", ".bz2", ".xz"])
+def test_open_text_roundtrip(tmp_path, suffix):
+    """Lo escrito con open_text se lee igual, en streaming."""
+    path = str(tmp_path / f"datos.txt{suffix}")
+    lines = [f"línea {i}\n" for i in range(5000)]
+    with open_text(path, "w") as f:
+        f.writelines(lines)
+    with open(path, "rb") as f:
+        assert f.read(6) != lines[0].encode("utf-8")[:6]
+    with open_text(path) as f:
+        assert list(f) == lines
+
+
+def test_zstd_roundtrip(tmp_path):
+    """zstd funciona si zstandard está instalado."""
+    pytest.importorskip("zstandard")
+    path = str(tmp_path / "datos.txt.zst")
+    with open_text(path, "w") as f:
+        f.write("hola\n")
+    with open_text(path) as f:
+        assert f.read() == "hola\n"
+
+
+def test_threaded_reader_small_blocks_and_errors():
+    """El lector en hilo entrega los bytes en orden y relanza los errores."""
+    data = bytes(range(256)) * 100
+    reader = io.BufferedReader(ThreadedReader(io.BytesIO(data), block_size=7, queue_blocks=2))
+    assert reader.read() == data
+    reader.close()
+
+    class Broken(io.RawIOBase):
+        def readable(self):
+            return True
+
+        def readinto(self, b):
+            raise OSError("disco dañado")
+
+    reader = ThreadedReader(Broken())
+    with pytest.raises(OSError, match="disco dañado"):
+        reader.read(10)
+    reader.close()
+
+
+def test_pipeline_compressed_input_and_outputs(transactions_csv, tmp_path):
+    """El pipeline lee un CSV comprimido y escribe válidas y errores comprimidos."""
+    gz = _compress(transactions_csv, tmp_path / "transacciones.csv.gz", gzip.open)
+    valid = tmp_path / "validas.csv.xz"
+    errors = tmp_path / "errores.csv.gz"
+    summary = run_pipeline(str(gz), str(valid), str(errors), chunk_size=3)
+    assert (summary["total"], summary["valid"], summary["errors"]) == (10, 7, 3)
+    assert detect_codec(str(valid), sniff=False) == "xz"
+    with open_text(str(valid), newline="") as f:
+        assert len(list(csv.DictReader(f))) == 7
+    with open_text(str(errors), newline="") as f:
+        assert [r["row"] for r in csv.DictReader(f)] == ["7", "8", "9"]
+
+
+def test_ndjson_compressed_and_examples(transactions_csv, tmp_path):
+    """NDJSON comprimido y los ejemplos leen archivos comprimidos."""
+    rows = list(iter_records(str(transactions_csv)))
+    path = tmp_path / "transacciones.jsonl.bz2"
+    with open_text(str(path), "w") as f:
+        f.writelines(json.dumps(r) + "\n" for r in rows)
+    assert list(iter_records(str(path))) == rows
+
+    gz = _compress(transactions_csv, tmp_path / "transacciones.csv.gz", gzip.open)
+    result = process_csv_transactions(str(gz))
+    assert len(result["valid"]) == 7
@@ -0,0 +1,177 @@
+"""
+Tests para el demonio de validación sobre socket Unix (daemon.py).
+"""
+
+import csv
+import json
+import os
+import socket
+import threading
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from src.cli import main
+from src.daemon import INTERNER_MAX_VALUES, DaemonClient, ValidationDaemon, default_socket
+from tests.conftest import make_row
+
+
+@pytest.fixture(scope="module")
+def daemon(tmp_path_factory):
+    """Demonio con un worker atendiendo en un hilo."""
+    path = str(tmp_path_factory.mktemp("d") / "v.sock")
+    server = ValidationDaemon(path, workers=1)
+    server.start()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    thread.join()
+    server.close()
+
+
+def test_ping_reports_warm_workers(daemon):
+    """El pool está creado antes del primer trabajo."""
+    with DaemonClient(daemon.socket_path) as client:
+        response = client.ping()
+    assert response["ok"]
+    assert response["workers"] == daemon.worker_pids and len(daemon.worker_pids) == 1
+
+
+def test_validate_single_payload(daemon):
+    """Una transacción se sanitiza, opcionalmente se transforma, y se valida."""
+    with DaemonClient(daemon.socket_path) as client:
+        ok = client.validate(make_row(1), transform=True)
+        bad = client.validate(make_row(2, Amount='-5'))
+    assert ok["status"] == "success"
+    assert ok["data"]["Merchant_Country"] == "MX" and ok["data"]["Amount"] == 120.5
+    assert ok["data"]["Channel_Type"] == "Presencial"
+    assert bad["ok"] and bad["status"] == "failure" and "Amount" in bad["error"]
+
+
+def test_records_stream_and_connection_reuse(daemon):
+    """Un stream NDJSON se resume y la conexión sigue sirviendo peticiones."""
+    records = [make_row(i) for i in range(20)] + [make_row(20, Merchant_Country='Brazil')]
+    lines = [json.dumps(r) + "\n" for r in records] + ["no es json\n"]
+    with DaemonClient(daemon.socket_path) as client:
+        summary = client.validate_records(lines, results=True)
+        assert client.ping()["ok"]
+    assert summary["total"] == 22 and summary["valid"] == 20 and summary["errors"] == 2
+    assert [r["status"] for r in summary["results"]][-2:] == ["failure", "failure"]
+
+
+def test_distinct_values_do_not_grow_interner(daemon):
+    """Valores categóricos distintos sin fin no hacen crecer la caché del demonio."""
+    records = [make_row(i, Merchant_Category=f"cat-{i}") for i in range(INTERNER_MAX_VALUES + 200)]
+    with DaemonClient(daemon.socket_path) as client:
+        summary = client.validate_records(records)
+    assert summary["total"] == INTERNER_MAX_VALUES + 200
+    interner = daemon._interner  # pylint: disable=protected-access
+    assert len(interner.categories("Merchant_Category")) <= INTERNER_MAX_VALUES
+
+
+def test_file_job_runs_in_pool(daemon, transactions_csv, tmp_path):
+    """Un archivo se procesa con run_pipeline en un worker del pool."""
+    valid = tmp_path / "validas.csv"
+    with DaemonClient(daemon.socket_path) as client:
+        summary = client.validate_file(str(transactions_csv), valid_path=str(valid))
+        missing = client.validate_file(str(tmp_path / "no_existe.csv"))
+    assert summary["ok"] and summary["total"] == 10 and summary["valid"] == 7
+    with open(valid, encoding="utf-8", newline="") as f:
+        assert len(list(csv.DictReader(f))) == 7
+    assert not missing["ok"] and "FileNotFoundError" in missing["error"]
+
+
+def test_bad_requests_and_stats(daemon):
+    """Peticiones inválidas responden con error; stats cuenta los trabajos."""
+    with DaemonClient(daemon.socket_path) as client:
+        assert not client.request({"op": "nope"})["ok"]
+        client._sock.sendall(b"[1, 2]\n")  # pylint: disable=protected-access
+        assert "JSON object" in client._receive()["error"]  # pylint: disable=protected-access
+        stats = client.stats()
+    assert stats["ok"] and stats["uptime_seconds"] > 0
+    jobs = stats["metrics"]["daemon_jobs_total"]["samples"]
+    assert any(v["labels"] == {"op": "nope", "ok": "false"} for v in jobs)
+
+
+def test_second_daemon_on_same_socket_is_refused(daemon):
+    """No se puede arrancar otro demonio sobre un socket activo."""
+    with pytest.raises(RuntimeError):
+        ValidationDaemon(daemon.socket_path, workers=1).start()
+
+
+def test_existing_file_at_socket_path_is_kept(tmp_path):
+    """Una ruta que no es un socket no se borra: el arranque falla."""
+    data = tmp_path / "importante.csv"
+    data.write_text("Transaction_ID\nT1\n", encoding="utf-8")
+    with pytest.raises(RuntimeError, match="not a socket"):
+        ValidationDaemon(str(data), workers=1).start()
+    assert data.read_text(encoding="utf-8") == "Transaction_ID\nT1\n"
+
+
+def test_stale_socket_is_replaced(tmp_path):
+    """Un socket huérfano (nadie escucha) se reemplaza al arrancar."""
+    path = str(tmp_path / "v.sock")
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(path)
+    stale.close()
+    server = ValidationDaemon(path, workers=1)
+    server._prepare_socket()  # pylint: disable=protected-access
+    assert not os.path.exists(path)
+
+
+def test_cli_client(daemon, capsys):
+    """El subcomando client imprime la respuesta y devuelve 0 si fue atendida."""
+    code = main(["client", "payload", json.dumps(make_row(3)), "--socket", daemon.socket_path])
+    assert code == 0
+    assert json.loads(capsys.readouterr().out)["status"] == "success"
+    assert main(["client", "file", "--socket", daemon.socket_path]) == 2
+
+
+def test_record_that_raises_does_not_desync_stream(daemon):
+    """Un registro que lanza una excepción cuenta como fallo y la conexión sigue alineada."""
+    ok = make_row(1)
+    with DaemonClient(daemon.socket_path) as client:
+        summary = client.validate_records([ok, make_row(2, Channel=None), ok, ok], transform=True)
+        assert client.ping()["ok"] and client.ping()["ok"]
+    assert summary["ok"] and summary["total"] == 4 and summary["valid"] == 3
+    assert summary["errors"] == 1
+
+
+def test_file_jobs_recover_from_dead_worker(daemon, transactions_csv):
+    """Si un worker muere, el pool se recrea y los trabajos siguientes funcionan."""
+    old_pids = daemon.worker_pids
+    with pytest.raises(BrokenProcessPool):
+        daemon.pool.submit(os._exit, 1).result()
+    with DaemonClient(daemon.socket_path) as client:
+        first = client.validate_file(str(transactions_csv))
+        second = client.validate_file(str(transactions_csv))
+        restarts = client.stats()["metrics"]["daemon_pool_restarts_total"]["samples"]
+    assert second["ok"] and second["valid"] == 7
+    assert first["ok"] or "BrokenProcessPool" in first["error"]
+    assert daemon.worker_pids != old_pids and restarts[0]["value"] == 1
+
+
+def test_default_socket_is_in_private_directory(tmp_path, monkeypatch):
+    """Sin variables de entorno el socket va en un directorio 0700 del usuario."""
+    monkeypatch.delenv("VALIDATION_SOCKET", raising=False)
+    monkeypatch.delenv("XDG_RUNTIME_DIR", raising=False)
+    monkeypatch.setattr("tempfile.gettempdir", lambda: str(tmp_path))
+    path = default_socket()
+    assert os.stat(os.path.dirname(path)).st_mode & 0o777 == 0o700
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+    assert default_socket() == str(tmp_path / "validacion.sock")
+    monkeypatch.setenv("VALIDATION_SOCKET", "/x/v.sock")
+    assert default_socket() == "/x/v.sock"
+
+
+def test_default_socket_rejects_shared_directory(tmp_path, monkeypatch):
+    """Un directorio preexistente con permisos abiertos no se usa."""
+    monkeypatch.delenv("VALIDATION_SOCKET", raising=False)
+    monkeypatch.delenv("XDG_RUNTIME_DIR", raising=False)
+    monkeypatch.setattr("tempfile.gettempdir", lambda: str(tmp_path))
+    shared = tmp_path / f"validacion-{os.getuid()}"
+    shared.mkdir()
+    shared.chmod(0o777)
+    with pytest.raises(RuntimeError):
+        default_socket()
@@ -0,0 +1,53 @@
+"""
+Tests para el destino acotado de errores definido en error_sink.py.
+"""
+
+import csv
+
+from src.error_sink import OTHER, ErrorSink, error_type
+
+
+def test_error_type_uses_prefix():
+    """El tipo de error es el texto antes del primer ':'."""
+    assert error_type("Amount failed: Amount must be positive") == "Amount failed"
+    assert error_type("Missing fields: ['Amount']") == "Missing fields"
+
+
+def test_counts_are_exact_and_samples_bounded():
+    """Conteos exactos con muestra acotada por tipo."""
+    sink = ErrorSink(samples_per_type=3)
+    for i in range(1000):
+        sink.add(i, f"Latitude failed: could not convert '{i}'", {"i": i})
+    assert sink.total == 1000
+    assert sink.counts["Latitude failed"] == 1000
+    assert len(sink.samples["Latitude failed"]) == 3
+    assert sum(sink.messages.values()) + sink.other_messages == 1000
+    assert len(sink.messages) == sink.max_messages
+
+
+def test_max_types_groups_overflow():
+    """Los tipos que exceden max_types se agrupan en 'Other'."""
+    sink = ErrorSink(max_types=2)
+    for field in ("A", "B", "C", "D"):
+        sink.add(0, f"{field} failed: x")
+    assert sink.counts == {"A failed": 1, "B failed": 1, OTHER: 2}
+
+
+def test_spill_writes_incrementally_with_cap(tmp_path):
+    """El detalle se escribe a disco respetando el límite por tipo."""
+    path = tmp_path / "errores.csv"
+    with ErrorSink(spill_path=str(path), max_spill_per_type=5, flush_every=2) as sink:
+        for i in range(10):
+            sink.add(i, "Amount failed: Amount must be positive")
+        sink.add(10, "Timestamp failed: bad")
+    with open(path, encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert [r["row"] for r in rows] == ["0", "1", "2", "3", "4", "10"]
+    assert sink.counts["Amount failed"] == 10
+
+
+def test_no_spill_file_without_errors(tmp_path):
+    """No se crea el archivo si no hubo errores."""
+    path = tmp_path / "errores.csv"
+    ErrorSink(spill_path=str(path)).close()
+    assert not path.exists()
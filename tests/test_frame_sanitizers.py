@@ -0,0 +1,77 @@
+"""
+Tests para los sanitizadores por columna y DataFrame (frame_sanitizers.py).
+"""
+
+import math
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+from src import frame_sanitizers as fs  # noqa: E402
+from src import sanitizers  # noqa: E402
+from tests.conftest import make_row  # noqa: E402
+
+
+def _same(a, b):
+    """Igualdad de valores que trata NaN como igual a NaN y distingue tipos."""
+    if isinstance(a, float) and isinstance(b, float) and math.isnan(a) and math.isnan(b):
+        return True
+    return type(a) is type(b) and a == b
+
+
+def _assert_rows_equal(frame, rows):
+    got = frame.to_dict("records")
+    assert len(got) == len(rows)
+    for g, r in zip(got, rows):
+        assert list(g) == list(r)
+        assert all(_same(g[k], r[k]) for k in r), (g, r)
+
+
+@pytest.fixture
+def messy_frame():
+    """Columnas con texto sucio, HTML, números, booleanos, nulos y tipos mezclados."""
+    return pd.DataFrame({
+        "Texto": ["  hola\n", "a\r\nb", "<b>&'\"", None, "  hola\n", "ok"],
+        "Amount": [" 12.5 ", "-3", "1e5", "١٢", "abc", float("nan")],
+        "Flag": ["yes", "No", "0", "1", " TRUE ", "maybe"],
+        "Mixto": [1, True, "true", 2.5, None, " 7 "],
+        "Merchant_Country": ["Mexico", " France ", "UK", None, float("nan"), "Brazil"],
+    })
+
+
+@pytest.mark.parametrize("name", ["sanitize_text_fields", "escape_html", "convert_numeric_fields",
+                                  "convert_booleans", "normalize_country", "sanitize_input"])
+def test_frame_functions_match_row_functions(messy_frame, name):
+    """Cada variante por DataFrame produce exactamente lo mismo que la versión por fila."""
+    rows = messy_frame.to_dict("records")
+    expected = [getattr(sanitizers, name)(r) for r in rows]
+    _assert_rows_equal(getattr(fs, name)(messy_frame), expected)
+
+
+def test_string_dtype_and_missing_country_column():
+    """Columnas de dtype str y DataFrames sin país se tratan como por fila."""
+    df = pd.DataFrame({"Channel": pd.array([" POS ", "<ATM>", None], dtype="string")})
+    rows = [{"Channel": v if isinstance(v, str) else float("nan")} for v in [" POS ", "<ATM>", None]]
+    expected = [sanitizers.sanitize_input(r) for r in rows]
+    out = fs.sanitize_input(df)
+    assert list(out.columns) == ["Channel", "Merchant_Country"]
+    assert out["Channel"].tolist()[:2] == [e["Channel"] for e in expected[:2]]
+    assert out["Merchant_Country"].tolist() == ["", "", ""]
+
+
+def test_transactions_frame_and_no_mutation():
+    """Sobre transacciones reales coincide con sanitize_input y no modifica la entrada."""
+    rows = [make_row(i, Merchant_Country=c, Channel=f" {ch} ")
+            for i, (c, ch) in enumerate([("Mexico", "POS"), ("USA", "ATM"), ("India", "pos")] * 5)]
+    df = pd.DataFrame(rows)
+    before = df.copy()
+    out = fs.sanitize_input(df)
+    _assert_rows_equal(out, [sanitizers.sanitize_input(r) for r in rows])
+    pd.testing.assert_frame_equal(df, before)
+
+
+def test_column_without_strings_is_returned_unchanged():
+    """Una columna numérica no se copia ni cambia de tipo."""
+    s = pd.Series([1.0, 2.0])
+    assert fs.sanitize_text_column(s) is s
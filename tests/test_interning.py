@@ -0,0 +1,78 @@
+"""
+Tests para el internado de columnas categóricas definido en interning.py.
+"""
+
+import sys
+import threading
+
+from src.interning import CategoricalInterner
+from src.sanitizers import sanitize_input
+
+
+def test_sanitize_row_matches_sanitize_input():
+    """La fila internada es igual a la sanitizada por fila."""
+    row = {
+        'Transaction_ID': ' T1 ',
+        'Channel': ' POS\n',
+        'Merchant_Category': 'Food & Drinks',
+        'Merchant_Country': 'México',
+        'Amount': '10.5',
+    }
+    interner = CategoricalInterner()
+    assert interner.sanitize_row(dict(row)) == sanitize_input(dict(row))
+
+
+def test_sanitize_row_adds_country_like_sanitize_input():
+    """Sin 'Merchant_Country' se agrega vacío, igual que sanitize_input."""
+    row = {'Channel': 'ATM'}
+    interner = CategoricalInterner()
+    assert interner.sanitize_row(dict(row)) == sanitize_input(dict(row))
+
+
+def test_repeated_values_share_object_and_cache():
+    """Cada valor distinto se sanitiza una vez y se comparte el objeto."""
+    interner = CategoricalInterner()
+    a = interner.sanitize_row({'Channel': ''.join(['ONLI', 'NE '])})
+    b = interner.sanitize_row({'Channel': ''.join(['ONL', 'INE '])})
+    assert a['Channel'] is b['Channel']
+    assert interner.misses == 1
+    assert interner.hits == 1
+
+
+def test_encode_decode_roundtrip():
+    """Los códigos enteros se pueden revertir al valor canónico."""
+    interner = CategoricalInterner()
+    rows = [{'Channel': 'POS', 'Amount': 1.0}, {'Channel': 'ATM', 'Amount': 2.0}]
+    encoded = [interner.encode_row(r) for r in rows]
+    assert [e['Channel'] for e in encoded] == [0, 1]
+    assert interner.categories('Channel') == ['POS', 'ATM']
+    assert [interner.decode_row(e) for e in encoded] == rows
+
+
+def test_codes_are_unique_across_threads():
+    """Hilos que internan los mismos valores nuevos obtienen los mismos códigos."""
+    interner = CategoricalInterner()
+    values = [f"V{i}" for i in range(500)]
+    results = []
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        threads = [threading.Thread(target=lambda: results.append(
+            [interner.code('Channel', v) for v in values])) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    finally:
+        sys.setswitchinterval(interval)
+    assert all(r == results[0] for r in results)
+    assert sorted(interner.categories('Channel')) == sorted(values)
+
+
+def test_max_values_bounds_cache():
+    """Con la caché llena los valores nuevos se sanitizan igual pero no se guardan."""
+    interner = CategoricalInterner(max_values=3)
+    rows = [{'Channel': f' canal {i} '} for i in range(10)]
+    assert [interner.sanitize_row(r) for r in rows] == [sanitize_input(r) for r in rows]
+    assert len(interner.categories('Channel')) == 3
+    assert interner.sanitize('Channel', ' canal 1 ') is interner.sanitize('Channel', ' canal 1 ')
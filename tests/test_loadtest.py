@@ -0,0 +1,52 @@
+"""
+Tests para el generador de carga de la API (loadtest.py).
+"""
+
+import random
+
+import pytest
+
+from examples.api_validation import validate_api_batch, validate_api_payload
+from src.cli import main
+from src.loadtest import local_server, make_payload, percentile, run_load
+
+
+def test_percentile_nearest_rank():
+    """Percentiles por rango más cercano."""
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 95) == 95
+    assert percentile(values, 99) == 99
+    assert percentile(values, 100) == 100
+    assert percentile([7], 99) == 7
+    assert percentile([], 50) == 0.0
+
+
+def test_make_payload_mix_matches_validation():
+    """Los payloads generados son válidos salvo la proporción pedida."""
+    rng = random.Random(0)
+    assert all(validate_api_payload(make_payload(rng, i, 0.0))["status"] == "success"
+               for i in range(50))
+    assert all(validate_api_payload(make_payload(rng, i, 1.0))["status"] == "failure"
+               for i in range(50))
+    result = validate_api_batch([make_payload(rng, i, 0.5) for i in range(400)])
+    assert result["valid"] + result["failed"] == 400
+    assert 120 < result["failed"] < 280
+
+
+def test_run_load_against_local_server():
+    """Ambos escenarios completan sin errores HTTP contra uvicorn."""
+    pytest.importorskip("fastapi")
+    pytest.importorskip("uvicorn")
+    with local_server() as port:
+        single = run_load("127.0.0.1", port, "single", concurrency=4, requests=40)
+        bulk = run_load("127.0.0.1", port, "bulk", concurrency=2, requests=6, batch_size=10)
+    assert (single["requests"], single["http_errors"]) == (40, 0)
+    assert bulk["records"] == 60
+    assert 0 < single["latency_ms"]["p50"] <= single["latency_ms"]["p99"]
+
+
+def test_cli_loadtest_requires_port_without_server(capsys):
+    """--no-server sin --port es un error de uso."""
+    assert main(["loadtest", "--no-server"]) == 2
+    assert "--port" in capsys.readouterr().err
@@ -0,0 +1,99 @@
+"""
+Tests para el modo de presupuesto de memoria definido en memory.py.
+"""
+
+import os
+
+import pytest
+
+from src.memory import AdaptiveChunker, RssProbe, parse_size
+
+
+class FakeProbe:
+    """Probe con mediciones controladas por el test."""
+    name = 'fake'
+
+    def __init__(self, per_row, current=0):
+        self.per_row = per_row
+        self.current = current
+        self.rows = 0
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def begin(self):
+        return self.current
+
+    def end(self):
+        return self.current, self.current + self.per_row * self.rows
+
+
+def _run_chunk(chunker, probe, rows):
+    probe.rows = rows
+    chunker.begin()
+    chunker.end(rows)
+
+
+def test_parse_size_units():
+    """Acepta sufijos K, M y G."""
+    assert parse_size("1024") == 1024
+    assert parse_size("2K") == 2048
+    assert parse_size("512M") == 512 * 2 ** 20
+    assert parse_size("1.5GiB") == int(1.5 * 2 ** 30)
+    with pytest.raises(ValueError):
+        parse_size("mucho")
+
+
+def test_chunker_grows_gradually_under_budget():
+    """Con memoria de sobra el chunk crece, limitado por el factor de crecimiento."""
+    chunker = AdaptiveChunker(budget=10_000_000, initial=100, min_size=10, growth=2.0)
+    probe = chunker.probe = FakeProbe(per_row=100)
+    _run_chunk(chunker, probe, chunker.next_size())
+    assert chunker.next_size() == 200
+    _run_chunk(chunker, probe, chunker.next_size())
+    assert chunker.next_size() == 400
+
+
+def test_chunker_shrinks_to_fit_budget():
+    """Si el costo por fila es alto el chunk se reduce para respetar el presupuesto."""
+    chunker = AdaptiveChunker(budget=100_000, initial=1000, min_size=10, safety=1.0)
+    probe = chunker.probe = FakeProbe(per_row=1000)
+    _run_chunk(chunker, probe, chunker.next_size())
+    assert chunker.next_size() == 100
+    summary = chunker.summary()
+    assert summary['chunk_size']['min'] == 100
+    assert summary['peak_bytes'] == 1_000_000
+    assert summary['per_row_bytes'] == 1000
+
+
+def test_chunker_respects_min_size_when_over_budget():
+    """Sin memoria disponible se usa el tamaño mínimo."""
+    chunker = AdaptiveChunker(budget=1000, initial=500, min_size=50)
+    probe = chunker.probe = FakeProbe(per_row=10, current=5000)
+    _run_chunk(chunker, probe, chunker.next_size())
+    assert chunker.next_size() == 50
+
+
+def test_chunker_rejects_invalid_configuration():
+    """Presupuesto no positivo o probe desconocido son errores."""
+    with pytest.raises(ValueError):
+        AdaptiveChunker(budget=0)
+    with pytest.raises(ValueError):
+        AdaptiveChunker(budget=10, probe='psutil')
+
+
+@pytest.mark.skipif(not os.access('/proc/self/clear_refs', os.W_OK),
+                    reason="requiere /proc/self/clear_refs (Linux)")
+def test_rss_probe_sees_memory_freed_inside_chunk():
+    """El pico incluye memoria asignada y liberada dentro del chunk."""
+    probe = RssProbe()
+    probe.start()
+    base = probe.begin()
+    block = b'\x01' * (64 * 2 ** 20)
+    del block
+    current, peak = probe.end()
+    assert peak - base >= 48 * 2 ** 20
+    assert current - base < 48 * 2 ** 20
@@ -0,0 +1,155 @@
+"""
+Tests para el registro de métricas (metrics.py) y su uso en pipeline y API.
+"""
+
+import threading
+
+import pytest
+
+from examples.api_validation import create_app, validate_api_payload
+from src.metrics import Gauge, MetricsRegistry, _Metric, failure_labels
+from src.pipeline import run_pipeline
+from tests.conftest import make_row
+
+
+def test_counter_sums_thread_shards():
+    """Los incrementos de varios hilos se suman, incluso de hilos terminados."""
+    registry = MetricsRegistry()
+    counter = registry.counter("eventos_total", "Eventos", ("tipo",))
+
+    def work():
+        for _ in range(1000):
+            counter.inc(tipo="a")
+        counter.inc(5, tipo="b")
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    counter.inc(tipo="a")
+    assert counter.values() == {("a",): 4001, ("b",): 20}
+    assert counter.values() == {("a",): 4001, ("b",): 20}
+
+
+def test_labels_are_checked_and_series_bounded():
+    """Etiquetas incorrectas fallan y el exceso de series va a 'Other'."""
+    registry = MetricsRegistry()
+    counter = registry.counter("c_total", labelnames=("k",))
+    with pytest.raises(ValueError):
+        counter.inc()
+    counter.max_series = 2
+    for k in "abcd":
+        counter.inc(k=k)
+    assert counter.values() == {("a",): 1, ("b",): 1, ("Other",): 2}
+    with pytest.raises(ValueError):
+        registry.gauge("c_total", labelnames=("k",))
+    assert registry.counter("c_total", labelnames=("k",)) is counter
+
+
+def test_histogram_and_prometheus_text():
+    """El histograma exporta buckets acumulativos, suma y conteo."""
+    registry = MetricsRegistry()
+    hist = registry.histogram("latencia_seconds", "Latencia", ("etapa",), buckets=(0.1, 1.0))
+    for v in (0.05, 0.5, 0.5, 3.0):
+        hist.observe(v, etapa="x")
+    registry.gauge("cola", 'Cola "entrada"').set(3)
+    text = registry.to_prometheus()
+    assert '# TYPE latencia_seconds histogram' in text
+    assert 'latencia_seconds_bucket{etapa="x",le="0.1"} 1' in text
+    assert 'latencia_seconds_bucket{etapa="x",le="1.0"} 3' in text
+    assert 'latencia_seconds_bucket{etapa="x",le="+Inf"} 4' in text
+    assert 'latencia_seconds_sum{etapa="x"} 4.05' in text
+    assert 'latencia_seconds_count{etapa="x"} 4' in text
+    assert '# HELP cola Cola \\"entrada\\"' in text
+    assert 'cola 3.0' in text
+
+
+def test_snapshot_merge_roundtrip():
+    """Un snapshot combinado suma contadores e histogramas."""
+    a = MetricsRegistry()
+    a.counter("c_total", labelnames=("k",)).inc(2, k="x")
+    with a.histogram("h_seconds", buckets=(1.0,)).time():
+        pass
+    b = MetricsRegistry()
+    b.merge(a.snapshot())
+    b.merge(a.snapshot())
+    snap = b.snapshot()
+    assert snap["c_total"]["samples"] == [{"labels": {"k": "x"}, "value": 4}]
+    assert snap["h_seconds"]["samples"][0]["count"] == 2
+    assert snap["h_seconds"]["samples"][0]["buckets"] == [2, 0]
+
+
+def test_metric_base_is_abstract():
+    """La base no se instancia; Gauge define su propia acumulación."""
+    with pytest.raises(TypeError):
+        _Metric("base")  # pylint: disable=abstract-class-instantiated
+    gauge = Gauge("g")
+    total = {}
+    gauge._add(total, (), 3)  # pylint: disable=protected-access
+    gauge._add(total, (), 5)  # pylint: disable=protected-access
+    assert total == {(): 5}
+
+
+def test_failure_labels():
+    """Los mensajes de validación se separan en campo y una regla de nombre fijo."""
+    assert failure_labels("Amount failed: Amount must be positive") == ("Amount", "positive")
+    assert failure_labels("Missing fields: ['Amount']") == ("", "missing_fields")
+    assert failure_labels("Merchant_Country failed: Country Brazil not allowed") == (
+        "Merchant_Country", "country_allowed")
+    assert failure_labels("Amount failed: float() argument must be a string or a real number, "
+                          "not 'list'") == ("Amount", "invalid_value")
+    assert failure_labels("Unknown schema version for refund: 9") == ("", "schema_version")
+    assert failure_labels("algo inesperado") == ("", "Other")
+
+
+def test_series_limit_is_shared_across_threads():
+    """El límite de series se aplica a la métrica completa, no a cada hilo."""
+    counter = MetricsRegistry().counter("t_total", labelnames=("k",))
+    counter.max_series = 3
+
+    def work(i):
+        for j in range(5):
+            counter.inc(k=f"{i}-{j}")
+
+    threads = [threading.Thread(target=work, args=(i,)) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    values = counter.values()
+    assert len(values) == 4 and values[("Other",)] == 17
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_pipeline_metrics_snapshot(transactions_csv, workers):
+    """El pipeline registra resultados, rechazos, etapas y caché."""
+    registry = MetricsRegistry()
+    summary = run_pipeline(str(transactions_csv), chunk_size=4, workers=workers,
+                           metrics=registry)
+    snap = summary["metrics"]
+    records = {s["labels"]["result"]: s["value"]
+               for s in snap["pipeline_records_total"]["samples"]}
+    assert records == {"valid": 7, "failed": 3}
+    fields = {s["labels"]["field"] for s in snap["pipeline_records_failed_total"]["samples"]}
+    assert fields == {"Merchant_Country", "Amount", "Timestamp"}
+    stages = {s["labels"]["stage"]: s["count"]
+              for s in snap["pipeline_stage_seconds"]["samples"]}
+    assert stages == {"read": 3, "sanitize": 3, "validate": 3, "write": 3}
+    assert 0 < snap["interner_cache_hit_ratio"]["samples"][0]["value"] < 1
+    assert ("pipeline_queue_depth_max" in snap) == (workers > 0)
+
+
+def test_api_metrics_endpoint():
+    """validate_api_payload cuenta resultados y /metrics los expone."""
+    pytest.importorskip("fastapi")
+    app = create_app()
+    routes = {r.path: r.endpoint for r in app.routes if hasattr(r, "endpoint")}
+    assert validate_api_payload(make_row(1))["status"] == "success"
+    assert routes["/validate"](make_row(2, Amount="-1"))["status"] == "failure"
+    response = routes["/metrics"]()
+    assert response.media_type.startswith("text/plain")
+    text = response.body.decode("utf-8")
+    assert 'api_validations_total{status="failure"}' in text
+    assert 'api_records_failed_total{field="Amount",rule="positive"}' in text
+    assert "api_validation_seconds_count" in text
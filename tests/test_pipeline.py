@@ -0,0 +1,131 @@
+"""
+Tests para el pipeline por chunks definido en pipeline.py.
+"""
+
+import csv
+import json
+
+import pytest
+
+from src.pipeline import run_pipeline
+from src.registry import default_registry
+from src.schemas import PositiveFloat
+from src.stats import StreamingStats
+from tests.conftest import make_row
+
+
+def test_run_pipeline_counts_and_outputs(transactions_csv, tmp_path):
+    """Separa válidas y errores y escribe ambos CSV."""
+    valid_path = tmp_path / "validas.csv"
+    errors_path = tmp_path / "errores.csv"
+    stats = StreamingStats()
+    summary = run_pipeline(str(transactions_csv), str(valid_path), str(errors_path),
+                           chunk_size=3, stats=stats)
+    assert summary["total"] == 10
+    assert summary["valid"] == 7
+    assert summary["errors"] == 3
+    assert stats.count == 7
+    assert stats.countries == {'MX': 7}
+
+    with open(valid_path, encoding="utf-8") as f:
+        valid = list(csv.DictReader(f))
+    assert len(valid) == 7
+    assert valid[0]['Merchant_Country'] == 'MX'
+
+    with open(errors_path, encoding="utf-8") as f:
+        errors = list(csv.DictReader(f))
+    assert [e['row'] for e in errors] == ['7', '8', '9']
+    assert errors[0]['error'] == "Merchant_Country failed: Country Brazil not allowed"
+
+
+def test_run_pipeline_adaptive_reports_order(transactions_csv):
+    """En modo adaptativo el resumen incluye el orden final de validadores."""
+    summary = run_pipeline(str(transactions_csv), adaptive=True)
+    assert summary["valid"] == 7
+    assert len(summary["validator_order"]) == 14
+
+
+def test_run_pipeline_staged_matches_sequential(transactions_csv, tmp_path):
+    """El modo por etapas produce el mismo resultado que el secuencial."""
+    seq_path = tmp_path / "seq.csv"
+    staged_path = tmp_path / "staged.csv"
+    seq = run_pipeline(str(transactions_csv), str(seq_path), chunk_size=2)
+    staged = run_pipeline(str(transactions_csv), str(staged_path), chunk_size=2,
+                          workers=3, queue_size=1)
+    assert staged["valid"] == seq["valid"]
+    assert staged["error_counts"] == seq["error_counts"]
+    assert set(staged["stages"]) == {"sanitize", "validate", "writer"}
+    with open(seq_path, encoding="utf-8") as a, open(staged_path, encoding="utf-8") as b:
+        assert [r["Transaction_ID"] for r in csv.DictReader(a)] == \
+            [r["Transaction_ID"] for r in csv.DictReader(b)]
+
+
+def test_run_pipeline_memory_budget_reports_chunk_sizes(transactions_csv):
+    """Con presupuesto de memoria el resumen incluye tamaños y pico."""
+    summary = run_pipeline(str(transactions_csv), chunk_size=2, memory_budget=64 * 2 ** 20)
+    assert summary["valid"] == 7
+    memory = summary["memory"]
+    assert memory["probe"] == "tracemalloc"
+    assert memory["peak_bytes"] > 0
+    assert memory["chunk_size"]["max"] >= 2
+
+
+def test_run_pipeline_memory_budget_requires_sequential(transactions_csv):
+    """El presupuesto de memoria no se combina con el modo por etapas."""
+    with pytest.raises(ValueError):
+        run_pipeline(str(transactions_csv), memory_budget=2 ** 20, workers=2)
+
+
+def test_run_pipeline_coerce_writes_typed_values(transactions_csv, tmp_path):
+    """Con coerce las fechas válidas se escriben como epoch."""
+    valid_path = tmp_path / "validas.csv"
+    run_pipeline(str(transactions_csv), str(valid_path), coerce=True)
+    with open(valid_path, encoding="utf-8") as f:
+        first = next(csv.DictReader(f))
+    assert first["Timestamp"] == "1763675220"
+    assert first["Amount"] == "120.5"
+
+
+def test_run_pipeline_with_registry_mixed_ndjson(tmp_path):
+    """Una entrada NDJSON con varios tipos se valida en una pasada."""
+    registry = default_registry()
+    registry.register('refund', {'Refund_ID': str, 'Amount': PositiveFloat()})
+    src_path = tmp_path / "mixed.ndjson"
+    records = [
+        {**make_row(1), 'Record_Type': 'transaction'},
+        {'Record_Type': 'refund', 'Refund_ID': 'R1', 'Amount': '7.5'},
+        {'Record_Type': 'refund', 'Refund_ID': 'R2', 'Amount': '-1'},
+    ]
+    src_path.write_text("".join(json.dumps(r) + "\n" for r in records), encoding="utf-8")
+    valid_path = tmp_path / "validas.ndjson"
+    summary = run_pipeline(str(src_path), str(valid_path), registry=registry)
+    assert summary["record_types"] == {'refund': 2, 'transaction': 1}
+    assert summary["valid"] == 2
+    lines = [json.loads(l) for l in valid_path.read_text(encoding="utf-8").splitlines()]
+    assert lines[1] == {'Record_Type': 'refund', 'Refund_ID': 'R1', 'Amount': 7.5}
+    assert lines[0]['Merchant_Country'] == 'MX'
+
+
+def test_run_pipeline_registry_routes_each_record_once(tmp_path, monkeypatch):
+    """Conteo, país y validación comparten una sola ruta por registro."""
+    registry = default_registry()
+    calls = []
+    route = registry.route
+    monkeypatch.setattr(registry, "route", lambda record: calls.append(1) or route(record))
+    src_path = tmp_path / "t.ndjson"
+    src_path.write_text("".join(json.dumps(make_row(i)) + "\n" for i in range(5)), encoding="utf-8")
+    summary = run_pipeline(str(src_path), registry=registry)
+    assert summary["valid"] == 5 and len(calls) == 5
+
+
+def test_run_pipeline_ndjson_bad_line_is_row_error(tmp_path):
+    """Una línea NDJSON ilegible va al sink de errores y el resto se procesa."""
+    src_path = tmp_path / "sucio.ndjson"
+    lines = [json.dumps(make_row(0)), '{"Transaction_ID": "T1",', json.dumps(make_row(2)), '[1, 2]']
+    src_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    errors_path = tmp_path / "errores.csv"
+    summary = run_pipeline(str(src_path), errors_path=str(errors_path))
+    assert (summary["total"], summary["valid"], summary["errors"]) == (4, 2, 2)
+    assert summary["error_types"] == {"Malformed record": 2}
+    with open(errors_path, encoding="utf-8", newline="") as f:
+        assert [r["row"] for r in csv.DictReader(f)] == ["1", "3"]
@@ -0,0 +1,33 @@
+"""
+Tests para los lectores de entrada definidos en readers.py.
+"""
+
+import pytest
+
+from src.readers import iter_chunks, iter_csv, iter_records
+
+
+def test_iter_csv_yields_dict_rows(tmp_path):
+    """Lee cada fila como diccionario de strings."""
+    path = tmp_path / "in.csv"
+    path.write_text("a,b\n1,x\n2,y\n", encoding="utf-8")
+    assert list(iter_csv(str(path))) == [{'a': '1', 'b': 'x'}, {'a': '2', 'b': 'y'}]
+
+
+def test_iter_chunks_groups_rows():
+    """Agrupa filas y emite el último chunk incompleto."""
+    chunks = list(iter_chunks(({'i': i} for i in range(5)), 2))
+    assert [len(c) for c in chunks] == [2, 2, 1]
+
+
+def test_iter_chunks_rejects_invalid_size():
+    """Rechaza tamaños de chunk no positivos."""
+    with pytest.raises(ValueError):
+        list(iter_chunks([], 0))
+
+
+def test_iter_records_reads_ndjson(tmp_path):
+    """Los archivos .ndjson se leen como un objeto JSON por línea."""
+    path = tmp_path / "in.ndjson"
+    path.write_text('{"a": 1}\n\n{"a": 2}\n', encoding="utf-8")
+    assert list(iter_records(str(path))) == [{'a': 1}, {'a': 2}]
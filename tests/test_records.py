@@ -0,0 +1,44 @@
+"""
+Tests para las vistas copy-on-write definidas en records.py.
+"""
+
+import pytest
+
+from src.records import RecordView, materialize
+
+
+def test_writes_do_not_touch_base():
+    """Las escrituras quedan en la capa y la base no cambia."""
+    base = {'a': 1, 'b': 2}
+    view = RecordView(base)
+    view['a'] = 10
+    view['c'] = 3
+    assert base == {'a': 1, 'b': 2}
+    assert view == {'a': 10, 'b': 2, 'c': 3}
+    assert list(view) == ['a', 'b', 'c']
+    assert view.changes() == {'a': 10, 'c': 3}
+
+
+def test_delete_hides_base_key():
+    """Eliminar una clave la oculta sin modificar la base."""
+    base = {'a': 1, 'b': 2}
+    view = RecordView(base)
+    del view['a']
+    assert 'a' not in view
+    assert view.get('a') is None
+    assert len(view) == 1
+    assert base == {'a': 1, 'b': 2}
+    with pytest.raises(KeyError):
+        view['a']  # pylint: disable=pointless-statement
+
+
+def test_layers_materialize_in_one_copy():
+    """Capas sobre capas se aplanan en un dict con el orden original."""
+    raw = {'a': 1, 'b': 2}
+    first = RecordView(raw)
+    first['b'] = 20
+    second = RecordView(first)
+    second['c'] = 30
+    assert materialize(second) == {'a': 1, 'b': 20, 'c': 30}
+    assert first == {'a': 1, 'b': 20}
+    assert materialize(raw) is raw
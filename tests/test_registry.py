@@ -0,0 +1,83 @@
+"""
+Tests para el registro y enrutamiento de esquemas definido en registry.py.
+"""
+
+from returns.result import Success, Failure
+
+from src.registry import SchemaRegistry, default_registry
+from src.schemas import PositiveFloat
+
+
+def _registry():
+    registry = SchemaRegistry()
+    registry.register('refund', {'Refund_ID': str, 'Amount': PositiveFloat()})
+    registry.register('refund', {'Refund_ID': str, 'Amount': PositiveFloat(), 'Reason': str},
+                      version=2)
+    registry.register('chargeback', {'Case_ID': str})
+    return registry
+
+
+def test_routes_by_discriminator_and_latest_version():
+    """Cada registro se valida con el esquema de su tipo, versión más reciente."""
+    registry = _registry()
+    ok = registry.validate({'Record_Type': 'refund', 'Refund_ID': 'R1', 'Amount': '5',
+                            'Reason': 'x'})
+    assert isinstance(ok, Success)
+    missing = registry.validate({'Record_Type': 'refund', 'Refund_ID': 'R1', 'Amount': '5'})
+    assert missing.failure() == "Missing fields: ['Reason']"
+
+
+def test_explicit_version_field():
+    """Schema_Version selecciona una versión anterior."""
+    registry = _registry()
+    result = registry.validate({'Record_Type': 'refund', 'Schema_Version': '1',
+                                'Refund_ID': 'R1', 'Amount': '5'})
+    assert isinstance(result, Success)
+    unknown = registry.validate({'Record_Type': 'refund', 'Schema_Version': '9'})
+    assert unknown.failure() == "Unknown schema version for refund: 9"
+
+
+def test_non_finite_version_is_unknown():
+    """Una versión que no cabe en un entero es un fallo del registro, no una excepción."""
+    registry = _registry()
+    for version in ('inf', '1e400', 'nan'):
+        record = {'Record_Type': 'refund', 'Schema_Version': version}
+        assert registry.route(record) == ('refund', -1)
+        assert not registry.has_field(record, 'Amount')
+        assert registry.validate(record).failure() == \
+            f"Unknown schema version for refund: {version}"
+
+
+def test_unknown_type_fails():
+    """Un tipo no registrado produce Failure."""
+    result = _registry().validate({'Record_Type': 'payout'})
+    assert isinstance(result, Failure)
+    assert result.failure() == "Unknown record type: payout"
+
+
+def test_compiled_schema_is_cached_and_invalidated():
+    """El esquema compilado se reutiliza y se recompila al re-registrar."""
+    registry = _registry()
+    first = registry.compiled('chargeback')
+    assert registry.compiled('chargeback') is first
+    registry.register('chargeback', {'Case_ID': str, 'Amount': PositiveFloat()})
+    assert registry.compiled('chargeback') is not first
+
+
+def test_validate_stream_single_pass():
+    """Un flujo mezclado se valida en una sola pasada."""
+    records = [
+        {'Record_Type': 'refund', 'Refund_ID': 'R1', 'Amount': '-1', 'Reason': 'x'},
+        {'Record_Type': 'chargeback', 'Case_ID': 'C1'},
+    ]
+    results = list(_registry().validate_stream(records))
+    assert [t for t, _ in results] == ['refund', 'chargeback']
+    assert results[0][1].failure() == "Amount failed: Amount must be positive"
+    assert isinstance(results[1][1], Success)
+
+
+def test_default_registry_uses_transaction_schema():
+    """Sin discriminador se usa el esquema de transacciones."""
+    registry = default_registry()
+    assert registry.names() == ['transaction']
+    assert registry.route({}) == ('transaction', None)
@@ -0,0 +1,38 @@
+"""
+Tests para la generación de reportes sin interfaz gráfica (report.py).
+"""
+
+import json
+import os
+
+import pytest
+
+from src.report import render_report
+from src.stats import StreamingStats
+
+
+def _stats():
+    stats = StreamingStats()
+    stats.update_chunk([
+        {'Amount': 10.0, 'Merchant_Country': 'MX', 'Latitude': 19.2, 'Longitude': -103.7},
+        {'Amount': 20.0, 'Merchant_Country': 'US', 'Latitude': 40.7, 'Longitude': -74.0},
+    ])
+    return stats
+
+
+def test_render_report_without_images(tmp_path):
+    """Escribe JSON y HTML sin necesidad de matplotlib."""
+    files = render_report(_stats(), str(tmp_path), images=False)
+    assert [os.path.basename(f) for f in files] == ["resumen.json", "reporte.html"]
+    with open(tmp_path / "resumen.json", encoding="utf-8") as f:
+        assert json.load(f)['countries'] == {'MX': 1, 'US': 1}
+    assert "Transacciones válidas: 2" in (tmp_path / "reporte.html").read_text(encoding="utf-8")
+
+
+def test_render_report_with_images(tmp_path):
+    """Genera los PNG con el backend headless de matplotlib."""
+    pytest.importorskip("matplotlib")
+    files = render_report(_stats(), str(tmp_path))
+    for name in ("montos.png", "geo.png", "paises.png"):
+        assert str(tmp_path / name) in files
+        assert (tmp_path / name).stat().st_size > 0
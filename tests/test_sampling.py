@@ -0,0 +1,129 @@
+"""
+Tests para el dry-run por muestreo (sampling.py).
+"""
+
+import csv
+import gzip
+import json
+import random
+import shutil
+
+import pytest
+
+from src.cli import main
+from src.sampling import dry_run, seek_sample, wilson_interval
+from tests.conftest import FIELDS, make_row
+
+
+@pytest.fixture
+def big_csv(tmp_path):
+    """CSV de 2000 filas con 10% de Timestamp inválido."""
+    path = tmp_path / "grande.csv"
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        for i in range(2000):
+            writer.writerow(make_row(i, Timestamp='2025-11-20') if i % 10 == 0 else make_row(i))
+    return path
+
+
+def test_wilson_interval():
+    """El intervalo contiene la proporción y se mantiene en [0, 1]."""
+    low, high = wilson_interval(10, 100)
+    assert low < 0.1 < high
+    assert wilson_interval(0, 50)[0] == 0.0
+    assert wilson_interval(50, 50)[1] == 1.0
+    assert wilson_interval(0, 0) == (0.0, 1.0)
+    assert wilson_interval(10, 100, 0.99)[0] < low
+
+
+def test_seek_sample_returns_distinct_complete_records(big_csv):
+    """Cada muestra es una fila completa, distinta y alineada al inicio de línea."""
+    records, estimated = seek_sample(str(big_csv), 200, random.Random(0))
+    assert len(records) == 200
+    assert len({pos for pos, _ in records}) == 200
+    assert all(r["Transaction_ID"].startswith("T") and set(r) == set(FIELDS) for _, r in records)
+    assert 1800 <= estimated <= 2200
+    with open(big_csv, "rb") as f:
+        for pos, record in records[:20]:
+            f.seek(pos)
+            assert f.readline().decode("utf-8").startswith(record["Transaction_ID"] + ",")
+
+
+def test_seek_sample_ndjson(transactions_csv, tmp_path):
+    """En NDJSON se muestrea sin encabezado; con muestra grande se cubre todo."""
+    path = tmp_path / "transacciones.ndjson"
+    with open(transactions_csv, encoding="utf-8", newline="") as f_in, \
+            open(path, "w", encoding="utf-8") as f_out:
+        for row in csv.DictReader(f_in):
+            f_out.write(json.dumps(row) + "\n")
+    records, _ = seek_sample(str(path), 100, random.Random(1))
+    assert sorted(r["Transaction_ID"] for _, r in records) == [f"T{i}" for i in range(10)]
+
+
+def test_dry_run_estimates_error_rate(big_csv):
+    """La tasa estimada por tipo cubre la tasa real con su intervalo."""
+    report = dry_run(str(big_csv), sample_size=500, seed=3)
+    assert report["method"] == "seek"
+    assert report["sample_size"] == 500
+    ts = report["by_type"]["Timestamp failed"]
+    assert ts["low"] <= 0.1 <= ts["high"]
+    assert report["errors"]["count"] == ts["count"]
+    assert report["examples"]["Timestamp failed"][0]["error"].startswith("Timestamp failed")
+
+
+def test_malformed_lines_count_as_failures(tmp_path):
+    """Las líneas completas mal formadas son errores, no se descartan."""
+    csv_path = tmp_path / "sucio.csv"
+    with open(csv_path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(FIELDS)
+        for i in range(1000):
+            row = list(make_row(i).values())
+            writer.writerow(row[:5] if i % 5 == 0 else row)
+    report = dry_run(str(csv_path), sample_size=400, seed=0)
+    malformed = report["by_type"]["Malformed record"]
+    assert malformed["low"] <= 0.2 <= malformed["high"]
+
+    ndjson_path = tmp_path / "sucio.ndjson"
+    with open(ndjson_path, "w", encoding="utf-8") as f:
+        for i in range(1000):
+            f.write("{roto\n" if i % 5 == 0 else json.dumps(make_row(i)) + "\n")
+    report = dry_run(str(ndjson_path), sample_size=400, seed=0)
+    assert report["by_type"]["Malformed record"]["low"] <= 0.2 <= report["errors"]["high"]
+
+
+def test_seek_inside_quoted_field_is_skipped(tmp_path):
+    """Un salto dentro de un campo de varias líneas se descarta; el registro se toma completo."""
+    path = tmp_path / "multilinea.csv"
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        for i in range(500):
+            writer.writerow(make_row(i, Merchant_City="Colima\nCentro\nNorte" if i % 2 else "Colima"))
+    records, _ = seek_sample(str(path), 200, random.Random(0))
+    assert records and all(set(r) == set(FIELDS) for _, r in records)
+    assert any("\n" in r["Merchant_City"] for _, r in records)
+    assert dry_run(str(path), sample_size=200, seed=0)["errors"]["count"] == 0
+
+
+def test_dry_run_compressed_uses_reservoir(big_csv, tmp_path):
+    """Un archivo comprimido se muestrea con reservoir y conoce el total exacto."""
+    gz = tmp_path / "grande.csv.gz"
+    with open(big_csv, "rb") as f_in, gzip.open(gz, "wb") as f_out:
+        shutil.copyfileobj(f_in, f_out)
+    report = dry_run(str(gz), sample_size=300, seed=0)
+    assert report["method"] == "reservoir"
+    assert report["estimated_records"] == 2000
+    assert report["sample_size"] == 300
+
+
+def test_cli_dry_run_fail_above(big_csv, tmp_path, capsys):
+    """dry-run falla si la tasa de error supera el umbral con certeza."""
+    out = tmp_path / "muestra.json"
+    assert main(["dry-run", str(big_csv), "--sample", "400", "--seed", "1",
+                 "--json", str(out)]) == 0
+    assert "Tasa de error" in capsys.readouterr().out
+    assert json.loads(out.read_text(encoding="utf-8"))["sample_size"] == 400
+    assert main(["dry-run", str(big_csv), "--sample", "400", "--seed", "1",
+                 "--fail-above", "0.01"]) == 1
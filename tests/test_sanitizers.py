@@ -3,6 +3,10 @@ Tests para las funciones de sanitización definidas en sanitizers.py:
 - Limpieza de texto, escape HTML, conversión numérica y booleana, normalización de país.
 """
 
+import json
+
+from src import sanitizers
+from src.records import RecordView
 from src.sanitizers import (
     sanitize_text_fields,
     escape_html,
@@ -87,3 +91,20 @@ def test_sanitize_input_applies_all_sanitizers():
     assert result['note'] == '&lt;b&gt;Oferta&lt;/b&gt;'
     assert result['amount'] == 99.99
     assert result['confirmed'] is True
+
+def test_sanitize_input_does_not_mutate_input():
+    """El registro crudo se conserva para auditoría."""
+    raw = {'Merchant_Country': 'México', 'note': ' <b> ', 'amount': '1.5'}
+    snapshot = dict(raw)
+    result = sanitize_input(raw)
+    assert raw == snapshot
+    assert result['Merchant_Country'] == 'MX'
+    assert json.loads(json.dumps(result)) == result
+
+
+def test_stages_only_record_changed_values():
+    """La capa guarda solo los valores que una etapa cambia."""
+    view = RecordView({'a': 'limpio', 'b': ' sucio ', 'n': 1.5, 'Merchant_Country': 'Mexico'})
+    for stage in sanitizers._STAGES:  # pylint: disable=protected-access
+        stage(view)
+    assert view.changes() == {'b': 'sucio', 'Merchant_Country': 'MX'}
@@ -63,3 +63,22 @@ def test_country_whitelist_rejects_disallowed_country():
     result = validator('FR')
     assert isinstance(result, Failure)
     assert result.failure() == "Country FR not allowed"
+
+def test_date_validator_coerce_returns_epoch():
+    """coerce devuelve la fecha como epoch UTC en segundos."""
+    validator = DateValidator()
+    result = validator.coerce("11/20/2025 21:47")
+    assert isinstance(result, Success)
+    assert result.unwrap() == 1763675220
+    assert isinstance(validator.coerce("2025-11-20"), Failure)
+
+def test_positive_float_coerce_returns_float():
+    """coerce devuelve el monto como float."""
+    assert PositiveFloat().coerce("12.5").unwrap() == 12.5
+
+def test_country_whitelist_coerce_matches_call():
+    """coerce acepta y rechaza exactamente lo mismo que la validación normal."""
+    validator = CountryWhitelist(['MX', 'US'])
+    assert validator.coerce('MX').unwrap() == 'MX'
+    for value in (' mx ', 'mx', 'FR'):
+        assert validator.coerce(value).failure() == validator(value).failure()
@@ -0,0 +1,97 @@
+"""
+Tests para el destino SQLite (sqlite_sink.py).
+"""
+
+import json
+import sqlite3
+
+import pytest
+
+from src.cli import main
+from src.pipeline import run_pipeline
+from src.schemas import transaction_schema
+from src.sqlite_sink import SQLiteSink, column_types
+
+
+def _query(path, sql):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute(sql).fetchall()
+    finally:
+        conn.close()
+
+
+def _indexes(path):
+    return {name for (name,) in _query(path, "SELECT name FROM sqlite_master WHERE type='index'")}
+
+
+def test_column_types_from_schema():
+    """Los tipos SQL salen de los validadores del esquema."""
+    types = column_types(transaction_schema)
+    assert types["Transaction_ID"] == "TEXT"
+    assert types["Amount"] == "REAL"
+    assert types["Latitude"] == "REAL"
+    assert types["Timestamp"] == "TEXT"
+    assert types["Merchant_Country"] == "TEXT"
+    assert column_types(transaction_schema, coerce=True)["Timestamp"] == "INTEGER"
+
+
+def test_batches_wal_and_indexes_after_load(tmp_path):
+    """Inserta por lotes en WAL y crea los índices solo al cerrar."""
+    path = str(tmp_path / "t.db")
+    sink = SQLiteSink(path, batch_size=4)
+    rows = [{"Transaction_ID": f"T{i}", "Amount": 10.0 + i, "Extra": "x"} for i in range(10)]
+    sink.write(rows[:5])
+    assert sink.transactions == 1
+    assert _query(path, "PRAGMA journal_mode") == [("wal",)]
+    assert not any(n.startswith("ix_") for n in _indexes(path))
+    sink.write(rows[5:])
+    sink.write_errors([(3, "Amount failed: Amount must be positive", {"Amount": -1})])
+    sink.close()
+    assert sink.summary()["rows"] == 10
+    assert _query(path, "SELECT COUNT(*), SUM(Amount) FROM transactions") == [(10, 145.0)]
+    (row, error, record), = _query(path, "SELECT row, error, record FROM errors")
+    assert (row, json.loads(record)) == (3, {"Amount": -1})
+    assert {"ix_transactions_Transaction_ID", "ix_transactions_Card_ID"} <= _indexes(path)
+
+
+def test_upsert_by_transaction_id(tmp_path):
+    """Con upsert, una clave repetida reemplaza la fila anterior."""
+    path = str(tmp_path / "t.db")
+    with SQLiteSink(path, upsert=True) as sink:
+        sink.write([{"Transaction_ID": "T1", "Amount": 1.0}, {"Transaction_ID": "T2", "Amount": 2.0}])
+    with SQLiteSink(path, upsert=True) as sink:
+        sink.write([{"Transaction_ID": "T1", "Amount": 5.0}])
+    assert _query(path, "SELECT Transaction_ID, Amount FROM transactions ORDER BY 1") == [
+        ("T1", 5.0), ("T2", 2.0)]
+    assert "ux_transactions_Transaction_ID" in _indexes(path)
+    with pytest.raises(ValueError):
+        SQLiteSink(path, upsert=True, key="Missing")
+
+
+def test_existing_table_with_other_types_is_rejected(tmp_path):
+    """Una tabla creada sin coerce no se reutiliza para una carga con coerce."""
+    path = str(tmp_path / "t.db")
+    SQLiteSink(path).close()
+    with pytest.raises(ValueError, match="Timestamp TEXT"):
+        SQLiteSink(path, coerce=True)
+    SQLiteSink(path).close()
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_pipeline_loads_database(transactions_csv, tmp_path, workers):
+    """El pipeline carga válidas y errores, también desde el hilo escritor."""
+    path = str(tmp_path / "t.db")
+    summary = run_pipeline(str(transactions_csv), chunk_size=3, workers=workers,
+                           db=SQLiteSink(path, coerce=True), coerce=True)
+    assert summary["db"]["rows"] == 7
+    assert _query(path, "SELECT COUNT(*) FROM errors") == [(3,)]
+    assert _query(path, "SELECT DISTINCT typeof(Timestamp) FROM transactions") == [("integer",)]
+
+
+def test_cli_validate_db(transactions_csv, tmp_path, capsys):
+    """validate --db muestra la carga en el resumen."""
+    path = str(tmp_path / "t.db")
+    assert main(["validate", str(transactions_csv), "--db", path, "--db-upsert"]) == 0
+    assert "SQLite" in capsys.readouterr().out
+    assert _query(path, "SELECT COUNT(*) FROM transactions") == [(7,)]
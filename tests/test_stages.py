@@ -0,0 +1,95 @@
+"""
+Tests para el pipeline por etapas con colas acotadas (stages.py).
+"""
+
+import threading
+import time
+
+import pytest
+
+from src.stages import Stage, StagedPipeline
+
+
+def test_staged_pipeline_preserves_order_with_many_workers():
+    """Con ordered=True el destino recibe los elementos en orden."""
+    out = []
+
+    def slow_double(x):
+        time.sleep(0.001 * (x % 3))
+        return x * 2
+
+    pipeline = StagedPipeline(range(50), [Stage("double", slow_double, workers=4),
+                                          Stage("inc", lambda x: x + 1, workers=2)],
+                              out.append, maxsize=2)
+    metrics = pipeline.run()
+    assert out == [x * 2 + 1 for x in range(50)]
+    assert metrics["double"]["items"] == 50
+    assert metrics["writer"]["depth_max"] <= 2
+
+
+def test_staged_pipeline_without_stages():
+    """Sin etapas intermedias la fuente llega directo al destino."""
+    out = []
+    StagedPipeline(iter("abc"), [], out.append).run()
+    assert out == ["a", "b", "c"]
+
+
+def test_staged_pipeline_propagates_stage_error():
+    """Un error en una etapa cancela el pipeline y se relanza."""
+    def boom(x):
+        if x == 5:
+            raise ValueError("bad item")
+        return x
+
+    pipeline = StagedPipeline(range(1000), [Stage("boom", boom, workers=2)],
+                              lambda _: None, maxsize=1)
+    with pytest.raises(ValueError, match="bad item"):
+        pipeline.run()
+    assert pipeline.cancelled
+
+
+def test_backpressure_bounds_reader():
+    """La fuente no avanza más allá de la capacidad de las colas."""
+    produced = []
+    release = threading.Event()
+
+    def source():
+        for i in range(100):
+            produced.append(i)
+            yield i
+
+    def sink(_):
+        release.wait(1)
+
+    pipeline = StagedPipeline(source(), [Stage("id", lambda x: x)], sink, maxsize=1)
+    thread = threading.Thread(target=pipeline.run)
+    thread.start()
+    time.sleep(0.2)
+    # Cola de entrada + worker + cola de salida + escritor, más el elemento en put
+    assert len(produced) <= 6
+    release.set()
+    thread.join(5)
+    assert len(produced) == 100
+
+
+def test_slow_chunk_bounds_reorder_buffer():
+    """Un elemento lento no deja crecer sin límite los pendientes de reordenar."""
+    out = []
+
+    def slow_first(x):
+        if x == 0:
+            time.sleep(0.3)
+        return x
+
+    pipeline = StagedPipeline(range(200), [Stage("slow", slow_first, workers=4)],
+                              out.append, maxsize=2)
+    pipeline.run()
+    assert out == list(range(200))
+    # maxsize en el heap más lo que ya estaba en colas y workers al pausar la lectura
+    assert 0 < pipeline.pending_max <= 2 + 2 * 2 + 4
+
+
+def test_stage_requires_worker():
+    """Una etapa sin workers es inválida."""
+    with pytest.raises(ValueError):
+        Stage("x", lambda x: x, workers=0)
@@ -0,0 +1,53 @@
+"""
+Tests para el colector incremental de estadísticas definido en stats.py.
+"""
+
+import pytest
+
+from src.stats import StreamingStats
+
+
+def _rows():
+    return [
+        {'Amount': 5.0, 'Merchant_Country': 'MX', 'Latitude': 19.2, 'Longitude': -103.7},
+        {'Amount': 15.0, 'Merchant_Country': 'MX', 'Latitude': 19.8, 'Longitude': -103.1},
+        {'Amount': 150.0, 'Merchant_Country': 'US', 'Latitude': 40.7, 'Longitude': -74.0},
+        {'Amount': float('nan'), 'Merchant_Country': 'IN', 'Latitude': None, 'Longitude': 77.2},
+    ]
+
+
+def test_update_chunk_builds_histogram_and_counts():
+    """Acumula histograma, conteo por país y celdas geográficas."""
+    stats = StreamingStats(amount_min=0, amount_max=100, bins=10)
+    stats.update_chunk(_rows())
+    assert stats.count == 4
+    assert stats.amount_bins[0] == 1
+    assert stats.amount_bins[1] == 1
+    assert stats.overflow == 1
+    assert stats.countries == {'MX': 2, 'US': 1, 'IN': 1}
+    assert stats.geo_cells[(19, -104)] == 2
+    assert stats.amount_mean() == pytest.approx(170 / 3)
+
+
+def test_merge_equals_single_pass():
+    """Combinar colectores parciales equivale a una sola pasada."""
+    rows = _rows()
+    full = StreamingStats()
+    full.update_chunk(rows)
+    a, b = StreamingStats(), StreamingStats()
+    a.update_chunk(rows[:2])
+    b.update_chunk(rows[2:])
+    assert a.merge(b).to_dict() == full.to_dict()
+
+
+def test_to_dict_roundtrip():
+    """from_dict reconstruye el mismo resumen."""
+    stats = StreamingStats()
+    stats.update_chunk(_rows())
+    assert StreamingStats.from_dict(stats.to_dict()).to_dict() == stats.to_dict()
+
+
+def test_invalid_range_raises():
+    """Rechaza rangos de histograma vacíos."""
+    with pytest.raises(ValueError):
+        StreamingStats(amount_min=10, amount_max=10)
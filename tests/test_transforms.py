@@ -4,6 +4,9 @@ tests/test_transforms.py
 Pruebas unitarias para el módulo transforms.py
 """
 
+import json
+from datetime import datetime, UTC
+
 from src import transforms
 
 
@@ -80,3 +83,81 @@ def test_transform_transaction_full():
     assert result["Merchant_Country"] == "MX"
     assert result["Channel_Type"] == "Presencial"
     assert "Processed_At" in result
+
+
+def test_transform_transaction_keeps_original():
+    """
+    Verifica que transform_transaction no modifica el diccionario de entrada.
+    """
+    d = {"Merchant_Country": "México", "Channel": "POS"}
+    result = transforms.transform_transaction(d)
+    assert d == {"Merchant_Country": "México", "Channel": "POS"}
+    assert type(result) is dict and json.loads(json.dumps(result)) == result
+
+
+def test_channel_rules_table_rules_and_default():
+    """
+    La tabla exacta tiene prioridad, luego las reglas en orden y luego el default.
+    """
+    rules = transforms.ChannelRules()
+    assert rules.lookup("pos") == "Presencial"
+    assert rules.lookup("Kiosk") == "Otro"
+    rules.add("kiosk", "Autoservicio")
+    rules.add_rule(lambda c: c.startswith("WEB"), "Digital")
+    assert rules.lookup("Kiosk") == "Autoservicio"
+    assert rules.lookup("web-app") == "Digital"
+    assert transforms.channel_types(["ATM", "web", "x"], rules) == ["Cajero", "Digital", "Otro"]
+
+
+def test_channel_rules_cache_is_bounded():
+    """
+    La memoria se indexa por canal en mayúsculas y no crece más que cache_size.
+    """
+    rules = transforms.ChannelRules(cache_size=8)
+    assert [rules.lookup(c) for c in ("pos", "Pos", "POS")] == ["Presencial"] * 3
+    assert rules._resolve.cache_info().currsize == 1  # pylint: disable=protected-access
+    for i in range(100):
+        rules.lookup(f"canal-{i}")
+    assert rules._resolve.cache_info().currsize == 8  # pylint: disable=protected-access
+    rules.add("canal-99", "Nuevo")
+    assert rules.lookup("CANAL-99") == "Nuevo"
+
+
+def test_country_codes_column():
+    """
+    country_codes equivale a normalize_country valor por valor.
+    """
+    values = ["Mexico", "UK", "Brazil", None, "", "Mexico"]
+    expected = [transforms.normalize_country({"Merchant_Country": v})["Merchant_Country"] for v in values]
+    assert transforms.country_codes(values) == expected == ["MX", "GB", "Brazil", "", "", "MX"]
+
+
+def test_transform_batch_matches_per_record_with_one_stamp():
+    """
+    transform_batch da lo mismo que transform_transaction con una marca por lote.
+    """
+    records = [
+        {"Merchant_Country": "Mexico", "Channel": "pos"},
+        {"Merchant_Country": "France", "Channel": "ONLINE"},
+        {"Channel": "other"},
+    ]
+    stamp = datetime(2025, 11, 20, 21, 47, tzinfo=UTC)
+    out = transforms.transform_batch(records, processed_at=stamp)
+    for original, batched in zip(records, out):
+        single = transforms.transform_transaction(original)
+        del single["Processed_At"]
+        got = dict(batched)
+        assert got.pop("Processed_At") == stamp.isoformat()
+        assert got == single
+    assert records[0] == {"Merchant_Country": "Mexico", "Channel": "pos"}
+
+
+def test_transform_batch_stamps_once_or_per_row():
+    """
+    Sin marca dada, todo el lote comparte la hora; per_row la calcula por registro.
+    """
+    records = [{"Channel": "ATM"}] * 50
+    batch = transforms.transform_batch(records)
+    assert len({r["Processed_At"] for r in batch}) == 1
+    per_row = transforms.transform_batch(records, per_row=True)
+    assert all(datetime.fromisoformat(r["Processed_At"]).tzinfo is not None for r in per_row)
@@ -4,8 +4,10 @@ tests/test_validation.py
 Pruebas unitarias para el módulo validation.py
 """
 
+import pytest
 from returns.result import Success, Failure
-from src.validation import validate_transaction
+from src.schemas import CountryWhitelist, DateValidator, PositiveFloat
+from src.validation import AdaptiveOrder, CompiledSchema, validate_transaction
 
 
 def test_validate_transaction_missing_fields():
@@ -57,3 +59,104 @@ def test_validate_transaction_success():
     result = validate_transaction(d, schema)
     assert isinstance(result, Success)
     assert result.unwrap() == d
+
+
+def test_validate_transaction_validator_exception():
+    """Verifica que una excepción del validador se convierte en Failure."""
+    schema = {"Latitude": float}
+    result = validate_transaction({"Latitude": ""}, schema)
+    assert isinstance(result, Failure)
+    assert result.failure().startswith("Latitude failed:")
+
+
+def _slow_ok(_):
+    """Validador costoso que siempre pasa."""
+    sum(range(2000))
+    return Success("ok")
+
+
+def test_adaptive_order_moves_cheap_rejecting_field_first():
+    """El campo barato que más rechaza pasa al frente tras reordenar."""
+    schema = {
+        "Timestamp": _slow_ok,
+        "Merchant_Country": lambda v: Success(v) if v == "MX" else Failure("bad"),
+    }
+    order = AdaptiveOrder(schema, reorder_every=10)
+    for i in range(30):
+        validate_transaction({"Timestamp": "x", "Merchant_Country": "MX" if i % 2 else "FR"},
+                             order=order)
+    assert order.fields == ["Merchant_Country", "Timestamp"]
+    assert order.stats()["Merchant_Country"]["reject_rate"] == 0.5
+
+
+def test_adaptive_order_deterministic_keeps_messages():
+    """En modo determinista el mensaje coincide con la validación normal."""
+    schema = {
+        "Amount": lambda _: Failure("first"),
+        "Channel": lambda _: Failure("second"),
+    }
+    d = {"Amount": 1, "Channel": "POS"}
+    order = AdaptiveOrder(schema, reorder_every=1, deterministic=True)
+    for _ in range(5):
+        result = validate_transaction(d, order=order)
+    assert result.failure() == validate_transaction(d, schema).failure()
+    assert order.fields == ["Amount", "Channel"]
+
+
+def test_validate_transaction_coerce_returns_typed_record():
+    """En modo coerce el resultado lleva los valores tipados."""
+    d = {
+        "Timestamp": "11/20/2025 21:47",
+        "Amount": "99.5",
+        "Merchant_Country": "MX",
+        "Latitude": "19.2",
+        "Note": "extra",
+    }
+    schema = {
+        "Timestamp": DateValidator(),
+        "Amount": PositiveFloat(),
+        "Merchant_Country": CountryWhitelist(["MX"]),
+        "Latitude": float,
+    }
+    result = validate_transaction(d, schema, coerce=True)
+    assert isinstance(result, Success)
+    typed = result.unwrap()
+    assert typed == {
+        "Timestamp": 1763675220,
+        "Amount": 99.5,
+        "Merchant_Country": "MX",
+        "Latitude": 19.2,
+        "Note": "extra",
+    }
+    assert d["Amount"] == "99.5"
+
+
+def test_validate_transaction_coerce_with_adaptive_order():
+    """El orden adaptativo también devuelve registros tipados."""
+    schema = {"Amount": PositiveFloat()}
+    order = AdaptiveOrder(schema)
+    result = validate_transaction({"Amount": "3"}, order=order, coerce=True)
+    assert result.unwrap() == {"Amount": 3.0}
+
+
+def test_adaptive_order_rejects_non_positive_reorder_every():
+    """reorder_every debe ser positivo."""
+    for value in (0, -5):
+        with pytest.raises(ValueError, match="reorder_every must be positive"):
+            AdaptiveOrder({"Amount": PositiveFloat()}, reorder_every=value)
+
+
+def test_compiled_schema_matches_validate_transaction():
+    """El esquema compilado produce los mismos resultados y mensajes."""
+    schema = {"Amount": PositiveFloat(), "Merchant_Country": CountryWhitelist(["MX"])}
+    compiled = CompiledSchema(schema)
+    for d in ({"Amount": "5", "Merchant_Country": "MX"},
+              {"Amount": "-5", "Merchant_Country": "MX"},
+              {"Amount": "5"}):
+        expected = validate_transaction(d, schema)
+        result = compiled(d)
+        assert type(result) is type(expected)
+        assert str(result) == str(expected)
+    assert compiled({"Amount": "5", "Merchant_Country": "MX"}, coerce=True).unwrap() == \
+        {"Amount": 5.0, "Merchant_Country": "MX"}
+    assert isinstance(compiled({"Amount": "5", "Merchant_Country": "mx"}, coerce=True), Failure)